@@ -12,9 +12,17 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.utils import ImageReader
 import os
-import random
 import hashlib
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import analysis_backend
+import case_ids
+from extraction_cache import ExtractionCache
 
 # PDF text extraction (optional, only if PyPDF2 is available)
 try:
@@ -50,6 +58,51 @@ try:
 except Exception as e:
     print(f"Could not register Hebrew font: {e}. Using fallback.")
 
+# Bump whenever extraction output changes; older cache entries are then ignored
+EXTRACTOR_VERSION = 1
+
+# Results starting with these are failures: they are not cached or indexed
+EXTRACTION_ERROR_PREFIXES = (
+    "[File not found",
+    "[Unsupported file format",
+    "[.doc format not supported",
+    "[PDF text extraction not available",
+    "[Word text extraction not available",
+    "[Error extracting",
+)
+
+# Process-wide cache of extracted text, keyed by file content
+extraction_cache = ExtractionCache()
+
+def iter_pdf_pages(file_path, first_page=1, last_page=None):
+    """
+    Lazily extract a PDF one page at a time
+
+    Only the current page's text is held in memory, and the file is closed as
+    soon as the caller stops iterating, so a reader can stop early or start
+    analysis before the last page of a long contract has been parsed.
+
+    Args:
+        file_path: Path to the PDF file
+        first_page: First page to extract, 1-based (default 1)
+        last_page: Last page to extract, inclusive (default: end of document)
+
+    Yields:
+        tuple: (page_no, text) with 1-based page numbers
+
+    Raises:
+        RuntimeError: If PyPDF2 is not installed
+    """
+    if not PDF_SUPPORT:
+        raise RuntimeError("PDF text extraction not available - PyPDF2 not installed")
+
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        stop = page_count if last_page is None else min(last_page, page_count)
+        for index in range(max(first_page, 1) - 1, stop):
+            yield index + 1, pdf_reader.pages[index].extract_text() or ""
+
 def extract_text_from_pdf(file_path):
     """
     Extract text content from a PDF file
@@ -64,12 +117,7 @@ def extract_text_from_pdf(file_path):
         return "[PDF text extraction not available - PyPDF2 not installed]"
 
     try:
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+        return "\n".join(text for _page_no, text in iter_pdf_pages(file_path)).strip()
     except Exception as e:
         print(f"Error extracting text from PDF {file_path}: {e}")
         return f"[Error extracting PDF text: {str(e)}]"
@@ -108,12 +156,59 @@ def extract_text_from_docx(file_path):
         print(f"Error extracting text from Word document {file_path}: {e}")
         return f"[Error extracting Word text: {str(e)}]"
 
-def extract_text_from_file(file_path):
+def _is_cacheable_extraction(text):
+    """Only successful extractions are cached"""
+    return not text.startswith(EXTRACTION_ERROR_PREFIXES)
+
+# Leading bytes of the formats we read, for files stored without an extension
+_FILE_SIGNATURES = (
+    (b"%PDF-", '.pdf'),
+    (b"PK\x03\x04", '.docx'),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", '.doc'),
+)
+
+def detect_file_type(file_path, file_name=None):
+    """
+    Determine a document's type
+
+    Evidence blobs are stored under their content hash without an extension,
+    so the type comes from the original file name when there is one, then
+    from the path, and finally from the file's leading bytes.
+
+    Args:
+        file_path: Path to the file
+        file_name: Original (uploaded) file name, if known
+
+    Returns:
+        str: Lower-case extension such as '.pdf', or '' if unknown
     """
-    Extract text from a file (PDF or DOCX) based on file extension
+    for name in (file_name, file_path):
+        _, ext = os.path.splitext((name or "").lower())
+        if ext:
+            return ext
+
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(8)
+    except OSError:
+        return ""
+    for signature, ext in _FILE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return ""
+
+def extract_text_from_file(file_path, use_cache=True, file_name=None):
+    """
+    Extract text from a file (PDF or DOCX) based on its type
+
+    Results are cached by file content (SHA-256) and EXTRACTOR_VERSION, so
+    repeat analyses of the same evidence do not re-parse the document.
 
     Args:
         file_path: Path to the file
+        use_cache: Set to False to always re-parse (default True)
+        file_name: Original file name, for paths without an extension such
+                   as evidence store blobs (see detect_file_type)
 
     Returns:
         str: Extracted text content
@@ -121,31 +216,188 @@ def extract_text_from_file(file_path):
     if not file_path or not os.path.exists(file_path):
         return "[File not found]"
 
-    # Determine file type by extension
-    _, ext = os.path.splitext(file_path.lower())
+    ext = detect_file_type(file_path, file_name)
 
     if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
+        extractor = extract_text_from_pdf
     elif ext in ['.docx', '.doc']:
         if ext == '.doc':
-            print(f"Warning: .doc files are not supported, only .docx. File: {file_path}")
+            print(f"Warning: .doc files are not supported, only .docx. File: {file_name or file_path}")
             return "[.doc format not supported - please use .docx format]"
-        return extract_text_from_docx(file_path)
+        extractor = extract_text_from_docx
     else:
         return f"[Unsupported file format: {ext}]"
 
+    if not use_cache:
+        return extractor(file_path)
+
+    try:
+        return extraction_cache.get_or_extract(file_path, extractor, EXTRACTOR_VERSION,
+                                               cacheable=_is_cacheable_extraction)
+    except OSError as e:
+        print(f"Warning: extraction cache unavailable for {file_path}: {e}")
+        return extractor(file_path)
+
+class ExtractionTimeout(Exception):
+    """Raised inside an extraction worker when a file exceeds its time budget"""
+
+def _raise_extraction_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def _address_space_bytes():
+    """Current address space of this process (Linux /proc; 0 if unknown)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _init_extraction_worker(max_memory_mb):
+    """
+    Process pool initializer: cap the worker's address space (POSIX only)
+
+    The cap is headroom above what the worker already maps: a forked worker
+    inherits the parent's address space (Streamlit, reportlab, ...), which
+    alone can exceed a fixed limit and make every extraction fail.
+    """
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+        limit = _address_space_bytes() + max_memory_mb * 1024 * 1024
+        _soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Warning: could not cap extraction worker memory: {e}")
+
+def _can_use_alarm(timeout):
+    """SIGALRM handlers can only be installed from the main thread (POSIX only)"""
+    return (bool(timeout) and hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread())
+
+def _extract_one(file_path, timeout, use_cache):
+    """
+    Extract a single file, enforcing the per-file timeout
+
+    Runs in a pool worker, or in the caller when it is on the main thread and
+    no memory cap is requested (see extract_texts).
+
+    Returns:
+        dict: path, text, seconds and error (None on success)
+    """
+    # Pool workers run tasks on their main thread, so an interval timer can
+    # interrupt a runaway parse without killing the worker
+    use_alarm = _can_use_alarm(timeout)
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_extraction_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start = time.perf_counter()
+    text, error = "", None
+    try:
+        text = extract_text_from_file(file_path, use_cache=use_cache)
+    except ExtractionTimeout:
+        error = f"timed out after {timeout}s"
+    except MemoryError:
+        error = "exceeded worker memory limit"
+    except Exception as e:
+        error = str(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    if error is None and text.startswith(EXTRACTION_ERROR_PREFIXES):
+        # "[Error extracting PDF text: ...]" and the like
+        text, error = "", text
+
+    return {
+        'path': file_path,
+        'text': text,
+        'seconds': time.perf_counter() - start,
+        'error': error
+    }
+
+def extract_texts(paths, max_workers=None, timeout=60, max_memory_mb=1024, use_cache=True):
+    """
+    Extract text from many PDF/DOCX files in parallel across processes
+
+    The time and memory limits hold on every path: a single file is only
+    extracted in the calling process when neither limit needs a worker
+    (no memory cap, and no timeout or a caller on the main thread).
+
+    Args:
+        paths: File paths to extract
+        max_workers: Worker processes (default: one per CPU)
+        timeout: Per-file time limit in seconds (POSIX; None to disable)
+        max_memory_mb: Address space each worker may add to what it maps at
+                       start, in MB (POSIX; None to disable)
+        use_cache: Read and fill the extraction cache (default True)
+
+    Returns:
+        list: One dict per path, in submission order, with path, text,
+              seconds (extraction time) and error (None on success)
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+
+    # Not worth starting a pool for a single file, unless a limit needs one
+    in_process = not max_memory_mb and (not timeout or _can_use_alarm(timeout))
+    if in_process and (len(paths) == 1 or max_workers == 1):
+        return [_extract_one(path, timeout, use_cache) for path in paths]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_extraction_worker,
+                             initargs=(max_memory_mb,)) as pool:
+        futures = [pool.submit(_extract_one, path, timeout, use_cache) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker process itself died (e.g. killed by the OS)
+                results.append({'path': path, 'text': "", 'seconds': 0.0, 'error': f"worker failed: {e}"})
+
+    return results
+
 def generate_case_id():
-    """Generate a unique 5-digit case ID"""
-    return str(random.randint(10000, 99999))
+    """Generate a unique case ID (RA-YYYYMMDD-NNNNNN, shared with the portal; see case_ids.py)"""
+    return case_ids.next_case_id()
 
-def analyze_case(claimant_name, defendant_name):
+def analyze_case(claimant_name, defendant_name, case_data=None):
     """
     Analyze case and return structured JSON output
 
+    With case_data and a configured analysis backend (ANTHROPIC_API_KEY, see
+    analysis_backend.py) the analysis comes from the model; otherwise it is
+    the built-in sample analysis. The metadata echoes case_data's case_id
+    (None without one); analyzing never allocates a case ID.
+
+    Args:
+        claimant_name: Claimant's name
+        defendant_name: Defendant's name
+        case_data: Portal-shaped case dict with the submissions (optional)
+
     Returns:
         dict: Structured analysis with dispute_table, mediation_proposal,
               final_verdict, reasoning, and legal_expenses
+
+    Raises:
+        analysis_backend.AnalysisError: If the model backend fails after retries
     """
+    backend = analysis_backend.get_backend() if case_data is not None else None
+    if backend is not None:
+        analysis = backend.analyze(claimant_name, defendant_name, case_data)
+        analysis['case_metadata'] = {
+            "claimant": claimant_name,
+            "defendant": defendant_name,
+            "date_analyzed": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "case_id": case_data.get('case_id')
+        }
+        return analysis
 
     # Simulate AI analysis with realistic mock data
     analysis = {
@@ -153,7 +405,7 @@ def analyze_case(claimant_name, defendant_name):
             "claimant": claimant_name,
             "defendant": defendant_name,
             "date_analyzed": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "case_id": generate_case_id()
+            "case_id": (case_data or {}).get('case_id')
         },
 
         "dispute_table": [
@@ -210,369 +462,507 @@ def analyze_case(claimant_name, defendant_name):
 
     return analysis
 
-def generate_arbitral_award_pdf(case_data, analysis, output_path):
-    """
-    Generate a formal Arbitral Award PDF document with Hebrew support
+# Logo drawn in the header of every award page (local file only, never fetched)
+LOGO_PATH = "logo.png"
 
-    Args:
-        case_data: Dictionary with case information (case_id, claimant, defendant)
-        analysis: The AI analysis result with structured data
-        output_path: Path where to save the PDF
+class AwardRenderer:
+    """
+    Renders arbitral award PDFs, reusing styles and the decoded logo across awards
 
-    Returns:
-        str: Path to generated PDF file
+    The stylesheet, paragraph and table styles and the logo ImageReader are
+    built once in the constructor; fonts are registered at import time. Use
+    get_award_renderer() for the per-process shared instance.
     """
 
-    # Function to add logo to each page
-    def add_page_header(canvas, doc):
+    def __init__(self, logo_path=LOGO_PATH):
+        self.logo = self._load_logo(logo_path)
+        self.styles = self._build_styles()
+        self.dispute_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E0E7FF')),  # Light blue background
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#0A2647')),  # Dark blue text
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),  # Right align for RTL
+            ('FONTNAME', (0, 0), (-1, 0), HEBREW_FONT),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('TOPPADDING', (0, 0), (-1, 0), 12),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),  # Add horizontal padding
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), HEBREW_FONT),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Align text to top for better readability
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 10),  # More padding in content cells
+            ('TOPPADDING', (0, 1), (-1, -1), 10),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ])
+        self.financial_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7C3AED')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),  # Right align for RTL
+            ('FONTNAME', (0, 0), (-1, -1), HEBREW_FONT),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),  # Padding for all cells
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),  # Add horizontal padding
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (0, 1), (-1, -2), colors.white),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#F1F5F9')),
+            ('GRID', (0, 0), (-1, -1), 1.5, colors.black),
+            ('FONTNAME', (0, -1), (-1, -1), HEBREW_FONT),
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('FONTWEIGHT', (0, -1), (-1, -1), 'BOLD'),
+        ])
+        self.signature_table_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTNAME', (0, 0), (-1, -1), HEBREW_FONT),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#0A2647')),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#0A2647')),
+        ])
+
+    @staticmethod
+    def _load_logo(logo_path):
+        """Decode the header logo once; awards are rendered without it if missing"""
+        if not logo_path or not os.path.exists(logo_path):
+            print(f"Warning: logo {logo_path} not found - awards will have no header logo")
+            return None
+        try:
+            logo = ImageReader(logo_path)
+            logo.getSize()  # force decoding now rather than on the first page
+            return logo
+        except Exception as e:
+            print(f"Warning: Could not load logo {logo_path}: {e}")
+            return None
+
+    @staticmethod
+    def _build_styles():
+        """Build the paragraph styles used by every award"""
+        styles = getSampleStyleSheet()
+
+        # Custom styles with Hebrew font
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=22,
+            textColor=colors.HexColor('#0A2647'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName=HEBREW_FONT,
+            leading=28
+        )
+
+        heading_style = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#0A2647'),
+            spaceAfter=15,
+            spaceBefore=15,
+            alignment=TA_RIGHT,
+            fontName=HEBREW_FONT,
+            leading=20
+        )
+
+        normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            alignment=TA_RIGHT,
+            fontName=HEBREW_FONT,
+            leading=18,
+            wordWrap='RTL'
+        )
+
+        # Table cell style with better wrapping
+        table_cell_style = ParagraphStyle(
+            'TableCell',
+            parent=normal_style,
+            fontSize=10,
+            alignment=TA_RIGHT,
+            fontName=HEBREW_FONT,
+            leading=14,
+            wordWrap='RTL',
+            spaceBefore=2,
+            spaceAfter=2
+        )
+
+        legal_header_style = ParagraphStyle(
+            'LegalHeader',
+            parent=normal_style,
+            fontSize=10,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#0A2647'),
+            spaceAfter=15
+        )
+
+        table_header_style = ParagraphStyle(
+            'TableHeader',
+            parent=table_cell_style,
+            fontSize=11,
+            fontName=HEBREW_FONT,
+            alignment=TA_RIGHT,
+            leading=16
+        )
+
+        footer_style = ParagraphStyle(
+            'Footer',
+            parent=normal_style,
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+            leading=12
+        )
+
+        return {
+            'title': title_style,
+            'heading': heading_style,
+            'normal': normal_style,
+            'table_cell': table_cell_style,
+            'table_header': table_header_style,
+            'legal_header': legal_header_style,
+            'footer': footer_style
+        }
+
+    def _draw_header(self, canvas, doc):
         """Add Resolve AI logo to every page header"""
+        if self.logo is None:
+            return
         canvas.saveState()
         try:
-            # Try to load logo
-            logo_path = "logo.png"
-            if os.path.exists(logo_path):
-                canvas.drawImage(logo_path,
-                               doc.width/2 + doc.leftMargin - 1*cm,  # Center horizontally
-                               doc.height + doc.topMargin - 1.5*cm,  # Top of page
-                               width=2*cm,
-                               height=2*cm,
-                               preserveAspectRatio=True,
-                               mask='auto')
-            else:
-                # Try URL if local file doesn't exist
-                logo_url = "https://raw.githubusercontent.com/yanaydavid/ResolveAI/main/logo.png"
-                canvas.drawImage(logo_url,
-                               doc.width/2 + doc.leftMargin - 1*cm,
-                               doc.height + doc.topMargin - 1.5*cm,
-                               width=2*cm,
-                               height=2*cm,
-                               preserveAspectRatio=True,
-                               mask='auto')
+            canvas.drawImage(self.logo,
+                           doc.width/2 + doc.leftMargin - 1*cm,  # Center horizontally
+                           doc.height + doc.topMargin - 1.5*cm,  # Top of page
+                           width=2*cm,
+                           height=2*cm,
+                           preserveAspectRatio=True,
+                           mask='auto')
         except Exception as e:
-            print(f"Warning: Could not load logo on page: {e}")
+            print(f"Warning: Could not draw logo on page: {e}")
         canvas.restoreState()
 
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=3*cm,  # Increased to make room for logo header
-        bottomMargin=2*cm
-    )
-
-    # Container for the 'Flowable' objects
-    elements = []
-
-    # Define styles
-    styles = getSampleStyleSheet()
-
-    # Custom styles with Hebrew font
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=22,
-        textColor=colors.HexColor('#0A2647'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName=HEBREW_FONT,
-        leading=28
-    )
-
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#0A2647'),
-        spaceAfter=15,
-        spaceBefore=15,
-        alignment=TA_RIGHT,
-        fontName=HEBREW_FONT,
-        leading=20
-    )
-
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        alignment=TA_RIGHT,
-        fontName=HEBREW_FONT,
-        leading=18,
-        wordWrap='RTL'
-    )
-
-    # Table cell style with better wrapping
-    table_cell_style = ParagraphStyle(
-        'TableCell',
-        parent=normal_style,
-        fontSize=10,
-        alignment=TA_RIGHT,
-        fontName=HEBREW_FONT,
-        leading=14,
-        wordWrap='RTL',
-        spaceBefore=2,
-        spaceAfter=2
-    )
-
-    # Legal Header (Logo will be added to every page via add_page_header callback)
-    legal_header_style = ParagraphStyle(
-        'LegalHeader',
-        parent=normal_style,
-        fontSize=10,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#0A2647'),
-        spaceAfter=15
-    )
-    elements.append(Paragraph("פסק בורר לפי חוק הבוררות, התשכ\"ח-1968", legal_header_style))
-    elements.append(Spacer(1, 0.3*cm))
-
-    # Title
-    elements.append(Paragraph("פסק בוררות", title_style))
-    elements.append(Spacer(1, 0.8*cm))
-
-    # Generate timestamp for the arbitral award
-    award_timestamp = datetime.now()
-    timestamp_str = award_timestamp.strftime('%d/%m/%Y %H:%M:%S')
-
-    # Case Information Box
-    case_info = f"""
-    <b>מספר תיק:</b> {case_data['case_id']}<br/>
-    <b>תאריך וזמן מתן הפסק:</b> {timestamp_str}<br/>
-    <b>התובע:</b> {case_data['claimant']}<br/>
-    <b>הנתבע:</b> {case_data['defendant']}<br/>
-    """
-    elements.append(Paragraph(case_info, normal_style))
-    elements.append(Spacer(1, 0.8*cm))
-
-    # Introduction
-    elements.append(Paragraph("הקדמה", heading_style))
-    intro_text = """
-    בהתאם לחוק הבוררות, התשכ"ח-1968, ולאחר בחינה מעמיקה של כתב התביעה וכתב ההגנה,
-    וניתוח הראיות באמצעות מערכת Resolve AI, מתפרסם בזו פסק הבוררות הבא.
-    """
-    elements.append(Paragraph(intro_text, normal_style))
-    elements.append(Spacer(1, 0.5*cm))
-
-    # Objectivity Declaration
-    elements.append(Paragraph("הצהרת אובייקטיביות", heading_style))
-    objectivity_text = """
-    <b>ההכרעה התקבלה על ידי אלגוריתם בינה מלאכותית המבוסס על ניתוח עובדתי של המסמכים שהוגשו בלבד, ללא מגע יד אדם וללא ניגוד עניינים.</b>
-    <br/><br/>
-    המערכת מבצעת ניתוח אוטומטי ואובייקטיבי של הטיעונים והראיות שהוצגו על ידי שני הצדדים, ומפיקה החלטה מבוססת על עקרונות משפטיים מקובלים וצדק טבעי.
-    """
-    elements.append(Paragraph(objectivity_text, normal_style))
-    elements.append(Spacer(1, 0.8*cm))
-
-    # Disputes Analysis Table
-    elements.append(Paragraph("ניתוח נקודות המחלוקת", heading_style))
-
-    # Wrap text in Paragraphs for proper RTL handling and word wrap
-    # Header style for table
-    table_header_style = ParagraphStyle(
-        'TableHeader',
-        parent=table_cell_style,
-        fontSize=11,
-        fontName=HEBREW_FONT,
-        alignment=TA_RIGHT,
-        leading=16
-    )
-
-    table_data = [
-        [Paragraph('<b>ניתוח AI</b>', table_header_style),
-         Paragraph('<b>גרסת הנתבע</b>', table_header_style),
-         Paragraph('<b>גרסת התובע</b>', table_header_style),
-         Paragraph('<b>נושא</b>', table_header_style)]
-    ]
+    def render(self, case_data, analysis, output_path):
+        """
+        Generate a formal Arbitral Award PDF document with Hebrew support
 
-    for dispute in analysis['dispute_table']:
-        table_data.append([
-            Paragraph(dispute['ai_analysis'], table_cell_style),
-            Paragraph(dispute['defendant_version'], table_cell_style),
-            Paragraph(dispute['claimant_version'], table_cell_style),
-            Paragraph(dispute['issue'], table_cell_style)
-        ])
+        Args:
+            case_data: Dictionary with case information (case_id, claimant, defendant)
+            analysis: The AI analysis result with structured data
+            output_path: Path where to save the PDF
 
-    # Create table with flexible column widths and dynamic row heights
-    # Using None for rowHeights allows automatic height adjustment based on content
-    dispute_table = Table(table_data, colWidths=[4.5*cm, 4.5*cm, 4.5*cm, 3*cm], repeatRows=1)
-    dispute_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E0E7FF')),  # Light blue background
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#0A2647')),  # Dark blue text
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),  # Right align for RTL
-        ('FONTNAME', (0, 0), (-1, 0), HEBREW_FONT),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),  # Add horizontal padding
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), HEBREW_FONT),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Align text to top for better readability
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),  # More padding in content cells
-        ('TOPPADDING', (0, 1), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-    ]))
-
-    elements.append(dispute_table)
-    elements.append(Spacer(1, 0.8*cm))
-
-    # Mediation Proposal
-    if 'mediation_proposal' in analysis:
-        elements.append(Paragraph("הצעת פשרה", heading_style))
-        mediation = analysis['mediation_proposal']
-        mediation_text = f"""
-        <b>ההצעה:</b> {mediation['proposal']}<br/><br/>
-        <b>נימוק:</b> {mediation['rationale']}
+        Returns:
+            str: Path to generated PDF file
         """
-        elements.append(Paragraph(mediation_text, normal_style))
+        doc = SimpleDocTemplate(
+            output_path,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=3*cm,  # Increased to make room for logo header
+            bottomMargin=2*cm
+        )
+
+        styles = self.styles
+        title_style = styles['title']
+        heading_style = styles['heading']
+        normal_style = styles['normal']
+        table_cell_style = styles['table_cell']
+        table_header_style = styles['table_header']
+        legal_header_style = styles['legal_header']
+        footer_style = styles['footer']
+
+        # Container for the 'Flowable' objects
+        elements = []
+
+        # Legal Header (the logo is drawn on every page by _draw_header)
+        elements.append(Paragraph("פסק בורר לפי חוק הבוררות, התשכ\"ח-1968", legal_header_style))
+        elements.append(Spacer(1, 0.3*cm))
+
+        # Title
+        elements.append(Paragraph("פסק בוררות", title_style))
         elements.append(Spacer(1, 0.8*cm))
 
-    # Final Decision
-    elements.append(Paragraph("ההחלטה הסופית", heading_style))
-    decision = analysis['final_verdict']
-    reasoning = analysis['reasoning']
+        # Generate timestamp for the arbitral award
+        award_timestamp = datetime.now()
+        timestamp_str = award_timestamp.strftime('%d/%m/%Y %H:%M:%S')
 
-    verdict_text = f"""
-    <b>פסיקה:</b> {decision['verdict']}<br/><br/>
-    """
-    elements.append(Paragraph(verdict_text, normal_style))
+        # Case Information Box
+        case_info = f"""
+        <b>מספר תיק:</b> {case_data['case_id']}<br/>
+        <b>תאריך וזמן מתן הפסק:</b> {timestamp_str}<br/>
+        <b>התובע:</b> {case_data['claimant']}<br/>
+        <b>הנתבע:</b> {case_data['defendant']}<br/>
+        """
+        elements.append(Paragraph(case_info, normal_style))
+        elements.append(Spacer(1, 0.8*cm))
 
-    # Reasoning
-    elements.append(Paragraph("נימוקים", heading_style))
-    reasoning_summary = f"<b>סיכום:</b> {reasoning['summary']}<br/><br/>"
-    elements.append(Paragraph(reasoning_summary, normal_style))
+        # Introduction
+        elements.append(Paragraph("הקדמה", heading_style))
+        intro_text = """
+        בהתאם לחוק הבוררות, התשכ"ח-1968, ולאחר בחינה מעמיקה של כתב התביעה וכתב ההגנה,
+        וניתוח הראיות באמצעות מערכת Resolve AI, מתפרסם בזו פסק הבוררות הבא.
+        """
+        elements.append(Paragraph(intro_text, normal_style))
+        elements.append(Spacer(1, 0.5*cm))
+
+        # Objectivity Declaration
+        elements.append(Paragraph("הצהרת אובייקטיביות", heading_style))
+        objectivity_text = """
+        <b>ההכרעה התקבלה על ידי אלגוריתם בינה מלאכותית המבוסס על ניתוח עובדתי של המסמכים שהוגשו בלבד, ללא מגע יד אדם וללא ניגוד עניינים.</b>
+        <br/><br/>
+        המערכת מבצעת ניתוח אוטומטי ואובייקטיבי של הטיעונים והראיות שהוצגו על ידי שני הצדדים, ומפיקה החלטה מבוססת על עקרונות משפטיים מקובלים וצדק טבעי.
+        """
+        elements.append(Paragraph(objectivity_text, normal_style))
+        elements.append(Spacer(1, 0.8*cm))
 
-    if 'detailed_analysis' in reasoning:
-        for i, point in enumerate(reasoning['detailed_analysis'], 1):
-            elements.append(Paragraph(f"{i}. {point}", normal_style))
-            elements.append(Spacer(1, 0.3*cm))
+        # Disputes Analysis Table
+        elements.append(Paragraph("ניתוח נקודות המחלוקת", heading_style))
+
+        table_data = [
+            [Paragraph('<b>ניתוח AI</b>', table_header_style),
+             Paragraph('<b>גרסת הנתבע</b>', table_header_style),
+             Paragraph('<b>גרסת התובע</b>', table_header_style),
+             Paragraph('<b>נושא</b>', table_header_style)]
+        ]
+
+        for dispute in analysis['dispute_table']:
+            table_data.append([
+                Paragraph(dispute['ai_analysis'], table_cell_style),
+                Paragraph(dispute['defendant_version'], table_cell_style),
+                Paragraph(dispute['claimant_version'], table_cell_style),
+                Paragraph(dispute['issue'], table_cell_style)
+            ])
+
+        # Create table with flexible column widths and dynamic row heights
+        # Using None for rowHeights allows automatic height adjustment based on content
+        dispute_table = Table(table_data, colWidths=[4.5*cm, 4.5*cm, 4.5*cm, 3*cm], repeatRows=1)
+        dispute_table.setStyle(self.dispute_table_style)
+
+        elements.append(dispute_table)
+        elements.append(Spacer(1, 0.8*cm))
 
-    if 'legal_basis' in reasoning:
-        legal_basis_text = f"<br/><b>בסיס משפטי:</b> {reasoning['legal_basis']}"
-        elements.append(Paragraph(legal_basis_text, normal_style))
+        # Mediation Proposal
+        if 'mediation_proposal' in analysis:
+            elements.append(Paragraph("הצעת פשרה", heading_style))
+            mediation = analysis['mediation_proposal']
+            mediation_text = f"""
+            <b>ההצעה:</b> {mediation['proposal']}<br/><br/>
+            <b>נימוק:</b> {mediation['rationale']}
+            """
+            elements.append(Paragraph(mediation_text, normal_style))
+            elements.append(Spacer(1, 0.8*cm))
+
+        # Final Decision
+        elements.append(Paragraph("ההחלטה הסופית", heading_style))
+        decision = analysis['final_verdict']
+        reasoning = analysis['reasoning']
+
+        verdict_text = f"""
+        <b>פסיקה:</b> {decision['verdict']}<br/><br/>
+        """
+        elements.append(Paragraph(verdict_text, normal_style))
 
-    elements.append(Spacer(1, 0.8*cm))
+        # Reasoning
+        elements.append(Paragraph("נימוקים", heading_style))
+        reasoning_summary = f"<b>סיכום:</b> {reasoning['summary']}<br/><br/>"
+        elements.append(Paragraph(reasoning_summary, normal_style))
 
-    # Financial Summary
-    elements.append(Paragraph("סיכום כספי", heading_style))
+        if 'detailed_analysis' in reasoning:
+            for i, point in enumerate(reasoning['detailed_analysis'], 1):
+                elements.append(Paragraph(f"{i}. {point}", normal_style))
+                elements.append(Spacer(1, 0.3*cm))
 
-    legal_exp = analysis.get('legal_expenses', {})
-    legal_exp_amount = legal_exp.get('registered_mail', decision.get('legal_expenses', 35.0))
+        if 'legal_basis' in reasoning:
+            legal_basis_text = f"<br/><b>בסיס משפטי:</b> {reasoning['legal_basis']}"
+            elements.append(Paragraph(legal_basis_text, normal_style))
 
-    financial_data = [
-        [Paragraph('<b>סכום</b>', table_cell_style), Paragraph('<b>פריט</b>', table_cell_style)],
-        [Paragraph(f"{decision['amount_awarded']:,.2f} ₪", table_cell_style), Paragraph('סכום הפיצוי', table_cell_style)],
-        [Paragraph(f"{legal_exp_amount:.2f} ₪", table_cell_style), Paragraph('דמי משלוח דואר רשום', table_cell_style)],
-        [Paragraph(f"{decision['total_payment']:,.2f} ₪", table_cell_style), Paragraph('סה"כ לתשלום', table_cell_style)]
-    ]
+        elements.append(Spacer(1, 0.8*cm))
+
+        # Financial Summary
+        elements.append(Paragraph("סיכום כספי", heading_style))
+
+        legal_exp = analysis.get('legal_expenses', {})
+        legal_exp_amount = legal_exp.get('registered_mail', decision.get('legal_expenses', 35.0))
+
+        financial_data = [
+            [Paragraph('<b>סכום</b>', table_cell_style), Paragraph('<b>פריט</b>', table_cell_style)],
+            [Paragraph(f"{decision['amount_awarded']:,.2f} ₪", table_cell_style), Paragraph('סכום הפיצוי', table_cell_style)],
+            [Paragraph(f"{legal_exp_amount:.2f} ₪", table_cell_style), Paragraph('דמי משלוח דואר רשום', table_cell_style)],
+            [Paragraph(f"{decision['total_payment']:,.2f} ₪", table_cell_style), Paragraph('סה"כ לתשלום', table_cell_style)]
+        ]
+
+        financial_table = Table(financial_data, colWidths=[6*cm, 8*cm])
+        financial_table.setStyle(self.financial_table_style)
+
+        elements.append(financial_table)
+        elements.append(Spacer(1, 0.8*cm))
+
+        # Payment terms
+        payment_text = f"""
+        <b>מועד תשלום:</b> על הנתבע לשלם את מלוא הסכום תוך {decision["payment_deadline_days"]} ימים מיום קבלת פסק בוררות זה.
+        """
+        elements.append(Paragraph(payment_text, normal_style))
+        elements.append(Spacer(1, 1.2*cm))
+
+        # Generate document hash first (needed for authentication appendix)
+        hash_content = f"{case_data['case_id']}|{case_data['claimant']}|{case_data['defendant']}|{timestamp_str}|{decision['amount_awarded']}|{decision['total_payment']}"
+        doc_hash = hashlib.sha256(hash_content.encode('utf-8')).hexdigest()
+
+        # Authentication Appendix - Improved, concise, and emphasizes Hash
+        elements.append(Paragraph("נספח אימות ושלמות מסמך", heading_style))
+
+        auth_text = f"""
+        <b>אימות שלמות המסמך:</b><br/>
+        מסמך זה הופק דיגיטלית במערכת Resolve AI לאחר שני הצדדים אישרו את הליך הבוררות והגישו את מסמכיהם דרך הפלטפורמה המאובטחת.
+        <br/><br/>
+        <b>קוד אימות Hash (חשוב):</b><br/>
+        <font size="8" color="#0A2647"><b>{doc_hash}</b></font><br/>
+        קוד ייחודי זה מאמת את שלמות תוכן המסמך ומונע כל שינוי או זיוף. ניתן לאמת את המסמך באמצעות קוד זה במערכת Resolve AI.
+        <br/><br/>
+        <b>תיעוד דיגיטלי:</b><br/>
+        תיק מספר {case_data["case_id"]} תועד במלואו במערכת, כולל אישורי הצדדים, מועדי הגשת המסמכים, וזמני האישור.
+        """
+        elements.append(Paragraph(auth_text, normal_style))
+        elements.append(Spacer(1, 0.8*cm))
+
+        # Signature section - Digital signatures with actual dates
+        elements.append(Paragraph("חתימות דיגיטליות", heading_style))
+        elements.append(Spacer(1, 0.5*cm))
+
+        date_str = award_timestamp.strftime("%d/%m/%Y")
+        time_str = award_timestamp.strftime("%H:%M:%S")
+
+        signature_data = [
+            [Paragraph(f'<b>נחתם דיגיטלית על ידי:</b><br/>מערכת Resolve AI<br/><b>תאריך:</b> {date_str}<br/><b>שעה:</b> {time_str}', table_cell_style),
+             Paragraph('', table_cell_style)],
+            [Paragraph('', table_cell_style), Paragraph('', table_cell_style)],
+            [Paragraph(f'<b>אישור קבלה - תובע</b><br/>נחתם דיגיטלית על ידי:<br/>{case_data["claimant"]}<br/><b>תאריך:</b> {date_str}<br/><b>שעה:</b> {time_str}', table_cell_style),
+             Paragraph(f'<b>אישור קבלה - נתבע</b><br/>נחתם דיגיטלית על ידי:<br/>{case_data["defendant"]}<br/><b>תאריך:</b> {date_str}<br/><b>שעה:</b> {time_str}', table_cell_style)]
+        ]
 
-    financial_table = Table(financial_data, colWidths=[6*cm, 8*cm])
-    financial_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7C3AED')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),  # Right align for RTL
-        ('FONTNAME', (0, 0), (-1, -1), HEBREW_FONT),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),  # Padding for all cells
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),  # Add horizontal padding
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('BACKGROUND', (0, 1), (-1, -2), colors.white),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#F1F5F9')),
-        ('GRID', (0, 0), (-1, -1), 1.5, colors.black),
-        ('FONTNAME', (0, -1), (-1, -1), HEBREW_FONT),
-        ('FONTSIZE', (0, -1), (-1, -1), 12),
-        ('FONTWEIGHT', (0, -1), (-1, -1), 'BOLD'),
-    ]))
-
-    elements.append(financial_table)
-    elements.append(Spacer(1, 0.8*cm))
-
-    # Payment terms
-    payment_text = f"""
-    <b>מועד תשלום:</b> על הנתבע לשלם את מלוא הסכום תוך {decision["payment_deadline_days"]} ימים מיום קבלת פסק בוררות זה.
+        sig_table = Table(signature_data, colWidths=[7*cm, 7*cm])
+        sig_table.setStyle(self.signature_table_style)
+
+        elements.append(sig_table)
+        elements.append(Spacer(1, 1.2*cm))
+
+        # Footer
+        footer_text = """
+        <i>פסק בוררות זה ניתן על פי חוק הבוררות, התשכ"ח-1968, ומהווה פסק דין סופי ומחייב.<br/>
+        ערר על פסק בוררות זה ניתן להגיש לבית המשפט בהתאם להוראות החוק.<br/>
+        מסמך זה נוצר באמצעות מערכת Resolve AI - בוררות דיגיטלית מבוססת בינה מלאכותית.</i>
+        """
+        elements.append(Paragraph(footer_text, footer_style))
+
+        # Build PDF with logo on every page
+        try:
+            doc.build(elements, onFirstPage=self._draw_header, onLaterPages=self._draw_header)
+            return output_path
+        except Exception as e:
+            print(f"Error generating PDF: {e}")
+            raise
+
+# One renderer per process, built on first use
+_award_renderer = None
+
+def get_award_renderer():
+    """Return this process's shared AwardRenderer, creating it on first use"""
+    global _award_renderer
+    if _award_renderer is None:
+        _award_renderer = AwardRenderer()
+    return _award_renderer
+
+def generate_arbitral_award_pdf(case_data, analysis, output_path):
     """
-    elements.append(Paragraph(payment_text, normal_style))
-    elements.append(Spacer(1, 1.2*cm))
-
-    # Generate document hash first (needed for authentication appendix)
-    hash_content = f"{case_data['case_id']}|{case_data['claimant']}|{case_data['defendant']}|{timestamp_str}|{decision['amount_awarded']}|{decision['total_payment']}"
-    doc_hash = hashlib.sha256(hash_content.encode('utf-8')).hexdigest()
-
-    # Authentication Appendix - Improved, concise, and emphasizes Hash
-    elements.append(Paragraph("נספח אימות ושלמות מסמך", heading_style))
-
-    auth_text = f"""
-    <b>אימות שלמות המסמך:</b><br/>
-    מסמך זה הופק דיגיטלית במערכת Resolve AI לאחר שני הצדדים אישרו את הליך הבוררות והגישו את מסמכיהם דרך הפלטפורמה המאובטחת.
-    <br/><br/>
-    <b>קוד אימות Hash (חשוב):</b><br/>
-    <font size="8" color="#0A2647"><b>{doc_hash}</b></font><br/>
-    קוד ייחודי זה מאמת את שלמות תוכן המסמך ומונע כל שינוי או זיוף. ניתן לאמת את המסמך באמצעות קוד זה במערכת Resolve AI.
-    <br/><br/>
-    <b>תיעוד דיגיטלי:</b><br/>
-    תיק מספר {case_data["case_id"]} תועד במלואו במערכת, כולל אישורי הצדדים, מועדי הגשת המסמכים, וזמני האישור.
+    Generate a formal Arbitral Award PDF document with Hebrew support
+
+    Args:
+        case_data: Dictionary with case information (case_id, claimant, defendant)
+        analysis: The AI analysis result with structured data
+        output_path: Path where to save the PDF
+
+    Returns:
+        str: Path to generated PDF file
     """
-    elements.append(Paragraph(auth_text, normal_style))
-    elements.append(Spacer(1, 0.8*cm))
-
-    # Signature section - Digital signatures with actual dates
-    elements.append(Paragraph("חתימות דיגיטליות", heading_style))
-    elements.append(Spacer(1, 0.5*cm))
-
-    date_str = award_timestamp.strftime("%d/%m/%Y")
-    time_str = award_timestamp.strftime("%H:%M:%S")
-
-    signature_data = [
-        [Paragraph(f'<b>נחתם דיגיטלית על ידי:</b><br/>מערכת Resolve AI<br/><b>תאריך:</b> {date_str}<br/><b>שעה:</b> {time_str}', table_cell_style),
-         Paragraph('', table_cell_style)],
-        [Paragraph('', table_cell_style), Paragraph('', table_cell_style)],
-        [Paragraph(f'<b>אישור קבלה - תובע</b><br/>נחתם דיגיטלית על ידי:<br/>{case_data["claimant"]}<br/><b>תאריך:</b> {date_str}<br/><b>שעה:</b> {time_str}', table_cell_style),
-         Paragraph(f'<b>אישור קבלה - נתבע</b><br/>נחתם דיגיטלית על ידי:<br/>{case_data["defendant"]}<br/><b>תאריך:</b> {date_str}<br/><b>שעה:</b> {time_str}', table_cell_style)]
-    ]
+    return get_award_renderer().render(case_data, analysis, output_path)
+
+def _init_award_worker():
+    """Process pool initializer: build the renderer before the first job arrives"""
+    get_award_renderer()
+
+def _render_award_job(case_data, analysis, output_path):
+    """
+    Render one award to a temporary file and move it into place
 
-    sig_table = Table(signature_data, colWidths=[7*cm, 7*cm])
-    sig_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (-1, -1), HEBREW_FONT),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#0A2647')),
-        ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#0A2647')),
-    ]))
-
-    elements.append(sig_table)
-    elements.append(Spacer(1, 1.2*cm))
-
-    # Footer
-    footer_text = """
-    <i>פסק בוררות זה ניתן על פי חוק הבוררות, התשכ"ח-1968, ומהווה פסק דין סופי ומחייב.<br/>
-    ערר על פסק בוררות זה ניתן להגיש לבית המשפט בהתאם להוראות החוק.<br/>
-    מסמך זה נוצר באמצעות מערכת Resolve AI - בוררות דיגיטלית מבוססת בינה מלאכותית.</i>
+    Returns:
+        dict: case_id, path, seconds and error (None on success)
     """
-    elements.append(Paragraph(footer_text, ParagraphStyle(
-        'Footer',
-        parent=normal_style,
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-        leading=12
-    )))
-
-    # Build PDF with logo on every page
+    start = time.perf_counter()
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    error = None
     try:
-        doc.build(elements, onFirstPage=add_page_header, onLaterPages=add_page_header)
-        return output_path
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        get_award_renderer().render(case_data, analysis, tmp_path)
+        # Readers never see a half-written award
+        os.replace(tmp_path, output_path)
     except Exception as e:
-        print(f"Error generating PDF: {e}")
-        raise
+        error = str(e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        'case_id': case_data.get('case_id'),
+        'path': output_path if error is None else None,
+        'seconds': time.perf_counter() - start,
+        'error': error
+    }
+
+def render_awards(jobs, output_dir="awards", max_workers=None):
+    """
+    Render many arbitral awards in parallel across processes
+
+    Args:
+        jobs: Iterable of (case_data, analysis) or (case_data, analysis, output_path);
+              the default output path is <output_dir>/award_<case_id>.pdf
+        output_dir: Directory for awards without an explicit output path
+        max_workers: Worker processes (default: one per CPU)
+
+    Returns:
+        list: One dict per job, in submission order, with case_id, path
+              (None on failure), seconds (render time) and error (None on success)
+    """
+    tasks = []
+    for job in jobs:
+        case_data, analysis = job[0], job[1]
+        output_path = job[2] if len(job) > 2 else os.path.join(output_dir, f"award_{case_data['case_id']}.pdf")
+        tasks.append((case_data, analysis, output_path))
+    if not tasks:
+        return []
+
+    if len(tasks) == 1 or max_workers == 1:
+        return [_render_award_job(*task) for task in tasks]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_award_worker) as pool:
+        futures = [pool.submit(_render_award_job, *task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker process itself died (e.g. killed by the OS)
+                results.append({'case_id': task[0].get('case_id'), 'path': None, 'seconds': 0.0,
+                                'error': f"worker failed: {e}"})
+
+    return results
 
 def get_analysis_summary_html(analysis):
     """
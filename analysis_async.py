@@ -0,0 +1,324 @@
+"""
+Asynchronous analysis client for Resolve AI - many cases against the model at once
+
+AsyncAnalysisClient runs next to ai_engine.analyze_case for bulk work (e.g.
+many cases locked at once). Cases wait in a priority queue ordered by
+deadline; a fixed number of worker tasks take the most urgent case, wait
+for the requests/min and tokens/min budgets, and call the provider. Results
+are delivered per case as they finish, and share analysis_backend's cache
+and prompt, so a case analyzed here is not analyzed again by the award job.
+
+Usage:
+    async with AsyncAnalysisClient(provider, requests_per_minute=50) as client:
+        async for result in client.stream(cases):
+            ...
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+
+from analysis_backend import (MAX_TOKENS, AnalysisError, build_prompt, case_hash, case_request,
+                              get_backend, load_analysis, parse_analysis, retry_delay, store_analysis)
+
+# Cases without a deadline are due this many seconds after submission
+DEFAULT_DEADLINE_SECONDS = 24 * 3600
+
+# Conservative characters-per-token ratio for estimating prompt size before the call
+CHARS_PER_TOKEN = 3
+
+# Latency samples kept for the metrics percentiles
+LATENCY_WINDOW = 1000
+
+
+class TokenBucket:
+    """
+    Rate limiter refilled continuously at rate_per_minute, holding up to capacity
+
+    Used from a single event loop (no locking).
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.waited = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount):
+        """Wait until amount tokens are available and take them (capped at capacity)"""
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            wait = (amount - self.tokens) / self.rate
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+    def adjust(self, amount):
+        """Give back (positive) or charge (negative) tokens after the real cost is known"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class AsyncAnalysisClient:
+    """
+    Deadline-ordered, budget-limited concurrent case analysis
+
+    Args:
+        provider: Object with complete(prompt, max_tokens) and model (AnthropicProvider)
+        max_concurrency: Calls in flight at once
+        requests_per_minute: Request budget
+        tokens_per_minute: Input + output token budget
+        max_retries: Retries of transient failures per case
+        base_delay, max_delay: Backoff bounds for retries (seconds)
+        max_tokens: Output token limit per call (reserved from the budget up front)
+    """
+
+    def __init__(self, provider, max_concurrency=8, requests_per_minute=50, tokens_per_minute=80000,
+                 max_retries=3, base_delay=1.0, max_delay=30.0, max_tokens=MAX_TOKENS):
+        self.provider = provider
+        self.model = provider.model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_tokens = max_tokens
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+        self._queue = None
+        self._workers = []
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'cache_hits': 0, 'retries': 0,
+                        'late': 0, 'input_tokens': 0, 'output_tokens': 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Start the worker tasks (on the running event loop)"""
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def close(self):
+        """Stop the workers; cases still queued are failed"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in list(self._pending.values()):
+            self._finish(job, error="client closed")
+        self._queue = None
+
+    def submit(self, claimant_name, defendant_name, case_data=None, deadline=None, case_id=None):
+        """
+        Queue a case for analysis
+
+        Args:
+            claimant_name: Claimant's name
+            defendant_name: Defendant's name
+            case_data: Portal-shaped case dict with the submissions (optional)
+            deadline: Epoch seconds the analysis is needed by (earliest runs first)
+            case_id: Identifier echoed in the result (default case_data['case_id'])
+
+        Returns:
+            asyncio.Future: Resolves to {'case_id', 'analysis', 'error', 'cached',
+                            'attempts', 'queued_seconds', 'seconds'}; never raises
+        """
+        if self._queue is None:
+            raise RuntimeError("client is not started")
+
+        request = case_request(claimant_name, defendant_name, case_data)
+        key = case_hash(request, self.model)
+        if case_id is None:
+            case_id = (case_data or {}).get('case_id')
+
+        # The same case submitted twice shares one job (the earlier deadline wins).
+        # A running job or one waiting out a retry backoff is queued again by
+        # its own retry timer, with the new deadline; queuing it here would
+        # skip the backoff
+        job = self._pending.get(key)
+        if job is not None:
+            if deadline is not None and deadline < job['deadline']:
+                job['deadline'] = deadline
+                if not job.get('running') and not job.get('retry_pending'):
+                    self._enqueue(job)
+            return job['future']
+
+        job = {
+            'key': key,
+            'case_id': case_id,
+            'prompt': build_prompt(request),
+            'deadline': deadline if deadline is not None else time.time() + DEFAULT_DEADLINE_SECONDS,
+            'attempts': 0,
+            'submitted': time.monotonic(),
+            'future': asyncio.get_running_loop().create_future(),
+        }
+        self._pending[key] = job
+        self._counts['submitted'] += 1
+        self._enqueue(job)
+        return job['future']
+
+    async def stream(self, cases):
+        """
+        Submit cases and yield each result as soon as it is ready
+
+        Args:
+            cases: Iterable of dicts with claimant_name, defendant_name and
+                   optionally case_data, deadline, case_id
+        """
+        futures = {self.submit(**case) for case in cases}
+        for next_done in asyncio.as_completed(futures):
+            yield await next_done
+
+    def metrics(self):
+        """Return queue depth, in-flight calls, counters, budget waits and latency percentiles"""
+        latencies = list(self._latencies)
+        waits = list(self._waits)
+        return dict(
+            self._counts,
+            queue_depth=sum(1 for job in self._pending.values() if not job.get('running')),
+            in_flight=self._in_flight,
+            rate_limited_seconds=round(self.requests.waited + self.tokens.waited, 3),
+            latency_p50=_percentile(latencies, 0.5),
+            latency_p95=_percentile(latencies, 0.95),
+            queue_wait_p50=_percentile(waits, 0.5),
+            queue_wait_p95=_percentile(waits, 0.95),
+        )
+
+    def _enqueue(self, job):
+        if self._queue is not None and job['key'] in self._pending:
+            self._queue.put_nowait((job['deadline'], next(self._sequence), job))
+
+    def _retry(self, job):
+        """Retry timer: the backoff is over, queue the job again"""
+        job['retry_pending'] = False
+        self._enqueue(job)
+
+    def _finish(self, job, analysis=None, error=None, cached=False):
+        if self._pending.get(job['key']) is not job:
+            return
+        del self._pending[job['key']]
+
+        self._counts['failed' if error else 'completed'] += 1
+        if time.time() > job['deadline']:
+            self._counts['late'] += 1
+        if not job['future'].done():
+            job['future'].set_result({
+                'case_id': job['case_id'],
+                'analysis': analysis,
+                'error': error,
+                'cached': cached,
+                'attempts': job['attempts'],
+                'queued_seconds': job.get('queued_seconds'),
+                'seconds': time.monotonic() - job['submitted'],
+            })
+
+    async def _worker(self):
+        while True:
+            deadline, _, job = await self._queue.get()
+            # Stale heap entries: the job was re-queued with an earlier deadline, or is done
+            if job['deadline'] != deadline or job.get('running') or self._pending.get(job['key']) is not job:
+                continue
+            job['running'] = True
+            try:
+                await self._run(job)
+            except Exception as e:
+                self._finish(job, error=f"unexpected error: {e}")
+            finally:
+                job['running'] = False
+
+    async def _run(self, job):
+        if job['attempts'] == 0:
+            job['queued_seconds'] = time.monotonic() - job['submitted']
+            self._waits.append(job['queued_seconds'])
+            cached = await asyncio.to_thread(load_analysis, job['key'])
+            if cached is not None:
+                self._counts['cache_hits'] += 1
+                self._finish(job, cached, cached=True)
+                return
+
+        # Reserve the worst case (prompt estimate + full output), settle after the call
+        reserved = len(job['prompt']) // CHARS_PER_TOKEN + self.max_tokens
+        await self.requests.acquire(1)
+        await self.tokens.acquire(reserved)
+
+        job['attempts'] += 1
+        self._in_flight += 1
+        start = time.monotonic()
+        try:
+            response = await asyncio.to_thread(self.provider.complete, job['prompt'], self.max_tokens)
+            used = response['input_tokens'] + response['output_tokens']
+            self.tokens.adjust(reserved - used)
+            self._counts['input_tokens'] += response['input_tokens']
+            self._counts['output_tokens'] += response['output_tokens']
+            analysis = parse_analysis(response['text'])
+        except AnalysisError as e:
+            if e.retryable and job['attempts'] <= self.max_retries:
+                self._counts['retries'] += 1
+                delay = retry_delay(job['attempts'] - 1, self.base_delay, self.max_delay, e.retry_after)
+                job['retry_pending'] = True
+                asyncio.get_running_loop().call_later(delay, self._retry, job)
+            else:
+                self._finish(job, error=str(e))
+            return
+        finally:
+            self._in_flight -= 1
+            self._latencies.append(time.monotonic() - start)
+
+        await asyncio.to_thread(store_analysis, job['key'], self.model, analysis, response)
+        self._finish(job, analysis)
+
+
+async def _analyze_all(provider, cases, options):
+    async with AsyncAnalysisClient(provider, **options) as client:
+        futures = [client.submit(**case) for case in cases]
+        return list(await asyncio.gather(*futures))
+
+
+def analyze_cases(cases, provider=None, **options):
+    """
+    Analyze many cases concurrently from synchronous code
+
+    Args:
+        cases: Iterable of dicts with claimant_name, defendant_name and
+               optionally case_data, deadline, case_id
+        provider: Provider to call (default: the configured backend's provider)
+        **options: AsyncAnalysisClient options (max_concurrency, budgets, retries)
+
+    Returns:
+        list: One result dict per case, in input order
+
+    Raises:
+        RuntimeError: If no provider is given and ANTHROPIC_API_KEY is not set
+    """
+    if provider is None:
+        backend = get_backend()
+        if backend is None:
+            raise RuntimeError("no analysis backend configured (set ANTHROPIC_API_KEY)")
+        provider = backend.provider
+    return asyncio.run(_analyze_all(provider, list(cases), options))
@@ -0,0 +1,435 @@
+"""
+Analysis backend for Resolve AI - model-backed case analysis
+
+analyze_case() in ai_engine returns the structure the award renderer needs
+(dispute_table, mediation_proposal, final_verdict, reasoning,
+legal_expenses). When ANTHROPIC_API_KEY is set, that structure comes from a
+model through an AnalysisBackend:
+
+    - AnthropicProvider calls the Messages API over HTTPS with urllib
+    - identical cases (after whitespace/Unicode normalization) share one
+      cached analysis in analysis_cache, and concurrent requests for the
+      same case share one call
+    - at most max_concurrency calls are in flight per process
+    - overloaded/rate-limited/network failures are retried with jittered
+      exponential backoff (Retry-After is honoured)
+
+Configuration (environment):
+    ANTHROPIC_API_KEY               Enables the backend
+    ANTHROPIC_BASE_URL              API endpoint (e.g. the local analysis_stub.py)
+    RESOLVEAI_ANALYSIS_MODEL        Model name (default claude-sonnet-4-6)
+    RESOLVEAI_ANALYSIS_CONCURRENCY  Calls in flight per process (default 4)
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import database
+
+DEFAULT_MODEL = "claude-sonnet-4-6"
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+MAX_TOKENS = 4000
+
+# Bump whenever the prompt or response handling changes; cached analyses are then ignored
+PROMPT_VERSION = 2
+
+# HTTP statuses worth retrying (timeouts, conflicts, rate limits, server errors, overloaded)
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+REQUIRED_KEYS = ('dispute_table', 'mediation_proposal', 'final_verdict', 'reasoning')
+# Fields the award renderer formats as numbers, and the columns of each dispute row
+NUMERIC_VERDICT_KEYS = ('amount_awarded', 'total_payment', 'payment_deadline_days')
+DISPUTE_KEYS = ('issue', 'claimant_version', 'defendant_version', 'ai_analysis')
+
+# Registered-mail expenses are fixed by the platform, not decided by the model
+LEGAL_EXPENSES = {
+    "registered_mail": 35.0,
+    "explanation": "דמי המשלוח בדואר רשום (35 שקל) יוחזרו לתובע כחלק מהוצאות המשפט, בהתאם לסעיף 76 לחוק בתי המשפט [נוסח משולב], התשמ\"ד-1984",
+    "included_in_total": True
+}
+
+
+class AnalysisError(RuntimeError):
+    """Raised when a case cannot be analyzed (provider failure or unusable response)"""
+
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+# =====================================================
+# Provider
+# =====================================================
+def _retry_after(headers):
+    """Seconds from a Retry-After header (None if absent or not a number)"""
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class AnthropicProvider:
+    """Anthropic Messages API adapter (plain HTTPS, no SDK dependency)"""
+
+    def __init__(self, api_key, model=DEFAULT_MODEL, base_url=DEFAULT_BASE_URL, timeout=120):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def complete(self, prompt, max_tokens=MAX_TOKENS):
+        """
+        Send one user prompt
+
+        Returns:
+            dict: text, input_tokens and output_tokens
+
+        Raises:
+            AnalysisError: On HTTP or network failure (retryable when transient)
+        """
+        body = json.dumps({
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }).encode("utf-8")
+        request = urllib.request.Request(f"{self.base_url}/v1/messages", data=body, method="POST", headers={
+            "content-type": "application/json",
+            "x-api-key": self.api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+        })
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise AnalysisError(f"provider returned HTTP {e.code}", retryable=e.code in RETRYABLE_STATUS,
+                                retry_after=_retry_after(e.headers)) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise AnalysisError(f"provider unreachable: {e}", retryable=True) from e
+        except ValueError as e:
+            raise AnalysisError(f"provider returned invalid JSON: {e}", retryable=True) from e
+
+        text = "".join(block.get("text", "") for block in payload.get("content", [])
+                       if block.get("type") == "text")
+        usage = payload.get("usage") or {}
+        return {'text': text, 'input_tokens': usage.get("input_tokens", 0),
+                'output_tokens': usage.get("output_tokens", 0)}
+
+
+# =====================================================
+# Prompt and Response
+# =====================================================
+def _normalize(value):
+    """NFC-normalize strings and collapse whitespace, recursively"""
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFC", value).split())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def case_request(claimant_name, defendant_name, case_data=None):
+    """
+    The normalized facts a case analysis depends on
+
+    Args:
+        claimant_name: Claimant's name
+        defendant_name: Defendant's name
+        case_data: Portal-shaped case dict (claimant, defendant, rebuttal), optional
+
+    Returns:
+        dict: claimant, defendant, claim_text, defense_text, rebuttal_text
+    """
+    case_data = case_data or {}
+    return _normalize({
+        'claimant': claimant_name,
+        'defendant': defendant_name,
+        'claim_text': (case_data.get('claimant') or {}).get('claim_text', ''),
+        'defense_text': (case_data.get('defendant') or {}).get('defense_text', ''),
+        'rebuttal_text': (case_data.get('rebuttal') or {}).get('text', ''),
+    })
+
+
+def case_hash(request, model):
+    """Cache key of a case request for a model and PROMPT_VERSION"""
+    payload = json.dumps([PROMPT_VERSION, model, request], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_prompt(request):
+    """Prompt asking for the analysis structure ai_engine's award renderer uses"""
+    return f"""You are a senior arbitrator for Resolve AI, an Israeli digital arbitration platform. You are strictly impartial and base your analysis only on the submissions below.
+
+CASE:
+- Claimant: {request['claimant']}
+- Defendant: {request['defendant']}
+
+STATEMENT OF CLAIM:
+{request['claim_text'] or "(not provided)"}
+
+STATEMENT OF DEFENSE:
+{request['defense_text'] or "(not provided)"}
+
+CLAIMANT'S REBUTTAL:
+{request['rebuttal_text'] or "(not provided)"}
+
+Write ALL text in Hebrew. Respond ONLY with a valid JSON object, with no markdown fences and no text before or after it, in exactly this structure:
+{{
+  "dispute_table": [
+    {{"issue": "...", "claimant_version": "...", "defendant_version": "...", "ai_analysis": "..."}}
+  ],
+  "mediation_proposal": {{"proposal": "...", "rationale": "..."}},
+  "final_verdict": {{
+    "verdict": "...",
+    "amount_awarded": 0.0,
+    "legal_expenses": 35.0,
+    "total_payment": 0.0,
+    "payment_deadline_days": 30
+  }},
+  "reasoning": {{
+    "summary": "...",
+    "detailed_analysis": ["...", "..."],
+    "legal_basis": "..."
+  }}
+}}
+total_payment is amount_awarded plus legal_expenses (registered mail, 35 NIS)."""
+
+
+def parse_analysis(text):
+    """
+    Parse and validate a model response
+
+    Returns:
+        dict: The analysis, with the platform's fixed legal_expenses
+
+    Raises:
+        AnalysisError: If the response is not the expected JSON object (retryable)
+    """
+    raw = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip(), flags=re.IGNORECASE)
+    try:
+        analysis = json.loads(raw)
+    except ValueError as e:
+        raise AnalysisError(f"response is not JSON: {e}", retryable=True) from e
+
+    if not isinstance(analysis, dict):
+        raise AnalysisError("response is not a JSON object", retryable=True)
+    missing = [key for key in REQUIRED_KEYS if key not in analysis]
+    if missing:
+        raise AnalysisError(f"response is missing {', '.join(missing)}", retryable=True)
+
+    # The award renderer indexes into these; a malformed analysis must be
+    # retried here rather than cached and fail every render
+    verdict = analysis['final_verdict']
+    if not isinstance(verdict, dict):
+        raise AnalysisError("final_verdict is not an object", retryable=True)
+    not_numeric = [key for key in NUMERIC_VERDICT_KEYS
+                   if isinstance(verdict.get(key), bool) or not isinstance(verdict.get(key), (int, float))]
+    if not_numeric:
+        raise AnalysisError(f"final_verdict.{', final_verdict.'.join(not_numeric)} must be numeric",
+                            retryable=True)
+
+    disputes = analysis['dispute_table']
+    if not isinstance(disputes, list):
+        raise AnalysisError("dispute_table is not a list", retryable=True)
+    for row, dispute in enumerate(disputes):
+        missing = [key for key in DISPUTE_KEYS if not isinstance(dispute, dict) or key not in dispute]
+        if missing:
+            raise AnalysisError(f"dispute_table[{row}] is missing {', '.join(missing)}", retryable=True)
+
+    analysis['legal_expenses'] = dict(LEGAL_EXPENSES)
+    return analysis
+
+
+# =====================================================
+# Backend
+# =====================================================
+class AnalysisBackend:
+    """
+    Cached, concurrency-limited case analysis on top of a provider
+
+    Thread-safe: the portal and worker threads can share one instance.
+    """
+
+    def __init__(self, provider, max_concurrency=4, max_retries=3, base_delay=1.0, max_delay=30.0):
+        self.provider = provider
+        self.model = provider.model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'cache_hits': 0, 'calls': 0, 'retries': 0, 'failures': 0,
+                       'input_tokens': 0, 'output_tokens': 0}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def stats(self):
+        """Return cache hit, call, retry, failure and token counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def analyze(self, claimant_name, defendant_name, case_data=None):
+        """
+        Analyze a case, from the cache when an identical case was analyzed before
+
+        Args:
+            claimant_name: Claimant's name
+            defendant_name: Defendant's name
+            case_data: Portal-shaped case dict with the submissions (optional)
+
+        Returns:
+            dict: dispute_table, mediation_proposal, final_verdict, reasoning, legal_expenses
+
+        Raises:
+            AnalysisError: If the provider fails after all retries
+        """
+        request = case_request(claimant_name, defendant_name, case_data)
+        key = case_hash(request, self.model)
+
+        cached = load_analysis(key)
+        if cached is not None:
+            self._count(cache_hits=1)
+            return cached
+
+        # Concurrent requests for the same case share a single call
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return json.loads(json.dumps(future.result()))
+
+        try:
+            analysis = self._call(request, key)
+            future.set_result(analysis)
+            return analysis
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def analyze_many(self, cases, max_workers=None):
+        """
+        Analyze several cases concurrently (bounded by max_concurrency)
+
+        Args:
+            cases: Iterable of (claimant_name, defendant_name, case_data) tuples
+            max_workers: Threads submitting requests (default max_concurrency)
+
+        Returns:
+            list: One dict per case, in order: {'analysis', 'error'}
+        """
+        def run(case):
+            try:
+                return {'analysis': self.analyze(*case), 'error': None}
+            except AnalysisError as e:
+                return {'analysis': None, 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_concurrency) as pool:
+            return list(pool.map(run, cases))
+
+    def _call(self, request, key):
+        """Call the provider with retries, then cache the parsed analysis"""
+        prompt = build_prompt(request)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._slots:
+                    self._count(calls=1)
+                    response = self.provider.complete(prompt)
+                self._count(input_tokens=response['input_tokens'], output_tokens=response['output_tokens'])
+                analysis = parse_analysis(response['text'])
+                break
+            except AnalysisError as e:
+                if not e.retryable or attempt == self.max_retries:
+                    self._count(failures=1)
+                    raise
+                self._count(retries=1)
+                time.sleep(retry_delay(attempt, self.base_delay, self.max_delay, e.retry_after))
+
+        store_analysis(key, self.model, analysis, response)
+        return analysis
+
+
+def retry_delay(attempt, base_delay, max_delay, retry_after=None):
+    """
+    Seconds to wait before retry number attempt + 1
+
+    Full jitter keeps retrying workers from hitting the API in lockstep; a
+    server-provided Retry-After is a lower bound.
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    return max(delay, retry_after or 0)
+
+
+def load_analysis(key):
+    """Return the cached analysis for a case hash (None if not cached)"""
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        row = conn.execute("SELECT analysis FROM analysis_cache WHERE case_hash = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def store_analysis(key, model, analysis, response):
+    """Cache an analysis with the token usage of the response that produced it"""
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO analysis_cache
+                (case_hash, model, analysis, input_tokens, output_tokens, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (key, model, json.dumps(analysis, ensure_ascii=False), response['input_tokens'],
+              response['output_tokens'], time.time()))
+
+
+# Backend built from the environment on first use
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Return the shared backend configured from the environment
+
+    Returns:
+        AnalysisBackend: The backend, or None if ANTHROPIC_API_KEY is not set
+    """
+    global _backend
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+
+    with _backend_lock:
+        if _backend is None:
+            provider = AnthropicProvider(
+                api_key,
+                model=os.environ.get("RESOLVEAI_ANALYSIS_MODEL", DEFAULT_MODEL),
+                base_url=os.environ.get("ANTHROPIC_BASE_URL", DEFAULT_BASE_URL),
+            )
+            _backend = AnalysisBackend(
+                provider, max_concurrency=int(os.environ.get("RESOLVEAI_ANALYSIS_CONCURRENCY", "4")))
+        return _backend
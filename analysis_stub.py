@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic Messages API
+
+Answers POST /v1/messages with a deterministic analysis derived from the
+prompt, so tests and local development exercise analysis_backend without
+network access or API costs. Failures and latency can be injected.
+
+Usage:
+    python analysis_stub.py [--port 8787] [--delay 0.5]
+    ANTHROPIC_API_KEY=stub ANTHROPIC_BASE_URL=http://127.0.0.1:8787 python job_queue.py
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stub_analysis(prompt):
+    """Deterministic analysis in the structure analysis_backend expects"""
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    amount = float(1000 + seed % 9000)
+    return {
+        "dispute_table": [
+            {
+                "issue": "הפרת ההסכם בין הצדדים",
+                "claimant_version": "הנתבע לא עמד בהתחייבויותיו על פי ההסכם",
+                "defendant_version": "הנתבע מכחיש את ההפרה הנטענת",
+                "ai_analysis": f"הוכחה הפרה חלקית המצדיקה פיצוי של {amount:,.0f} שקל"
+            }
+        ],
+        "mediation_proposal": {
+            "proposal": f"הנתבע ישלם {amount * 0.8:,.0f} שקל לסילוק מלא של התביעה",
+            "rationale": "הפשרה חוסכת לצדדים זמן והוצאות"
+        },
+        "final_verdict": {
+            "verdict": "התביעה מתקבלת בחלקה",
+            "amount_awarded": amount,
+            "legal_expenses": 35.0,
+            "total_payment": amount + 35.0,
+            "payment_deadline_days": 30
+        },
+        "reasoning": {
+            "summary": "הנתבע אחראי באופן חלקי לנזקים שנגרמו",
+            "detailed_analysis": ["ניתוח דטרמיניסטי של שרת הבדיקה"],
+            "legal_basis": "חוק החוזים (חלק כללי), התשל\"ג-1973, וחוק הבוררות, התשכ\"ח-1968"
+        }
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        if self.path != "/v1/messages":
+            return self._reply(404, {"type": "error", "error": {"type": "not_found_error"}})
+        if not self.headers.get("x-api-key"):
+            return self._reply(401, {"type": "error", "error": {"type": "authentication_error"}})
+
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            fail = server.fail_next > 0
+            if fail:
+                server.fail_next -= 1
+
+        if server.delay:
+            time.sleep(server.delay)
+        # Finished before replying: the client may send its next call as soon as it reads this one
+        with server.lock:
+            server.active -= 1
+
+        if fail:
+            return self._reply(529, {"type": "error", "error": {"type": "overloaded_error"}},
+                               headers={"retry-after": "0"})
+
+        prompt = body["messages"][0]["content"]
+        text = json.dumps(stub_analysis(prompt), ensure_ascii=False)
+        self._reply(200, {
+            "id": "msg_stub_" + hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:24],
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4}
+        })
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Stub API server; requests and max_active record what clients did"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, delay=0.0, fail_next=0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.delay = delay
+        self.fail_next = fail_next
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def start_stub(port=0, delay=0.0, fail_next=0):
+    """Start a stub server in a background thread (call shutdown() when done)"""
+    server = StubServer(port, delay, fail_next)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local Messages API stub")
+    parser.add_argument("--port", type=int, default=8787, help="Port to listen on")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.delay)
+    print(f"Messages API stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import os
-import random
-import string
+import re
+import base64
 from datetime import datetime
 
+import case_ids
+import database
+import evidence_analyzer
+import evidence_store
+import job_queue
+
 # =====================================================
 # Page Configuration
 # =====================================================
@@ -19,54 +25,100 @@ st.set_page_config(
 # Utility Functions
 # =====================================================
 def generate_case_id():
-    """Generate unique case ID"""
-    timestamp = datetime.now().strftime("%Y%m%d")
-    random_part = ''.join(random.choices(string.digits, k=6))
-    return f"RA-{timestamp}-{random_part}"
+    """Generate unique case ID (RA-YYYYMMDD-NNNNNN, see case_ids.py)"""
+    return case_ids.next_case_id()
+
+# Uploads larger than this are rejected before anything is written
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
 
-def save_uploaded_file(uploaded_file, case_id, file_type):
-    """Save uploaded file and return path"""
-    if not os.path.exists("uploads"):
-        os.makedirs("uploads")
+def oversized_uploads(files):
+    """Return the names of uploaded files larger than MAX_UPLOAD_BYTES"""
+    return [f.name for f in files if f is not None and f.size > MAX_UPLOAD_BYTES]
 
-    file_extension = uploaded_file.name.split('.')[-1]
-    file_path = os.path.join("uploads", f"{case_id}_{file_type}.{file_extension}")
+def save_uploaded_file(uploaded_file):
+    """
+    Stream an upload into the evidence store
 
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    Identical files (e.g. the same contract uploaded by both parties) are
+    stored once; the case and role are recorded by the database manifest.
 
-    return file_path
+    Returns:
+        dict: blob_id, size, file_path and the original file_name (blobs
+              have no extension; pass file_name to extract_text_from_file)
+
+    Raises:
+        evidence_store.BlobTooLargeError: If the file exceeds MAX_UPLOAD_BYTES
+    """
+    uploaded_file.seek(0)
+    record = evidence_store.put_stream(uploaded_file, max_bytes=MAX_UPLOAD_BYTES)
+    record['file_name'] = uploaded_file.name
+    return record
 
 def add_audit_log(case_id, stage, description):
-    """Add entry to audit log"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = {
-        'timestamp': timestamp,
-        'stage': stage,
-        'description': description
-    }
+    """Add entry to the case's persistent audit log"""
+    database.append_audit_event(case_id, stage, description)
 
-    if 'audit_log' not in st.session_state:
-        st.session_state.audit_log = []
+def load_case(case_id):
+    """
+    Load a case's durable state from the database
 
-    st.session_state.audit_log.append(log_entry)
+    Every portal render reads the case from the database (through the
+    lookup cache, which writes from any process invalidate), so any
+    session, worker or process serving the case sees the same stage and
+    submissions.
+    """
+    state = database.load_case_state(case_id) if case_id else None
+    if state is None:
+        # initial, claim_submitted, defense_submitted, rebuttal_submitted, locked
+        state = {'case_id': case_id, 'stage': 'initial', 'claimant': None, 'defendant': None, 'rebuttal': None}
+    return state
 
-def render_logo():
-    """Display Resolve AI logo with tagline"""
-    import base64
+# =====================================================
+# Static Assets (encoded once per process)
+# =====================================================
+@st.cache_resource(show_spinner=False)
+def _encoded_asset(path, mtime_ns, size):
+    """Read and base64-encode a file; cached per (path, mtime, size)"""
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+def asset_base64(path):
+    """
+    Base64 of a static file, encoded once per process
+
+    The cache is keyed on the file's mtime and size rather than a content
+    hash on purpose: a stat() per render is cheap, while hashing would read
+    the whole file on every rerun. A replaced logo (new mtime or size) gets
+    a new cache entry and takes effect without a restart.
 
-    # Read and encode logo
+    Returns:
+        str: The encoded content, or None if the file does not exist
+    """
     try:
-        with open("logo.jpg", "rb") as f:
-            logo_data = base64.b64encode(f.read()).decode()
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return _encoded_asset(path, stat.st_mtime_ns, stat.st_size)
 
+@st.cache_resource(show_spinner=False)
+def minified_css(css):
+    """Strip comments and whitespace from a <style> block (cached by its content)"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.strip()
+
+def render_logo():
+    """Display Resolve AI logo with tagline"""
+    logo_data = asset_base64("logo.jpg")
+    if logo_data:
         # Display logo centered with 200px width
         st.markdown(f"""
             <div style="display: flex; justify-content: center; padding-top: 20px;">
                 <img src="data:image/jpeg;base64,{logo_data}" width="200" alt="Resolve AI Logo">
             </div>
         """, unsafe_allow_html=True)
-    except FileNotFoundError:
+    else:
         st.error("Logo file not found")
 
     # Slogan with white color and center alignment (RTL)
@@ -86,7 +138,7 @@ def render_logo():
 # Custom CSS - Luxury Design with RTL Support
 # Version: 2.0 - Final Branded Design
 # =====================================================
-st.markdown("""
+APP_CSS = """
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Heebo:wght@300;400;500;700;900&display=swap');
 
@@ -345,7 +397,10 @@ st.markdown("""
         border-image: linear-gradient(135deg, #8E6D28 0%, #C29B40 45%, #E0C58A 55%, #C29B40 100%) 1 !important;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Re-sent on every rerun (Streamlit re-renders every element), so send it minified
+st.markdown(minified_css(APP_CSS), unsafe_allow_html=True)
 
 # =====================================================
 # Terms and Conditions - Full Legal Text
@@ -452,14 +507,13 @@ if 'terms_scrolled_claimant' not in st.session_state:
     st.session_state.terms_scrolled_claimant = False
 if 'terms_scrolled_defendant' not in st.session_state:
     st.session_state.terms_scrolled_defendant = False
+# Sessions only remember which case they are working on; the case itself lives in the database
 if 'case_id' not in st.session_state:
     st.session_state.case_id = None
-if 'case_stage' not in st.session_state:
-    st.session_state.case_stage = 'initial'  # initial, claim_submitted, defense_submitted, rebuttal_submitted, locked
-if 'case_data' not in st.session_state:
-    st.session_state.case_data = {}
-if 'audit_log' not in st.session_state:
-    st.session_state.audit_log = []
+if 'defendant_case_id' not in st.session_state:
+    st.session_state.defendant_case_id = None
+
+database.init_database()
 
 # =====================================================
 # Analysis Engine & Arbitration Ruling Generator
@@ -468,70 +522,9 @@ if 'audit_log' not in st.session_state:
 def analyze_case_evidence(case_data):
     """
     מנגנון ניתוח ראיות - מנתח את התיק ומחלץ עובדות מרכזיות
+    (the rules live in the evidence_rules table, see evidence_analyzer.py)
     """
-    import re
-
-    analysis = {
-        'agreed_facts': [],
-        'disputed_points': [],
-        'key_findings': [],
-        'legal_basis': []
-    }
-
-    # חילוץ עובדות מתביעת התובע
-    if 'claimant' in case_data and case_data['claimant']:
-        claim_text = case_data['claimant'].get('claim_text', '')
-
-        # חיפוש תאריכים
-        dates = re.findall(r'\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}', claim_text)
-        if dates:
-            analysis['agreed_facts'].append(f"תאריכים רלוונטיים: {', '.join(dates)}")
-
-        # חיפוש סכומים כספיים
-        amounts = re.findall(r'₪?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*₪?', claim_text)
-        if amounts:
-            analysis['agreed_facts'].append(f"סכומים נזכרים: {', '.join(amounts)}")
-
-        # זיהוי נקודות מפתח בתביעה
-        if 'חוזה' in claim_text or 'הסכם' in claim_text:
-            analysis['key_findings'].append("קיומו של הסכם חוזי בין הצדדים")
-        if 'הפרה' in claim_text or 'הפר' in claim_text:
-            analysis['key_findings'].append("טענה להפרת התחייבות חוזית")
-        if 'נזק' in claim_text or 'נזקים' in claim_text:
-            analysis['key_findings'].append("טענה לנזקים שנגרמו לתובע")
-
-    # ניתוח כתב הגנה
-    if 'defendant' in case_data and case_data['defendant']:
-        defense_text = case_data['defendant'].get('defense_text', '')
-
-        # זיהוי טענות הגנה
-        if 'מכחיש' in defense_text or 'כופר' in defense_text or 'לא נכון' in defense_text:
-            analysis['disputed_points'].append("הנתבע מכחיש את טענות התובע")
-        if 'מאשר' in defense_text or 'מודה' in defense_text:
-            analysis['disputed_points'].append("הנתבע מאשר חלק מהטענות")
-        if 'ראיה' in defense_text or 'ראיות' in defense_text:
-            analysis['disputed_points'].append("הנתבע הציג ראיות נגדיות")
-
-    # ניתוח כתב תשובה (אם קיים)
-    if 'rebuttal' in case_data and case_data['rebuttal']:
-        rebuttal_text = case_data['rebuttal'].get('text', '')
-        if 'סותר' in rebuttal_text or 'מפריך' in rebuttal_text:
-            analysis['disputed_points'].append("התובע מפריך את טענות ההגנה")
-
-    # בדיקת עמידה בתנאי התקנון
-    analysis['legal_basis'].append("התיק עומד בתנאי סף לבוררות על פי חוק הבוררות, התשכ\"ח-1968")
-    analysis['legal_basis'].append("שני הצדדים אישרו את סמכות הבורר והסכימו לתקנון Resolve AI")
-
-    # ספירת קבצי ראיות
-    claimant_evidence_count = len(case_data.get('claimant', {}).get('evidence_files', []))
-    defendant_evidence_count = len(case_data.get('defendant', {}).get('evidence_files', []))
-
-    if claimant_evidence_count > 0:
-        analysis['key_findings'].append(f"התובע הגיש {claimant_evidence_count} קבצי ראיות")
-    if defendant_evidence_count > 0:
-        analysis['key_findings'].append(f"הנתבע הגיש {defendant_evidence_count} קבצי ראיות")
-
-    return analysis
+    return evidence_analyzer.analyze_case_evidence(case_data)
 
 
 def generate_arbitration_ruling(case_id, case_data):
@@ -564,15 +557,8 @@ def render_arbitration_ruling(ruling):
     """
     מציג את פסק הבוררות בפורמט מעוצב
     """
-    import base64
-
-    # Read and encode logo for embedding
-    logo_base64 = ""
-    try:
-        with open("logo.png", "rb") as f:
-            logo_base64 = base64.b64encode(f.read()).decode()
-    except FileNotFoundError:
-        pass
+    # Encoded logo for embedding (cached per process)
+    logo_base64 = asset_base64("logo.png")
 
     logo_html = f"""
         <div style="text-align: center; margin-bottom: 30px;">
@@ -706,6 +692,53 @@ def render_arbitration_ruling(ruling):
     ), unsafe_allow_html=True)
 
 
+def render_award_status(case_id):
+    """
+    מציג את מצב הפקת פסק הבוררות (PDF) - ההפקה רצה בתהליך רקע (job_queue.py)
+    """
+    job = job_queue.get_case_job(case_id)
+    if job is None:
+        try:
+            job_queue.submit_award_job(case_id)
+        except job_queue.QueueFullError:
+            st.warning("המערכת עמוסה כרגע - הפקת מסמך פסק הבוררות תתחיל בהמשך. נסו לרענן בעוד מספר דקות.")
+            return
+        job = job_queue.get_case_job(case_id)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        if job['status'] == 'succeeded':
+            pdf_path = job['result']['pdf_path']
+            prepared = st.session_state.setdefault('prepared_downloads', set())
+            if not os.path.exists(pdf_path):
+                st.error("קובץ פסק הבוררות לא נמצא")
+            elif pdf_path not in prepared:
+                # The PDF is read only once the user asks for it, not on every rerun
+                if st.button("הכן להורדה: פסק הבוררות (PDF)", key=f"prepare_award_{case_id}",
+                             use_container_width=True):
+                    prepared.add(pdf_path)
+                    st.rerun()
+            else:
+                with open(pdf_path, "rb") as f:
+                    st.download_button(
+                        label="הורד את פסק הבוררות (PDF)",
+                        data=f.read(),
+                        file_name=f"award_{case_id}.pdf",
+                        mime="application/pdf",
+                        key=f"download_award_{case_id}",
+                        use_container_width=True
+                    )
+        elif job['status'] == 'failed':
+            st.error("הפקת מסמך פסק הבוררות נכשלה")
+            if st.button("נסה שוב", key=f"retry_award_{case_id}", use_container_width=True):
+                job_queue.submit_award_job(case_id, retry_failed=True)
+                st.rerun()
+        else:
+            st.info("מסמך פסק הבוררות בהפקה...")
+            if st.button("רענן סטטוס", key=f"refresh_award_{case_id}", use_container_width=True):
+                st.rerun()
+
+
 # =====================================================
 # Navigation Functions
 # =====================================================
@@ -808,8 +841,10 @@ def render_claimant_portal():
     # Form Container
     st.markdown('<div class="form-container">', unsafe_allow_html=True)
 
+    case = load_case(st.session_state.case_id)
+
     # Check if awaiting rebuttal
-    if st.session_state.case_stage == 'defense_submitted':
+    if case['stage'] == 'defense_submitted':
         st.markdown("""
             <div class="instruction-box">
                 <p style="font-size: 1.3rem; font-weight: 700; margin-bottom: 15px;">
@@ -822,10 +857,10 @@ def render_claimant_portal():
         """, unsafe_allow_html=True)
 
         # Display defense
-        if 'defendant' in st.session_state.case_data and st.session_state.case_data['defendant']:
+        if case['defendant']:
             st.markdown('<div class="readonly-box">', unsafe_allow_html=True)
             st.markdown("<h4>כתב הגנה של הנתבע</h4>", unsafe_allow_html=True)
-            st.markdown(f"<p>{st.session_state.case_data['defendant']['defense_text']}</p>", unsafe_allow_html=True)
+            st.markdown(f"<p>{case['defendant']['defense_text']}</p>", unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
         # Rebuttal form
@@ -862,14 +897,14 @@ def render_claimant_portal():
                     st.error("נא להזין כתב תשובה (לפחות 20 תווים)")
                 elif word_count > 500:
                     st.error("כתב התשובה חורג ממגבלת 500 המילים")
+                elif not database.submit_rebuttal(st.session_state.case_id, rebuttal_text):
+                    st.error("לא ניתן להגיש כתב תשובה בשלב זה של התיק")
                 else:
-                    # Save rebuttal
-                    st.session_state.case_data['rebuttal'] = {
-                        'text': rebuttal_text,
-                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    st.session_state.case_stage = 'rebuttal_submitted'
                     add_audit_log(st.session_state.case_id, "rebuttal_submitted", "כתב תשובה הוגש על ידי התובע")
+                    try:
+                        job_queue.submit_award_job(st.session_state.case_id)
+                    except job_queue.QueueFullError:
+                        pass  # submitted again when the locked case is displayed
                     st.success("כתב התשובה נשלח בהצלחה!")
                     st.rerun()
 
@@ -877,7 +912,7 @@ def render_claimant_portal():
         return
 
     # Check if case is locked - Generate and display arbitration ruling
-    if st.session_state.case_stage in ['rebuttal_submitted', 'locked']:
+    if case['stage'] in ['rebuttal_submitted', 'locked']:
         # סטטוס הודעה
         st.markdown("""
             <div class="instruction-box" style="background: rgba(194, 155, 64, 0.15);
@@ -894,11 +929,14 @@ def render_claimant_portal():
         """, unsafe_allow_html=True)
 
         # הפקת פסק דין
-        ruling = generate_arbitration_ruling(st.session_state.case_id, st.session_state.case_data)
+        ruling = generate_arbitration_ruling(st.session_state.case_id, case)
 
         # הצגת פסק הדין
         render_arbitration_ruling(ruling)
 
+        # מסמך פסק הבוררות (PDF)
+        render_award_status(st.session_state.case_id)
+
         # הודעת סיום
         st.markdown("""
             <div class="instruction-box" style="margin-top: 40px;">
@@ -915,7 +953,7 @@ def render_claimant_portal():
         return
 
     # Check if claim already submitted
-    if st.session_state.case_stage == 'claim_submitted':
+    if case['stage'] == 'claim_submitted':
         st.markdown("""
             <div class="success-box">
                 <div class="gold-highlight" style="font-size: 2.5rem; margin-bottom: 25px;">
@@ -1066,41 +1104,38 @@ def render_claimant_portal():
                     st.error("נא לפרט את כתב התביעה בצורה מפורטת (לפחות 50 תווים)")
                 elif not evidence_files or len(evidence_files) == 0:
                     st.error("נא להעלות לפחות קובץ ראיה אחד")
+                elif oversized_uploads([id_document, *evidence_files]):
+                    st.error(f"הקבצים הבאים חורגים מהגודל המרבי ({MAX_UPLOAD_BYTES // (1024 * 1024)}MB): "
+                             f"{', '.join(oversized_uploads([id_document, *evidence_files]))}")
                 else:
                     # Generate case ID
                     case_id = generate_case_id()
-                    st.session_state.case_id = case_id
 
                     # Save ID document
-                    id_doc_path = save_uploaded_file(id_document, case_id, "claimant_id_document")
+                    id_doc = save_uploaded_file(id_document)
 
                     # Save evidence files
                     saved_files = []
-                    for idx, file in enumerate(evidence_files):
-                        file_path = save_uploaded_file(file, case_id, f"claimant_evidence_{idx}")
-                        saved_files.append(file_path)
+                    for file in evidence_files:
+                        saved_files.append(save_uploaded_file(file))
 
                     # Save case data
-                    st.session_state.case_data = {
-                        'case_id': case_id,
-                        'claimant': {
-                            'full_name': full_name,
-                            'id_number': id_number,
-                            'email': email,
-                            'phone': phone,
-                            'id_document_path': id_doc_path,
-                            'claim_text': claim_text,
-                            'evidence_files': saved_files,
-                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        },
-                        'defendant': None,
-                        'rebuttal': None
-                    }
-
-                    st.session_state.case_stage = 'claim_submitted'
-                    add_audit_log(case_id, "claim_submitted", f"כתב תביעה הוגש על ידי {full_name}")
-                    st.success("התביעה נשלחה בהצלחה!")
-                    st.rerun()
+                    created = database.create_claim(case_id, {
+                        'full_name': full_name,
+                        'id_number': id_number,
+                        'email': email,
+                        'phone': phone,
+                        'id_document_path': id_doc['file_path'],
+                        'id_document_blob': id_doc['blob_id']
+                    }, claim_text, saved_files)
+
+                    if not created:
+                        st.error("אירעה שגיאה בשמירת התביעה, נא לנסות שוב")
+                    else:
+                        st.session_state.case_id = case_id
+                        add_audit_log(case_id, "claim_submitted", f"כתב תביעה הוגש על ידי {full_name}")
+                        st.success("התביעה נשלחה בהצלחה!")
+                        st.rerun()
     else:
         st.info("יש לאשר את התקנון והסכם הבוררות על מנת להמשיך")
 
@@ -1128,9 +1163,11 @@ def render_defendant_portal():
     # Form Container
     st.markdown('<div class="form-container">', unsafe_allow_html=True)
 
+    case = load_case(st.session_state.defendant_case_id)
+
     # Check if defense already submitted
-    if st.session_state.case_stage in ['defense_submitted', 'rebuttal_submitted', 'locked']:
-        if st.session_state.case_stage == 'defense_submitted':
+    if case['stage'] in ['defense_submitted', 'rebuttal_submitted', 'locked']:
+        if case['stage'] == 'defense_submitted':
             # מסך אישור מעודכן עם גרדיאנט מטאלי
             st.markdown("""
                 <div style="background: #0E1117;
@@ -1189,7 +1226,7 @@ def render_defendant_portal():
                         התובע יקבל אפשרות להגיש כתב תשובה, ולאחר מכן התיק יועבר לניתוח הבורר.
                     </p>
                 </div>
-            """.format(case_id=st.session_state.case_id), unsafe_allow_html=True)
+            """.format(case_id=st.session_state.defendant_case_id), unsafe_allow_html=True)
 
             # כפתור חזרה לדף הבית
             st.markdown("<br>", unsafe_allow_html=True)
@@ -1215,11 +1252,14 @@ def render_defendant_portal():
             """, unsafe_allow_html=True)
 
             # הפקת פסק דין
-            ruling = generate_arbitration_ruling(st.session_state.case_id, st.session_state.case_data)
+            ruling = generate_arbitration_ruling(st.session_state.defendant_case_id, case)
 
             # הצגת פסק הדין
             render_arbitration_ruling(ruling)
 
+            # מסמך פסק הבוררות (PDF)
+            render_award_status(st.session_state.defendant_case_id)
+
             # הודעת סיום
             st.markdown("""
                 <div class="instruction-box" style="margin-top: 40px;">
@@ -1269,10 +1309,11 @@ def render_defendant_portal():
             if st.button("אמת תיק", key="verify_case"):
                 if not case_id_input:
                     st.error("נא להזין מספר תיק")
-                elif case_id_input != st.session_state.case_id or st.session_state.case_stage != 'claim_submitted':
+                elif database.get_case_stage(case_id_input) != 'claim_submitted':
                     st.error("מספר תיק לא נמצא במערכת או התיק אינו פתוח לקבלת כתב הגנה.")
                 else:
                     st.session_state.defendant_case_verified = True
+                    st.session_state.defendant_case_id = case_id_input
                     add_audit_log(case_id_input, "defendant_accessed", "הנתבע נכנס למערכת")
                     st.success("תיק אומת בהצלחה!")
                     st.rerun()
@@ -1285,8 +1326,8 @@ def render_defendant_portal():
         # Display the claim
         st.markdown('<p class="subsection-title">כתב התביעה - תצוגה בלבד</p>', unsafe_allow_html=True)
 
-        if 'claimant' in st.session_state.case_data and st.session_state.case_data['claimant']:
-            claimant = st.session_state.case_data['claimant']
+        if case['claimant']:
+            claimant = case['claimant']
 
             st.markdown('<div class="readonly-box">', unsafe_allow_html=True)
             st.markdown("<h4>פרטי התובע</h4>", unsafe_allow_html=True)
@@ -1302,18 +1343,38 @@ def render_defendant_portal():
             st.markdown('</div>', unsafe_allow_html=True)
 
             # Show evidence files
-            if claimant.get('evidence_files'):
+            if claimant.get('evidence'):
                 st.markdown('<p class="subsection-title">נספחים של התובע</p>', unsafe_allow_html=True)
-                for idx, file_path in enumerate(claimant['evidence_files']):
-                    if os.path.exists(file_path):
-                        file_name = os.path.basename(file_path)
-                        with open(file_path, "rb") as f:
-                            st.download_button(
-                                label=f"הורד נספח {idx + 1}",
-                                data=f.read(),
-                                file_name=file_name,
-                                key=f"download_claimant_evidence_{idx}"
-                            )
+                prepared = st.session_state.setdefault('prepared_downloads', set())
+                for idx, evidence in enumerate(claimant['evidence']):
+                    download_key = f"download_claimant_evidence_{idx}"
+                    file_ref = evidence['blob_id'] or evidence['file_path']
+                    # Bytes are loaded only once the user asks for this file
+                    if file_ref not in prepared:
+                        if st.button(f"הכן להורדה: נספח {idx + 1} ({evidence['file_name']})",
+                                     key=f"prepare_{download_key}"):
+                            prepared.add(file_ref)
+                            st.rerun()
+                        continue
+
+                    if evidence['blob_id']:
+                        data = evidence_store.read_blob(evidence['blob_id'])
+                    elif os.path.exists(evidence['file_path']):
+                        # Files saved before the evidence store are served by path
+                        with open(evidence['file_path'], "rb") as f:
+                            data = f.read()
+                    else:
+                        data = None
+
+                    if data is None:
+                        st.error(f"נספח {idx + 1} אינו זמין")
+                    else:
+                        st.download_button(
+                            label=f"הורד נספח {idx + 1}",
+                            data=data,
+                            file_name=evidence['file_name'],
+                            key=download_key
+                        )
 
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -1440,32 +1501,34 @@ def render_defendant_portal():
                     st.error("נא לפרט את כתב ההגנה בצורה מפורטת (לפחות 50 תווים)")
                 elif not defense_evidence_files or len(defense_evidence_files) == 0:
                     st.error("נא להעלות לפחות קובץ ראיה אחד")
+                elif oversized_uploads([id_document, *defense_evidence_files]):
+                    st.error(f"הקבצים הבאים חורגים מהגודל המרבי ({MAX_UPLOAD_BYTES // (1024 * 1024)}MB): "
+                             f"{', '.join(oversized_uploads([id_document, *defense_evidence_files]))}")
                 else:
                     # Save ID document
-                    id_doc_path = save_uploaded_file(id_document, st.session_state.case_id, "defendant_id_document")
+                    id_doc = save_uploaded_file(id_document)
 
                     # Save evidence files
                     saved_files = []
-                    for idx, file in enumerate(defense_evidence_files):
-                        file_path = save_uploaded_file(file, st.session_state.case_id, f"defendant_evidence_{idx}")
-                        saved_files.append(file_path)
+                    for file in defense_evidence_files:
+                        saved_files.append(save_uploaded_file(file))
 
                     # Update case data with defendant info
-                    st.session_state.case_data['defendant'] = {
+                    submitted = database.submit_defense(st.session_state.defendant_case_id, {
                         'full_name': full_name,
                         'id_number': id_number,
                         'email': email,
                         'phone': phone,
-                        'id_document_path': id_doc_path,
-                        'defense_text': defense_text,
-                        'evidence_files': saved_files,
-                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-
-                    st.session_state.case_stage = 'defense_submitted'
-                    add_audit_log(st.session_state.case_id, "defense_submitted", f"כתב הגנה הוגש על ידי {full_name}")
-                    st.success("כתב ההגנה נשלח בהצלחה!")
-                    st.rerun()
+                        'id_document_path': id_doc['file_path'],
+                        'id_document_blob': id_doc['blob_id']
+                    }, defense_text, saved_files)
+
+                    if not submitted:
+                        st.error("התיק אינו פתוח לקבלת כתב הגנה.")
+                    else:
+                        add_audit_log(st.session_state.defendant_case_id, "defense_submitted", f"כתב הגנה הוגש על ידי {full_name}")
+                        st.success("כתב ההגנה נשלח בהצלחה!")
+                        st.rerun()
     else:
         st.info("יש לאשר את הסכם הבוררות על מנת להמשיך")
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark evidence analysis on large submissions:
+    - the original inline analysis (kept in test_evidence_analyzer)
+    - the rule-driven EvidenceAnalyzer
+    - incremental re-analysis after a rebuttal arrives (cached claim and defense)
+
+Usage:
+    python bench_analyzer.py [--size-kb 1024] [--runs 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import evidence_analyzer
+from test_evidence_analyzer import legacy_analyze_case_evidence
+
+WORDS = ["התובע", "הנתבע", "טוען", "כי", "ביום", "שולם", "סכום", "של", "העבודה", "לא", "בוצעה",
+         "במועד", "והצדדים", "נפגשו", "לדיון", "בנושא", "התשלום", "החודשי"]
+
+
+def make_text(size_kb, seed):
+    """Hebrew filler text with dates and amounts, keyword-free except at the very end"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < size_kb * 1024:
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.01:
+            word = f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/20{rng.randint(10, 25)}"
+        elif roll < 0.03:
+            word = f"₪ {rng.randint(1, 999)},{rng.randint(100, 999)}"
+        parts.append(word)
+        size += len(word.encode()) + 1
+    return " ".join(parts)
+
+
+def bench(label, analyze, case_data, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        analyze(case_data)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"   {label:<36} p50 {timings[len(timings) // 2] * 1000:>8.1f} ms"
+          f"   p95 {timings[int(len(timings) * 0.95) - 1] * 1000:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark evidence analysis")
+    parser.add_argument("--size-kb", type=int, default=1024, help="Size of each submission text")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per analyzer")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - Evidence Analyzer Benchmark")
+    print("=" * 70)
+
+    case_data = {
+        'claimant': {'claim_text': make_text(args.size_kb, 1) + " נזקים", 'evidence_files': ["a.pdf"]},
+        'defendant': {'defense_text': make_text(args.size_kb, 2) + " ראיות", 'evidence_files': []},
+        'rebuttal': {'text': make_text(args.size_kb, 3)},
+    }
+    analyzer = evidence_analyzer.EvidenceAnalyzer(evidence_analyzer.DEFAULT_RULES)
+    assert analyzer.analyze(case_data) == legacy_analyze_case_evidence(case_data)
+
+    print(f"\n📄 Three submissions of {args.size_kb} KB")
+    bench("inline analysis (legacy)", legacy_analyze_case_evidence, case_data, args.runs)
+    bench("EvidenceAnalyzer", analyzer.analyze, case_data, args.runs)
+
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="resolveai_bench_"), "bench.db")
+    before_rebuttal = dict(case_data, rebuttal=None)
+    evidence_analyzer.analyze_case_evidence(before_rebuttal)
+
+    # Each run sees a new rebuttal; claim and defense come from the cache
+    rebuttals = iter(range(args.runs))
+
+    def with_new_rebuttal(data):
+        data = dict(data, rebuttal={'text': f"{next(rebuttals)} " + case_data['rebuttal']['text']})
+        return evidence_analyzer.analyze_case_evidence(data)
+
+    print("\n➕ Rebuttal added to an analyzed case")
+    bench("full re-analysis (legacy)", legacy_analyze_case_evidence, case_data, args.runs)
+    bench("incremental (cached claim, defense)", with_new_rebuttal, before_rebuttal, args.runs)
+    bench("unchanged case (all cached)", evidence_analyzer.analyze_case_evidence, case_data, args.runs)
+    print(f"   cache: {evidence_analyzer.get_analyzer().stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Streamlit script itself with streamlit.testing:
+    - time to first paint (cold script run, caches empty)
+    - per-rerun script time (warm caches)
+    - what the static-asset layer saves per rerun (logo encode, CSS bytes)
+
+Run on two commits to compare before and after a change.
+
+Usage:
+    python bench_app.py [--reruns 50]
+"""
+import argparse
+import base64
+import os
+import re
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def bench_script(reruns):
+    """Cold first run, then warm reruns of the home page"""
+    print("\n🖥️  Script run time (home page)")
+
+    app = AppTest.from_file(APP_PATH, default_timeout=30)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    if app.exception:
+        print(f"   Error: {app.exception}")
+        return
+    print(f"   {'time to first paint (cold)':<34} {first * 1000:>9.1f} ms")
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"   {'rerun p50':<34} {timings[len(timings) // 2] * 1000:>9.1f} ms")
+    print(f"   {'rerun p95':<34} {timings[int(len(timings) * 0.95) - 1] * 1000:>9.1f} ms")
+
+
+def bench_assets(reruns):
+    """Per-rerun cost the asset layer removes"""
+    print("\n🖼️  Static assets")
+
+    if os.path.exists("logo.jpg"):
+        start = time.perf_counter()
+        for _ in range(reruns):
+            with open("logo.jpg", "rb") as f:
+                base64.b64encode(f.read()).decode()
+        per_run = (time.perf_counter() - start) / reruns
+        print(f"   {'logo read + encode (uncached)':<34} {per_run * 1000:>9.3f} ms/rerun")
+
+    with open(APP_PATH, encoding="utf-8") as f:
+        source = f.read()
+    match = re.search(r'APP_CSS = """(.*?)"""', source, re.DOTALL)
+    if match:
+        css = match.group(1)
+        minified = re.sub(r"\s*([{};,>])\s*", r"\1",
+                          re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL))).strip()
+        print(f"   {'CSS bytes per rerun':<34} {len(css.encode()):>9,} -> {len(minified.encode()):,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Streamlit script run time")
+    parser.add_argument("--reruns", type=int, default=50, help="Warm reruns to time")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - App Render Benchmark")
+    print("=" * 70)
+
+    os.chdir(os.path.dirname(APP_PATH))
+    bench_script(args.reruns)
+    bench_assets(args.reruns)
+
+
+if __name__ == "__main__":
+    main()
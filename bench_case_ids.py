@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark case ID allocation:
+    - IDs/sec from one process for several block sizes (target: 10,000/s)
+    - IDs/sec from several processes sharing one database
+    - bulk insert of cases with sequential versus random IDs (index locality)
+
+Usage:
+    python bench_case_ids.py [--ids 20000] [--processes 4] [--cases 200000]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import case_ids
+import database
+
+TARGET_RATE = 10000
+
+
+def fresh_database(label):
+    database.close_connections()
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix=f"resolveai_{label}_"), "bench.db")
+    database.init_database()
+    return database.DB_PATH
+
+
+def report(label, count, elapsed):
+    rate = count / elapsed if elapsed else float('inf')
+    mark = "✓" if rate >= TARGET_RATE else "✗"
+    print(f"   {label:<34} {rate:>12,.0f} IDs/s  {mark}")
+
+
+def allocate(db_path, count, block_size, queue):
+    """Child process: allocate count IDs and report the elapsed time"""
+    database.DB_PATH = db_path
+    allocator = case_ids.CaseIdAllocator(block_size=block_size)
+    start = time.perf_counter()
+    ids = [allocator.next_id() for _ in range(count)]
+    queue.put((time.perf_counter() - start, ids))
+
+
+def bench_single(count):
+    print(f"\n🔢 One process, {count:,} IDs")
+    for block_size in (1, 10, 100, 1000):
+        fresh_database("ids")
+        allocator = case_ids.CaseIdAllocator(block_size=block_size)
+        start = time.perf_counter()
+        for _ in range(count):
+            allocator.next_id()
+        report(f"block size {block_size}", count, time.perf_counter() - start)
+
+
+def bench_processes(count, processes):
+    print(f"\n🧵 {processes} processes, {count:,} IDs each")
+    for block_size in (1, 100):
+        db_path = fresh_database("ids")
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=allocate, args=(db_path, count, block_size, queue))
+                   for _ in range(processes)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        results = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        ids = [case_id for _, batch in results for case_id in batch]
+        assert len(set(ids)) == len(ids), "Duplicate IDs allocated"
+        report(f"block size {block_size} (aggregate)", len(ids), elapsed)
+
+
+def bench_insert_locality(count):
+    print(f"\n🌳 Bulk insert of {count:,} cases")
+    today = time.strftime("%Y%m%d")
+    random_ids = list({f"RA-{today}-{''.join(random.choices(string.digits, k=9))}" for _ in range(count)})
+    fresh_database("ids")
+    allocator = case_ids.CaseIdAllocator(block_size=1000)
+    sequential_ids = [allocator.next_id() for _ in range(len(random_ids))]
+
+    for label, ids in (("random IDs", random_ids), ("allocated IDs", sequential_ids)):
+        fresh_database("insert")
+        cases = [{'case_id': case_id, 'claimant_name': "יוסי כהן", 'claimant_phone': "0501234567",
+                  'claimant_email': "yossi@example.com", 'defendant_name': "דני לוי",
+                  'defendant_phone': "0527654321"} for case_id in ids]
+        start = time.perf_counter()
+        database.save_cases_bulk(cases, chunk_size=5000)
+        elapsed = time.perf_counter() - start
+        print(f"   {label:<34} {len(ids) / elapsed:>12,.0f} cases/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark case ID allocation")
+    parser.add_argument("--ids", type=int, default=20000, help="IDs per process")
+    parser.add_argument("--processes", type=int, default=4, help="Concurrent allocating processes")
+    parser.add_argument("--cases", type=int, default=200000, help="Cases for the insert comparison")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - Case ID Allocation Benchmark")
+    print("=" * 70)
+
+    bench_single(args.ids)
+    bench_processes(args.ids, args.processes)
+    bench_insert_locality(args.cases)
+
+
+if __name__ == "__main__":
+    main()
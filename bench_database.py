@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark the database layer:
+    - ops/sec of the pooled connection layer versus connect-per-call
+    - keyset case listing versus the original full-table get_all_cases
+    - memory and time of listing cases as records versus per-row dicts
+
+Usage:
+    python bench_database.py [--ops 2000] [--rows 1000000] [--record-rows 100000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+from records import Case
+
+
+def legacy_get_case(db_path, case_id):
+    """The original access pattern: open, query, close on every call"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT case_id, claimant_name, claimant_phone, claimant_email,
+               defendant_name, defendant_phone, claimant_file_path,
+               defendant_file_path, status, postal_mail_cost, submission_fee,
+               resolution_fee, terms_accepted, created_at, pdf_path
+        FROM cases
+        WHERE case_id = ?
+    """, (case_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+
+def legacy_save_case(db_path, case_id):
+    """The original write pattern: open, insert, commit, close on every call"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO cases (case_id, claimant_name, claimant_phone, claimant_email,
+                         defendant_name, defendant_phone)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (case_id, "יוסי כהן", "0501234567", "yossi@example.com", "דני לוי", "0527654321"))
+    conn.commit()
+    conn.close()
+
+
+def timed(label, func, ops):
+    """Run func(i) ops times and print the throughput"""
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    elapsed = time.perf_counter() - start
+    rate = ops / elapsed if elapsed else float('inf')
+    print(f"   {label:<40} {rate:>12,.0f} ops/sec")
+    return rate
+
+
+def bench_connections(ops):
+    """Compare connect-per-call against the pooled connection layer"""
+    print("\n🔌 Connection layer")
+
+    tmp_dir = tempfile.mkdtemp(prefix="resolveai_bench_")
+
+    # Before: a fresh connection per operation, default pragmas
+    legacy_path = os.path.join(tmp_dir, "legacy.db")
+    database.DB_PATH = legacy_path
+    database.init_database()
+    database.close_connections()
+    sqlite3.connect(legacy_path).execute("PRAGMA journal_mode=DELETE").close()
+
+    before_write = timed("save_case (connect per call)",
+                         lambda i: legacy_save_case(legacy_path, f"L-{i}"), ops)
+    before_read = timed("get_case (connect per call)",
+                        lambda i: legacy_get_case(legacy_path, f"L-{i}"), ops)
+
+    # After: the pooled, tuned connection
+    database.DB_PATH = os.path.join(tmp_dir, "pooled.db")
+    after_write = timed("save_case (pooled)", lambda i: database.save_case(
+        f"P-{i}", "יוסי כהן", "0501234567", "yossi@example.com", "דני לוי", "0527654321"), ops)
+    after_read = timed("get_case (pooled)", lambda i: database.get_case(f"P-{i}"), ops)
+
+    print(f"   Speedup: writes x{after_write / before_write:.1f}, reads x{after_read / before_read:.1f}")
+    database.close_connections()
+
+
+def populate_cases(rows):
+    """Insert synthetic cases spread over three years, in one transaction"""
+    statuses = ("Pending", "Pending", "Closed", "Awarded")
+    start = time.perf_counter()
+
+    def synthetic():
+        for i in range(rows):
+            day = random.randint(0, 3 * 365)
+            second = random.randint(0, 86399)
+            created_at = f"{2023 + day // 365}-{1 + (day % 365) // 31:02d}-{1 + (day % 365) % 28:02d} " \
+                         f"{second // 3600:02d}:{(second // 60) % 60:02d}:{second % 60:02d}"
+            yield (f"RA-{i:08d}", "יוסי כהן", f"05{random.randint(0, 99999999):08d}", "yossi@example.com",
+                   "דני לוי", f"05{random.randint(0, 99999999):08d}", random.choice(statuses), created_at)
+
+    with database.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO cases (case_id, claimant_name, claimant_phone, claimant_email,
+                               defendant_name, defendant_phone, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, synthetic())
+
+    print(f"   Inserted {rows:,} synthetic cases in {time.perf_counter() - start:.1f}s")
+
+
+def timed_once(label, func):
+    """Run func once and print its latency"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<40} {elapsed * 1000:>12,.1f} ms")
+    return result
+
+
+def bench_listing(rows):
+    """Compare keyset listing against the original unindexed full fetch"""
+    print(f"\n📄 Case listing over {rows:,} rows")
+
+    tmp_dir = tempfile.mkdtemp(prefix="resolveai_bench_")
+    database.DB_PATH = os.path.join(tmp_dir, "listing.db")
+    database.init_database()
+    populate_cases(rows)
+
+    with database.get_connection() as conn:
+        conn.execute("ANALYZE")
+    with database.get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        # Before: the original query, forced off the new index
+        timed_once("get_all_cases (original, no index)", lambda: conn.execute("""
+            SELECT case_id, claimant_name, defendant_name, status, created_at
+            FROM cases NOT INDEXED
+            ORDER BY created_at DESC
+        """).fetchall())
+
+    # After: first page, a deep page, filtered pages
+    page, cursor = timed_once("list_cases first page (50)", lambda: database.list_cases(limit=50))
+    for _ in range(200):
+        page, cursor = database.list_cases(limit=50, cursor=cursor)
+    timed_once("list_cases page 201 (50)", lambda: database.list_cases(limit=50, cursor=cursor))
+    timed_once("list_cases status='Closed' (50)", lambda: database.list_cases(limit=50, status="Closed"))
+    phone = page[0]['case_id']
+    with database.get_connection() as conn:
+        phone = conn.execute("SELECT claimant_phone FROM cases WHERE case_id = ?", (phone,)).fetchone()[0]
+    timed_once("list_cases by claimant phone", lambda: database.list_cases(claimant_phone=phone))
+    timed_once("list_cases date range (50)", lambda: database.list_cases(
+        limit=50, created_from="2024-03-01", created_to="2024-04-01"))
+
+    # Streaming export throughput
+    start = time.perf_counter()
+    exported = sum(1 for _ in database.iter_cases(batch_size=1000))
+    elapsed = time.perf_counter() - start
+    print(f"   {'iter_cases full export':<40} {exported / elapsed:>12,.0f} rows/sec")
+
+    database.close_connections()
+
+
+def legacy_list_all(columns, batch_size=500):
+    """The original listing: every row of every page mapped into a dict"""
+    cases = []
+    cursor = None
+    with database.get_connection() as conn:
+        while True:
+            where = "WHERE (created_at, case_id) < (?, ?)" if cursor else ""
+            rows = conn.execute(f"""
+                SELECT {', '.join(columns)} FROM cases {where}
+                ORDER BY created_at DESC, case_id DESC LIMIT ?
+            """, (cursor or ()) + (batch_size,)).fetchall()
+            page = [dict(zip(columns, row)) for row in rows]
+            cases.extend(page)
+            if len(rows) < batch_size:
+                return cases
+            cursor = (page[-1]['created_at'], page[-1]['case_id'])
+
+
+def measured(label, func):
+    """Print func's best-of-3 time, then the memory its result keeps alive (traced separately)"""
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+
+    elapsed = min(timings)
+    print(f"   {label:<40} {elapsed * 1000:>9,.0f} ms {retained / 2**20:>9,.1f} MB")
+    return elapsed, retained
+
+
+def bench_records(rows):
+    """Compare listing every case as dicts (before) and as slotted records (after)"""
+    print(f"\n🧾 Listing all {rows:,} cases (time, memory held by the result)")
+
+    tmp_dir = tempfile.mkdtemp(prefix="resolveai_bench_")
+    database.DB_PATH = os.path.join(tmp_dir, "records.db")
+    database.init_database()
+    populate_cases(rows)
+
+    all_columns = Case._fields
+    for label, columns in (("listing columns", database.LISTING_COLUMNS), ("all 15 columns", all_columns)):
+        before = measured(f"dicts, {label}", lambda: legacy_list_all(columns))
+        after = measured(f"records, {label}", lambda: database.get_all_cases(columns=columns))
+        print(f"   -> {after[1] / before[1]:.0%} of the memory, {after[0] / before[0]:.0%} of the time")
+    measured("records, projection (case_id, status)",
+             lambda: database.get_all_cases(columns=('case_id', 'status')))
+
+    database.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Resolve AI database layer")
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per measurement")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic cases for the listing benchmark")
+    parser.add_argument("--record-rows", type=int, default=100_000, help="Cases for the records benchmark")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - Database Benchmark")
+    print("=" * 70)
+
+    bench_connections(args.ops)
+    bench_listing(args.rows)
+    bench_records(args.record_rows)
+
+
+if __name__ == "__main__":
+    main()
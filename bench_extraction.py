@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark evidence text extraction: sequential extract_text_from_file versus
+the parallel extract_texts pipeline on a synthetic PDF/DOCX corpus
+
+Usage:
+    python bench_extraction.py [--files 200] [--pages 20] [--workers N] [--contract-pages 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from docx import Document
+
+import ai_engine
+
+PARAGRAPH = ("The defendant undertook to deliver the goods within 30 days of the order "
+             "and failed to do so, causing damages of 5,000 ILS. ")
+
+
+def build_corpus(directory, files, pages):
+    """Write an even mix of multi-page PDFs and DOCX files"""
+    paths = []
+    for i in range(files):
+        if i % 2 == 0:
+            path = os.path.join(directory, f"evidence_{i:04d}.pdf")
+            pdf = canvas.Canvas(path, pagesize=A4)
+            for page in range(pages):
+                text = pdf.beginText(40, 800)
+                for line in range(40):
+                    text.textLine(f"{i}.{page}.{line} {PARAGRAPH}"[:95])
+                pdf.drawText(text)
+                pdf.showPage()
+            pdf.save()
+        else:
+            path = os.path.join(directory, f"evidence_{i:04d}.docx")
+            doc = Document()
+            for paragraph in range(pages * 20):
+                doc.add_paragraph(f"{i}.{paragraph} {PARAGRAPH * 2}")
+            doc.save(path)
+        paths.append(path)
+    return paths
+
+
+def report(label, elapsed, results):
+    """Print throughput and per-file latency for one run"""
+    per_file = sorted(r['seconds'] for r in results) if results else [0.0]
+    errors = sum(1 for r in results if r['error'])
+    print(f"   {label:<34} {elapsed:>7.2f}s  {len(results) / elapsed:>7.1f} files/sec  "
+          f"p50 {per_file[len(per_file) // 2] * 1000:>6.0f} ms  "
+          f"p95 {per_file[int(len(per_file) * 0.95) - 1] * 1000:>6.0f} ms  errors {errors}")
+
+
+def legacy_extract_text_from_pdf(file_path):
+    """The original extraction: quadratic string concatenation over every page"""
+    text = ""
+    with open(file_path, 'rb') as file:
+        pdf_reader = ai_engine.PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    return text.strip()
+
+
+def bench_long_contract(directory, pages):
+    """Time-to-first-page, total time and peak memory on one long PDF"""
+    print(f"\n📜 Long contract ({pages} pages)")
+    path = os.path.join(directory, "contract.pdf")
+    pdf = canvas.Canvas(path, pagesize=A4)
+    for page in range(pages):
+        text = pdf.beginText(40, 800)
+        for line in range(60):
+            text.textLine(f"{page}.{line} {PARAGRAPH}"[:95])
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+
+    for label, func in (("text += (original)", legacy_extract_text_from_pdf),
+                        ("extract_text_from_pdf", ai_engine.extract_text_from_pdf)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(path)
+        elapsed = time.perf_counter() - start
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {label:<34} {elapsed:>7.2f}s  peak {peak / 1024 / 1024:>7.1f} MB")
+
+    start = time.perf_counter()
+    first_page = next(ai_engine.iter_pdf_pages(path))
+    print(f"   {'iter_pdf_pages first page':<34} {(time.perf_counter() - start) * 1000:>7.1f} ms "
+          f"({len(first_page[1])} chars)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel evidence extraction")
+    parser.add_argument("--files", type=int, default=200, help="Corpus size")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per PDF (x20 paragraphs per DOCX)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--contract-pages", type=int, default=500, help="Pages in the long-contract PDF")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - Evidence Extraction Benchmark")
+    print("=" * 70)
+
+    corpus_dir = tempfile.mkdtemp(prefix="resolveai_corpus_")
+    paths = build_corpus(corpus_dir, args.files, args.pages)
+    print(f"\n📚 Corpus: {len(paths)} files in {corpus_dir}")
+
+    # Before: one file after another on the calling thread
+    start = time.perf_counter()
+    sequential = []
+    for path in paths:
+        file_start = time.perf_counter()
+        text = ai_engine.extract_text_from_file(path, use_cache=False)
+        sequential.append({'text': text, 'seconds': time.perf_counter() - file_start, 'error': None})
+    report("sequential", time.perf_counter() - start, sequential)
+
+    # After: the process pool, cold and then warm extraction cache
+    start = time.perf_counter()
+    parallel = ai_engine.extract_texts(paths, max_workers=args.workers, use_cache=False)
+    report(f"extract_texts ({args.workers or os.cpu_count()} workers)", time.perf_counter() - start, parallel)
+
+    assert [r['text'] for r in parallel] == [r['text'] for r in sequential], "Results must match"
+
+    ai_engine.extraction_cache = ai_engine.ExtractionCache(cache_dir=os.path.join(corpus_dir, "cache"))
+    ai_engine.extract_texts(paths, max_workers=args.workers)
+    start = time.perf_counter()
+    warm = ai_engine.extract_texts(paths, max_workers=1)
+    report("warm cache (single worker)", time.perf_counter() - start, warm)
+
+    bench_long_contract(corpus_dir, args.contract_pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark arbitral award rendering: a fresh renderer per award (the original
+behaviour - styles rebuilt and logo decoded every time) versus the shared
+per-process AwardRenderer, then render_awards scaling across worker counts
+
+Usage:
+    python bench_pdf.py [--awards 200] [--max-workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ai_engine
+
+
+def bench(label, awards, render, output_dir):
+    """Render awards one after another and print throughput and latency"""
+    case_data = {'case_id': "RA-20260101-000001", 'claimant': "יוסי כהן", 'defendant': "דני לוי"}
+    analysis = ai_engine.analyze_case(case_data['claimant'], case_data['defendant'])
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(awards):
+        award_start = time.perf_counter()
+        render(case_data, analysis, os.path.join(output_dir, f"award_{i}.pdf"))
+        latencies.append(time.perf_counter() - award_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"   {label:<34} {awards / elapsed:>7.1f} awards/sec  "
+          f"p50 {latencies[len(latencies) // 2] * 1000:>6.1f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:>6.1f} ms")
+    return awards / elapsed
+
+
+def bench_scaling(awards, max_workers, output_dir):
+    """Batch throughput of render_awards at increasing worker counts"""
+    print(f"\n⚙️  render_awards scaling ({awards} awards)")
+    case_data = {'claimant': "יוסי כהן", 'defendant': "דני לוי"}
+    analysis = ai_engine.analyze_case(case_data['claimant'], case_data['defendant'])
+    jobs = [(dict(case_data, case_id=f"RA-20260101-{i:06d}"), analysis) for i in range(awards)]
+
+    workers, baseline = 1, None
+    while workers <= max_workers:
+        start = time.perf_counter()
+        results = ai_engine.render_awards(jobs, output_dir=output_dir, max_workers=workers)
+        rate = len(results) / (time.perf_counter() - start)
+        baseline = baseline or rate
+        failed = sum(1 for r in results if r['error'])
+        print(f"   {workers:>3} workers {rate:>10.1f} awards/sec  x{rate / baseline:.2f}  failed {failed}")
+        workers *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark arbitral award PDF rendering")
+    parser.add_argument("--awards", type=int, default=200, help="Awards rendered per measurement")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest pool in the scaling run")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - Award Rendering Benchmark")
+    print("=" * 70)
+    print(f"\n📄 {args.awards} awards (logo: {'yes' if os.path.exists(ai_engine.LOGO_PATH) else 'missing'})")
+
+    output_dir = tempfile.mkdtemp(prefix="resolveai_awards_")
+
+    before = bench("new renderer per award", args.awards,
+                   lambda case, analysis, path: ai_engine.AwardRenderer().render(case, analysis, path),
+                   output_dir)
+    after = bench("shared AwardRenderer", args.awards, ai_engine.generate_arbitral_award_pdf, output_dir)
+
+    print(f"   Speedup: x{after / before:.2f}")
+
+    bench_scaling(args.awards, args.max_workers, output_dir)
+
+
+if __name__ == "__main__":
+    main()
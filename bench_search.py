@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-text case search on a synthetic corpus:
+    - indexing throughput (claim + defense per case)
+    - query latency p50/p95 for rare, very common, particle-variant and multi-word queries
+
+Target: every query under 100 ms at 100,000 cases.
+
+Usage:
+    python bench_search.py [--cases 100000] [--words 120] [--runs 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import case_search
+import database
+
+VOCABULARY = ("התובע הנתבע חוזה הסכם הפרה נזק תשלום חשבונית סחורה אספקה איחור שכירות דירה משכורת "
+              "עבודה פיטורים הודעה מוקדמת ביטוח תאונה רכב תיקון קבלן שיפוץ ליקויים פיצוי החזר מקדמה "
+              "ערבות בנקאית שיק ללא כיסוי מועד שבועות חודשים ימים שקלים סכום הצעת מחיר הזמנה משלוח "
+              "פגום אחריות יצרן ספק לקוח מכתב דרישה התראה עורך דין ראיות עדות תמונות הקלטה").split()
+PARTICLES = ("", "", "", "ה", "ו", "ב", "ל", "וה", "ש", "מ")
+QUERIES = ("התובע", "ערבות בנקאית", "חוזה", "בחוזה", "הפרה נזק", "פיטורים הודעה מוקדמת", "שיק ללא כיסוי",
+           "משלוח פגום אחריות", "4471")
+
+
+# Word frequencies in real text are roughly Zipfian: a few words everywhere, most words rare
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def make_text(rng, words):
+    chosen = rng.choices(VOCABULARY, weights=WEIGHTS, k=words)
+    return " ".join(rng.choice(PARTICLES) + word for word in chosen)
+
+
+def build_index(cases, words, batch_size=5000):
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for first in range(0, cases, batch_size):
+        with database.get_connection() as conn:
+            for i in range(first, min(cases, first + batch_size)):
+                case_id = f"RA-20260101-{i:06d}"
+                claim = make_text(rng, words)
+                if i == cases // 2:
+                    claim += " חשבונית 4471"
+                case_search.index_document(conn, case_id, 'claimant', case_search.SUBMISSION_SOURCE, claim)
+                case_search.index_document(conn, case_id, 'defendant', case_search.SUBMISSION_SOURCE,
+                                           make_text(rng, words))
+    with database.get_connection() as conn:
+        conn.execute("INSERT INTO case_search (case_search) VALUES ('optimize')")
+    elapsed = time.perf_counter() - start
+    print(f"   indexed {cases:,} cases in {elapsed:.1f}s ({cases / elapsed:,.0f} cases/s)")
+
+
+def bench_queries(runs, limit):
+    print(f"\n🔍 Query latency (top {limit}, {runs} runs each)")
+    worst = 0.0
+    for query in QUERIES:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            results = case_search.search(query, limit=limit)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1000
+        p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+        worst = max(worst, p95)
+        print(f"   {query:<24} p50 {p50:>7.1f} ms   p95 {p95:>7.1f} ms   ({len(results)} results)")
+    print(f"\n   worst p95: {worst:.1f} ms {'✓' if worst < 100 else '✗'} (target < 100 ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text case search")
+    parser.add_argument("--cases", type=int, default=100000, help="Cases to index")
+    parser.add_argument("--words", type=int, default=120, help="Words per claim and defense")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("   ResolveAI - Case Search Benchmark")
+    print("=" * 70)
+
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="resolveai_search_bench_"), "bench.db")
+    database.init_database()
+    print("\n📚 Building index")
+    build_index(args.cases, args.words)
+    bench_queries(args.runs, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Bulk importer for Resolve AI - streams historic cases or users from a
+partner system (JSONL or CSV) into the database in one transaction
+
+Usage:
+    python bulk_import.py cases disputes.jsonl [--chunk-size 1000] [--db resolve_ai.db]
+    python bulk_import.py users parties.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+import database
+
+# CSV cells are strings; these columns are converted before insert
+NUMERIC_COLUMNS = ('postal_mail_cost', 'submission_fee', 'resolution_fee')
+BOOLEAN_COLUMNS = ('terms_accepted',)
+
+
+def _coerce_csv_row(row):
+    """Convert CSV strings to the types the bulk APIs expect (empty cell = default)"""
+    coerced = {}
+    for column, value in row.items():
+        if value is None or value.strip() == '':
+            coerced[column] = None
+        elif column in NUMERIC_COLUMNS:
+            coerced[column] = float(value)
+        elif column in BOOLEAN_COLUMNS:
+            coerced[column] = value.strip().lower() in ('1', 'true', 'yes', 'y')
+        else:
+            coerced[column] = value.strip()
+    return coerced
+
+
+def read_rows(path, file_format=None):
+    """
+    Lazily read rows from a JSONL or CSV file, one at a time
+
+    Args:
+        path: Input file path
+        file_format: 'jsonl' or 'csv' (default: from the file extension)
+
+    Yields:
+        dict: One row per record
+    """
+    if file_format is None:
+        file_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            for row in csv.DictReader(f):
+                yield _coerce_csv_row(row)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import cases or users into Resolve AI")
+    parser.add_argument("kind", choices=("cases", "users"), help="What the file contains")
+    parser.add_argument("path", help="JSONL or CSV input file")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Override format detection")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per executemany batch")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"Error: {args.path} not found")
+        return 1
+
+    database.DB_PATH = args.db
+
+    rejected = {'duplicates': 0, 'errors': 0}
+
+    def report(kind, index, row, reason):
+        # Streamed straight to stderr so memory stays flat on large imports
+        rejected[kind] += 1
+        label = "duplicate" if kind == 'duplicates' else "invalid"
+        print(f"row {index + 1}: {label} - {reason}", file=sys.stderr)
+
+    bulk_insert = database.save_cases_bulk if args.kind == 'cases' else database.create_users_bulk
+    result = bulk_insert(read_rows(args.path, args.format), chunk_size=args.chunk_size, on_reject=report)
+
+    print(f"Imported {result['inserted']} {args.kind}: "
+          f"{rejected['duplicates']} duplicates, {rejected['errors']} invalid rows skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Case ID allocation for Resolve AI - collision-free, time-ordered IDs
+
+IDs look like RA-YYYYMMDD-NNNNNN: the day, then a per-day sequence number.
+Each process reserves a block of numbers from the id_sequences table in one
+write transaction and hands them out from memory, so allocation needs no
+collision check and no retry loop, and IDs sort by the day they were issued
+(cases.case_id inserts stay at the right edge of the primary key index).
+
+A day's sequence starts above any case ID of that day already in the
+database (e.g. older randomly generated IDs). Past 999999 IDs a day the
+number simply grows a digit; IDs remain unique.
+"""
+import os
+import threading
+from datetime import datetime
+
+import database
+
+PREFIX = "RA"
+# Numbers reserved per transaction; unused numbers are skipped when a process exits
+BLOCK_SIZE = 100
+
+
+def _format(prefix, day, value):
+    return f"{prefix}-{day}-{value:06d}"
+
+
+def _highest_existing(conn, prefix, day):
+    """Largest sequence number among the day's case IDs (0 if none)"""
+    low = f"{prefix}-{day}-"
+    row = conn.execute("""
+        SELECT MAX(CAST(substr(case_id, ?) AS INTEGER))
+        FROM cases
+        WHERE case_id >= ? AND case_id < ?
+    """, (len(low) + 1, low, low[:-1] + chr(ord("-") + 1))).fetchone()
+    return row[0] or 0
+
+
+def reserve_block(prefix, day, block_size):
+    """
+    Reserve the next block of sequence numbers
+
+    The sequence never goes back a day: a process whose clock is behind gets
+    numbers from the latest day already in use.
+
+    Args:
+        prefix: ID prefix, also the sequence name
+        day: The caller's current day (YYYYMMDD)
+        block_size: Numbers to reserve
+
+    Returns:
+        tuple: (day, first, last) - the block is first..last inclusive
+    """
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT day, last_value FROM id_sequences WHERE name = ?", (prefix,)).fetchone()
+        if row is not None and row[0] >= day:
+            day, last = row
+        else:
+            last = _highest_existing(conn, prefix, day)
+
+        conn.execute("""
+            INSERT INTO id_sequences (name, day, last_value) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET day = excluded.day, last_value = excluded.last_value
+        """, (prefix, day, last + block_size))
+
+    return day, last + 1, last + block_size
+
+
+class CaseIdAllocator:
+    """
+    Thread-safe allocator handing out IDs from reserved blocks
+
+    A forked child or a switch of database.DB_PATH drops the inherited block,
+    so two processes never share numbers.
+    """
+
+    def __init__(self, prefix=PREFIX, block_size=BLOCK_SIZE, clock=datetime.now):
+        self.prefix = prefix
+        self.block_size = block_size
+        self.clock = clock
+        self.reservations = 0
+        self._lock = threading.Lock()
+        self._owner = None
+        self._day = None
+        self._next = 1
+        self._last = 0
+
+    def next_id(self):
+        """Return a new case ID"""
+        day = self.clock().strftime("%Y%m%d")
+        owner = (os.getpid(), database.DB_PATH)
+
+        with self._lock:
+            if self._owner != owner or self._next > self._last or day > self._day:
+                self._day, self._next, self._last = reserve_block(self.prefix, day, self.block_size)
+                self._owner = owner
+                self.reservations += 1
+            value = self._next
+            self._next += 1
+            return _format(self.prefix, self._day, value)
+
+
+# Process-wide allocator used by app.py and ai_engine.py
+allocator = CaseIdAllocator()
+
+
+def next_case_id():
+    """Return a new RA-YYYYMMDD-NNNNNN case ID from the shared allocator"""
+    return allocator.next_id()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Case search for Resolve AI - SQLite FTS5 full-text search over case content
+
+Claims, defenses and rebuttals are indexed when they are submitted (in the
+same transaction, see database._insert_submission). Evidence text is
+indexed from extract_text_from_file by the background award job, or with
+the reindex command. Submissions made before the index existed are picked
+up by running reindex once after upgrading.
+
+Hebrew handling:
+    - niqqud and cantillation marks are stripped before indexing and querying
+    - geresh/gershayim stay inside tokens (עו״ד, ס׳)
+    - a light stemmer drops up to two attached particles (ו, ה, ב, כ, ל, מ, ש)
+      from both indexed and query words, so "חוזה" also finds "בחוזה" and
+      "והחוזה". It cannot tell a particle from a root letter, so some words
+      collide ("משלוח" and "לוח"); recall on inflected forms is worth more
+      to case search than that loss of precision.
+    - the index holds the stemmed text while snippets are cut from the
+      original: stemming only shortens words, never removes one, so token
+      positions line up.
+
+Usage:
+    python case_search.py search "הפרת חוזה" [--limit 20]
+    python case_search.py reindex [--evidence]
+"""
+import argparse
+import re
+import sys
+import unicodedata
+
+import database
+
+SUBMISSION_SOURCE = "submission"
+EVIDENCE_SOURCE = "evidence:"
+
+# Points, cantillation and other combining marks of the Hebrew block (not maqaf, paseq, sof pasuq)
+_HEBREW_MARKS = re.compile("[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+_QUERY_TOKEN = re.compile(r"[\w״׳]+")
+
+# Particles that attach to the start of a Hebrew word. A second one is only
+# stripped after ו, ש, כ or מ (וה, שב, כש, מה...), and never below MIN_STEM_LENGTH letters
+HEBREW_PARTICLES = "והבכלמש"
+LEADING_PARTICLES = "ושכמ"
+MIN_STEM_LENGTH = 3
+
+# Queries matching more documents than this are ranked among the newest ones
+RANK_WINDOW = 10000
+
+_HEBREW_RUN = re.compile("(?<![\\w״׳])[\u05D0-\u05EA]{%d,}" % (MIN_STEM_LENGTH + 1))
+
+
+def normalize_text(text):
+    """Strip Hebrew points and marks (also from presentation forms like שׁ)"""
+    decomposed = unicodedata.normalize("NFD", text)
+    return unicodedata.normalize("NFC", _HEBREW_MARKS.sub("", decomposed))
+
+
+def _stem_word(word):
+    if word[0] not in HEBREW_PARTICLES or len(word) <= MIN_STEM_LENGTH:
+        return word
+    first, word = word[0], word[1:]
+    if (first in LEADING_PARTICLES and word[0] in HEBREW_PARTICLES and word[0] != "ו"
+            and len(word) > MIN_STEM_LENGTH):
+        word = word[1:]
+    return word
+
+
+def stem_text(text):
+    """Light-stem every Hebrew word of normalized text (the indexed form)"""
+    return _HEBREW_RUN.sub(lambda m: _stem_word(m.group(0)), text)
+
+
+def index_document(conn, case_id, role, source, body, title=None):
+    """
+    Add or replace one document in the index
+
+    Args:
+        conn: Open connection (the caller's transaction is used)
+        case_id: Case the document belongs to
+        role: 'claimant', 'defendant' or 'rebuttal'
+        source: SUBMISSION_SOURCE, or EVIDENCE_SOURCE + blob id / file path
+        body: Document text
+        title: Display name (e.g. the evidence file name)
+
+    Returns:
+        int: The document's doc_id
+    """
+    body = normalize_text(body or "")
+    existing = conn.execute("""
+        SELECT doc_id, body FROM search_documents WHERE case_id = ? AND role = ? AND source = ?
+    """, (case_id, role, source)).fetchone()
+
+    if existing is None:
+        doc_id = conn.execute("""
+            INSERT INTO search_documents (case_id, role, source, title, body) VALUES (?, ?, ?, ?, ?)
+        """, (case_id, role, source, title, body)).lastrowid
+    else:
+        doc_id = existing[0]
+        # External-content index: removal needs the exact terms that were indexed
+        conn.execute("INSERT INTO case_search (case_search, rowid, body) VALUES ('delete', ?, ?)",
+                     (doc_id, stem_text(existing[1])))
+        conn.execute("UPDATE search_documents SET title = ?, body = ? WHERE doc_id = ?", (title, body, doc_id))
+
+    conn.execute("INSERT INTO case_search (rowid, body) VALUES (?, ?)", (doc_id, stem_text(body)))
+    return doc_id
+
+
+def index_case_evidence(case_id, extract=None, force=False):
+    """
+    Index the extracted text of a case's evidence files
+
+    Args:
+        case_id: Case whose evidence to index
+        extract: Function (file_path, file_name) -> text (default
+                 ai_engine.extract_text_from_file, which serves repeat files
+                 from the extraction cache). Evidence blobs have no extension,
+                 so the type comes from the uploaded file name.
+        force: Re-index files that are already in the index
+
+    Returns:
+        int: Number of files indexed
+    """
+    database._ensure_schema()
+
+    # PDF/Word parsing is only needed by workers, not by the portal
+    import ai_engine
+    if extract is None:
+        extract = ai_engine.extract_text_from_file
+
+    with database.get_connection() as conn:
+        files = conn.execute("""
+            SELECT e.role, e.file_path, e.blob_id, e.file_name, d.doc_id
+            FROM case_evidence e
+            LEFT JOIN search_documents d
+                ON d.case_id = e.case_id AND d.role = e.role
+                AND d.source = ? || COALESCE(e.blob_id, e.file_path)
+            WHERE e.case_id = ?
+            ORDER BY e.role, e.position
+        """, (EVIDENCE_SOURCE, case_id)).fetchall()
+
+    indexed = 0
+    for role, file_path, blob_id, file_name, doc_id in files:
+        if doc_id is not None and not force:
+            continue
+        try:
+            text = extract(file_path, file_name=file_name)
+        except Exception as e:
+            print(f"Warning: could not extract {file_path} for search: {e}")
+            continue
+        if not text or text.startswith(ai_engine.EXTRACTION_ERROR_PREFIXES):
+            # "[Unsupported file format...]" and the like are not content
+            continue
+
+        with database.get_connection() as conn:
+            index_document(conn, case_id, role, EVIDENCE_SOURCE + (blob_id or file_path), text,
+                           title=file_name)
+        indexed += 1
+
+    return indexed
+
+
+def build_query(text):
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every word must match an indexed word after stemming. User input is
+    quoted, so FTS5 operators in it are searched for literally.
+
+    Returns:
+        str: The MATCH expression, or None if the text has no words
+    """
+    terms = _QUERY_TOKEN.findall(stem_text(normalize_text(text)))
+    return " AND ".join(f'"{term}"' for term in terms) or None
+
+
+def search(text, limit=20, case_id=None, role=None, highlight=("**", "**"), snippet_tokens=16):
+    """
+    Ranked full-text search
+
+    Args:
+        text: Free-text query
+        limit: Maximum number of results
+        case_id: Only search this case (optional)
+        role: Only search this role's documents (optional)
+        highlight: Markers placed around matched words in the snippet
+        snippet_tokens: Approximate snippet length in words
+
+    Returns:
+        list: Dicts with case_id, role, source, title, snippet and score
+              (BM25, higher is better), best match first
+    """
+    database._ensure_schema()
+
+    match = build_query(text)
+    if match is None:
+        return []
+
+    filters = ""
+    params = [highlight[0], highlight[1], snippet_tokens, match]
+    if case_id is not None:
+        filters += " AND d.case_id = ?"
+        params.append(case_id)
+    if role is not None:
+        filters += " AND d.role = ?"
+        params.append(role)
+
+    with database.get_connection() as conn:
+        if case_id is None:
+            # BM25 is computed for every match; for very common words, rank the newest RANK_WINDOW
+            oldest = conn.execute("""
+                SELECT rowid FROM case_search WHERE case_search MATCH ?
+                ORDER BY rowid DESC LIMIT 1 OFFSET ?
+            """, (match, RANK_WINDOW - 1)).fetchone()
+            if oldest is not None:
+                filters += " AND case_search.rowid >= ?"
+                params.append(oldest[0])
+        params.append(limit)
+
+        rows = conn.execute(f"""
+            SELECT d.case_id, d.role, d.source, d.title,
+                   snippet(case_search, 0, ?, ?, '…', ?), rank
+            FROM case_search
+            JOIN search_documents d ON d.doc_id = case_search.rowid
+            WHERE case_search MATCH ?{filters}
+            ORDER BY rank
+            LIMIT ?
+        """, params).fetchall()
+
+    return [{'case_id': row[0], 'role': row[1], 'source': row[2], 'title': row[3], 'snippet': row[4],
+             'score': -row[5]} for row in rows]
+
+
+def reindex(evidence=False):
+    """
+    Rebuild the index, re-reading submissions (and optionally re-extracting evidence)
+
+    Returns:
+        dict: Number of submissions and evidence files indexed
+    """
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        # Re-stem everything (FTS5 'rebuild' would index the unstemmed content table)
+        conn.execute("INSERT INTO case_search (case_search) VALUES ('delete-all')")
+        for doc_id, body in conn.execute("SELECT doc_id, body FROM search_documents").fetchall():
+            conn.execute("INSERT INTO case_search (rowid, body) VALUES (?, ?)", (doc_id, stem_text(body)))
+
+        submissions = conn.execute("SELECT case_id, role, body FROM case_submissions").fetchall()
+        for case_id, role, body in submissions:
+            index_document(conn, case_id, role, SUBMISSION_SOURCE, body)
+        conn.execute("INSERT INTO case_search (case_search) VALUES ('optimize')")
+
+    indexed = {'submissions': len(submissions), 'evidence': 0}
+    if evidence:
+        with database.get_connection() as conn:
+            case_ids = [row[0] for row in conn.execute("SELECT DISTINCT case_id FROM case_evidence")]
+        for case_id in case_ids:
+            indexed['evidence'] += index_case_evidence(case_id, force=True)
+    return indexed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search Resolve AI case content")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_parser = commands.add_parser("search", help="Ranked full-text search")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=20)
+    reindex_parser = commands.add_parser("reindex", help="Rebuild the index")
+    reindex_parser.add_argument("--evidence", action="store_true", help="Also extract and index evidence")
+    args = parser.parse_args(argv)
+
+    database.DB_PATH = args.db
+    if args.command == "search":
+        for result in search(args.query, limit=args.limit):
+            source = result['title'] or result['role']
+            print(f"{result['case_id']}  {source}  ({result['score']:.2f})\n    {result['snippet']}")
+    else:
+        indexed = reindex(evidence=args.evidence)
+        print(f"Indexed {indexed['submissions']} submissions and {indexed['evidence']} evidence files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,113 @@
 """
 Database module for Resolve AI - User registration and case management
 """
+import json
+import re
 import sqlite3
+from itertools import islice
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 import os
 
+from identity import normalize_email, normalize_phone
+from lookup_cache import LookupCache
+from records import Case, User, projection
+
 DB_PATH = "resolve_ai.db"
 
-def init_database():
-    """Initialize the database and create tables if they don't exist"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+# Pragmas applied once to every pooled connection
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),        # readers never block the writer
+    ("synchronous", "NORMAL"),      # safe with WAL, avoids an fsync per commit
+    ("cache_size", -16000),         # 16 MB page cache (negative value = KiB)
+    ("mmap_size", 268435456),       # 256 MB memory-mapped reads
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", 5000),         # wait up to 5s for a competing writer
+)
+
+# Per-thread connection pool: {db_path: [connection, pid, depth]}
+_local = threading.local()
+
+def _open_connection(db_path):
+    """Open a new SQLite connection and apply the tuning pragmas"""
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    for pragma, value in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}={value}")
+    return conn
+
+def _pool_entry(db_path):
+    """Return this thread's pool entry for db_path, opening a connection on first use"""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+
+    entry = pool.get(db_path)
+    # A connection inherited across fork() must never be reused by the child
+    if entry is None or entry[1] != os.getpid():
+        entry = pool[db_path] = [_open_connection(db_path), os.getpid(), 0]
+    return entry
+
+@contextmanager
+def get_connection(db_path=None):
+    """
+    Borrow this thread's long-lived connection to DB_PATH
+
+    The outermost block commits on success and rolls back on error, so
+    nested blocks share a single transaction.
+
+    Args:
+        db_path: Database file to use instead of DB_PATH (optional)
 
+    Yields:
+        sqlite3.Connection: The pooled connection
+    """
+    entry = _pool_entry(db_path or DB_PATH)
+    conn = entry[0]
+    entry[2] += 1
+    try:
+        yield conn
+        if entry[2] == 1:
+            conn.commit()
+    except BaseException:
+        if entry[2] == 1:
+            conn.rollback()
+        raise
+    finally:
+        entry[2] -= 1
+
+def close_connections():
+    """Close every pooled connection owned by the calling thread"""
+    pool = getattr(_local, 'pool', None)
+    if not pool:
+        return
+
+    for conn, pid, _depth in pool.values():
+        if pid == os.getpid():
+            conn.close()
+    pool.clear()
+    # A reopened connection starts its own data_version count
+    getattr(_local, 'data_versions', {}).clear()
+
+# =====================================================
+# Schema Migrations
+# =====================================================
+def _column_names(conn, table):
+    """Return the set of column names of a table"""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _add_column(conn, table, column, declaration):
+    """Add a column unless it already exists (tables created before the migration runner)"""
+    if column not in _column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+def _migration_1_base_tables(conn):
+    """Create the users and cases tables"""
     # Users table
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             full_name TEXT NOT NULL,
@@ -26,8 +120,8 @@ def init_database():
         )
     """)
 
-    # Cases table (updated with more fields)
-    cursor.execute("""
+    # Cases table
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS cases (
             case_id TEXT PRIMARY KEY,
             claimant_name TEXT NOT NULL,
@@ -40,15 +134,523 @@ def init_database():
             status TEXT DEFAULT 'Pending',
             postal_mail_cost REAL DEFAULT 35.0,
             submission_fee REAL DEFAULT 120.0,
-            resolution_fee REAL DEFAULT 200.0,
             terms_accepted BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            pdf_path TEXT
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def _migration_2_case_fee_and_pdf(conn):
+    """Add the resolution fee and generated award path to cases"""
+    _add_column(conn, "cases", "resolution_fee", "REAL DEFAULT 200.0")
+    _add_column(conn, "cases", "pdf_path", "TEXT")
+
+def _migration_3_case_listing_indexes(conn):
+    """Index cases for keyset pagination on (created_at, case_id)"""
+    # Covers the unfiltered listing entirely, no table lookups needed
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cases_created
+        ON cases (created_at, case_id, claimant_name, defendant_name, status)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cases_status_created
+        ON cases (status, created_at, case_id, claimant_name, defendant_name)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cases_claimant_phone
+        ON cases (claimant_phone, created_at, case_id)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cases_defendant_phone
+        ON cases (defendant_phone, created_at, case_id)
+    """)
+
+def _migration_4_case_lifecycle(conn):
+    """Store the portal's case lifecycle: stage, submissions, evidence and audit log"""
+    # NULL for cases that did not come through the portal (legacy rows,
+    # save_case, save_cases_bulk); create_claim sets 'claim_submitted'
+    _add_column(conn, "cases", "stage", "TEXT")
+
+    # One row per submission: the claim, the defense and the rebuttal
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS case_submissions (
+            case_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            full_name TEXT,
+            id_number TEXT,
+            email TEXT,
+            phone TEXT,
+            id_document_path TEXT,
+            body TEXT NOT NULL,
+            submitted_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (case_id, role)
+        ) WITHOUT ROWID
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS case_evidence (
+            case_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            file_path TEXT NOT NULL,
+            PRIMARY KEY (case_id, role, position)
+        ) WITHOUT ROWID
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_events (
+            id INTEGER PRIMARY KEY,
+            case_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            description TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_audit_events_case
+        ON audit_events (case_id, created_at, id)
+    """)
+
+def _migration_5_append_only_audit(conn):
+    """Reject updates and deletes on audit_events"""
+    for action in ("UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS audit_events_no_{action.lower()}
+            BEFORE {action} ON audit_events
+            BEGIN
+                SELECT RAISE(ABORT, 'audit_events is append-only');
+            END
+        """)
+
+def _migration_6_job_queue(conn):
+    """Create the background job queue (see job_queue.py)"""
+    # Scheduling columns are epoch seconds so backoff is plain arithmetic
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            case_id TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after REAL NOT NULL,
+            locked_by TEXT,
+            locked_at REAL,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    # Workers claim the oldest runnable job; depth checks count by status
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after
+        ON jobs (status, run_after, id)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_case ON jobs (case_id)")
+
+def _migration_7_evidence_store(conn):
+    """Reference-counted evidence blobs (see evidence_store.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS evidence_blobs (
+            blob_id TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_evidence_blobs_unreferenced
+        ON evidence_blobs (refcount, created_at)
+    """)
+
+    # The manifest: which case, role and slot reference each blob
+    _add_column(conn, "case_evidence", "blob_id", "TEXT")
+    _add_column(conn, "case_evidence", "file_name", "TEXT")
+    _add_column(conn, "case_submissions", "id_document_blob", "TEXT")
+
+    # Reference counts follow the manifest rows inside the same transaction
+    for table, column in (("case_evidence", "blob_id"), ("case_submissions", "id_document_blob")):
+        for action, row, delta in (("INSERT", "NEW", "+ 1"), ("DELETE", "OLD", "- 1")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_blob_ref_{action.lower()}
+                AFTER {action} ON {table}
+                WHEN {row}.{column} IS NOT NULL
+                BEGIN
+                    UPDATE evidence_blobs SET refcount = refcount {delta} WHERE blob_id = {row}.{column};
+                END
+            """)
+
+def _migration_8_evidence_rules(conn):
+    """Versioned evidence finding rules and per-document analysis results (see evidence_analyzer.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS evidence_rules (
+            document TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            keywords TEXT NOT NULL,
+            section TEXT NOT NULL,
+            finding TEXT NOT NULL,
+            PRIMARY KEY (document, position)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS document_analyses (
+            document TEXT NOT NULL,
+            text_sha256 TEXT NOT NULL,
+            rules_fingerprint TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (document, text_sha256, rules_fingerprint)
+        ) WITHOUT ROWID
+    """)
+
+    # Seed with the rules as they were at this migration; a migration must not
+    # change meaning when evidence_analyzer.DEFAULT_RULES is edited later
+    seed_rules = (
+        ('claimant', 0, ('חוזה', 'הסכם'), 'key_findings', "קיומו של הסכם חוזי בין הצדדים"),
+        ('claimant', 1, ('הפרה', 'הפר'), 'key_findings', "טענה להפרת התחייבות חוזית"),
+        ('claimant', 2, ('נזק', 'נזקים'), 'key_findings', "טענה לנזקים שנגרמו לתובע"),
+        ('defendant', 0, ('מכחיש', 'כופר', 'לא נכון'), 'disputed_points', "הנתבע מכחיש את טענות התובע"),
+        ('defendant', 1, ('מאשר', 'מודה'), 'disputed_points', "הנתבע מאשר חלק מהטענות"),
+        ('defendant', 2, ('ראיה', 'ראיות'), 'disputed_points', "הנתבע הציג ראיות נגדיות"),
+        ('rebuttal', 0, ('סותר', 'מפריך'), 'disputed_points', "התובע מפריך את טענות ההגנה"),
+    )
+    conn.executemany("""
+        INSERT OR IGNORE INTO evidence_rules (document, position, keywords, section, finding)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(document, position, json.dumps(list(keywords), ensure_ascii=False), section, finding)
+          for document, position, keywords, section, finding in seed_rules])
+
+    # Any rule change bumps evidence_rules_version, so processes reload the table
+    conn.execute("""
+        INSERT OR IGNORE INTO schema_meta (key, value) VALUES ('evidence_rules_version', '1')
+    """)
+    for action in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS evidence_rules_version_{action.lower()}
+            AFTER {action} ON evidence_rules
+            BEGIN
+                INSERT INTO schema_meta (key, value) VALUES ('evidence_rules_version', '1')
+                ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+            END
+        """)
+
+def _migration_9_analysis_cache(conn):
+    """Model analyses keyed by normalized case hash (see analysis_backend.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            case_hash TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            analysis TEXT NOT NULL,
+            input_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+def _migration_10_id_sequences(conn):
+    """Per-day ID sequences handed out in blocks (see case_ids.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS id_sequences (
+            name TEXT PRIMARY KEY,
+            day TEXT NOT NULL,
+            last_value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+def _migration_11_case_search(conn):
+    """Full-text index over submissions and evidence text (see case_search.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_documents (
+            doc_id INTEGER PRIMARY KEY,
+            case_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            source TEXT NOT NULL,
+            title TEXT,
+            body TEXT NOT NULL,
+            UNIQUE (case_id, role, source)
+        )
+    """)
+    # The index holds light-stemmed text; snippets come from the original
+    # body in search_documents. Geresh/gershayim stay inside tokens (עו״ד).
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS case_search USING fts5(
+            body,
+            content = 'search_documents',
+            content_rowid = 'doc_id',
+            tokenize = "unicode61 remove_diacritics 2 tokenchars '״׳'"
+        )
+    """)
+    # Submissions made before this migration are indexed by the separate
+    # `case_search.py reindex` step: the migration must not run the live
+    # stemmer, whose output can change after this version ships
+
+def _migration_12_lookup_version(conn):
+    """Change counter for cases and users, read by the lookup caches of every process"""
+    conn.execute("""
+        INSERT OR IGNORE INTO schema_meta (key, value) VALUES ('lookup_version', '1')
+    """)
+    for table in ("cases", "users"):
+        for action in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_lookup_version_{action.lower()}
+                AFTER {action} ON {table}
+                BEGIN
+                    INSERT INTO schema_meta (key, value) VALUES ('lookup_version', '1')
+                    ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+                END
+            """)
+
+# Users normalized per batch by the identity backfill
+IDENTITY_BACKFILL_BATCH = 1000
+
+def _migration_13_user_identity(conn):
+    """Normalized, indexed email and phone for user lookups (see identity.py)"""
+    _add_column(conn, "users", "email_norm", "TEXT")
+    _add_column(conn, "users", "phone_e164", "TEXT")
+
+    # The normalization as it was at this migration; a migration must not
+    # change meaning when identity.py is edited later
+    def email_at_v13(email):
+        return (email or "").strip().lower() or None
+
+    def phone_at_v13(phone):
+        phone = (phone or "").strip()
+        digits = re.sub(r"\D", "", phone)
+        if not digits:
+            return None
+        if phone.startswith("+"):
+            return "+" + digits
+        if digits.startswith("00"):
+            return "+" + digits[2:]
+        if digits.startswith("0"):
+            return "+972" + digits[1:]
+        if digits.startswith("972") and len(digits) > 10:
+            return "+" + digits
+        return "+972" + digits
+
+    # Stream through existing users by id, one bounded batch at a time
+    last_id = 0
+    while True:
+        rows = conn.execute("""
+            SELECT id, email, phone FROM users WHERE id > ? ORDER BY id LIMIT ?
+        """, (last_id, IDENTITY_BACKFILL_BATCH)).fetchall()
+        if not rows:
+            break
+        conn.executemany("UPDATE users SET email_norm = ?, phone_e164 = ? WHERE id = ?",
+                         [(email_at_v13(email), phone_at_v13(phone), user_id)
+                          for user_id, email, phone in rows])
+        last_id = rows[-1][0]
+
+    # Built after the backfill rather than maintained row by row during it.
+    # Not UNIQUE: older rows may already hold two spellings of one identity.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email_norm ON users (email_norm)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_phone_e164 ON users (phone_e164)")
+
+def _migration_14_case_state_version(conn):
+    """Bump lookup_version on submission and evidence writes too (cached load_case_state)"""
+    for table in ("case_submissions", "case_evidence"):
+        for action in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_lookup_version_{action.lower()}
+                AFTER {action} ON {table}
+                BEGIN
+                    INSERT INTO schema_meta (key, value) VALUES ('lookup_version', '1')
+                    ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
+                END
+            """)
+
+# Ordered (version, description, migration). Append new entries; never edit applied ones.
+MIGRATIONS = [
+    (1, "Create users and cases tables", _migration_1_base_tables),
+    (2, "Add resolution_fee and pdf_path to cases", _migration_2_case_fee_and_pdf),
+    (3, "Add case listing indexes", _migration_3_case_listing_indexes),
+    (4, "Add case lifecycle tables", _migration_4_case_lifecycle),
+    (5, "Make audit_events append-only", _migration_5_append_only_audit),
+    (6, "Add background job queue", _migration_6_job_queue),
+    (7, "Add reference-counted evidence store", _migration_7_evidence_store),
+    (8, "Add evidence rules and analysis cache", _migration_8_evidence_rules),
+    (9, "Add model analysis cache", _migration_9_analysis_cache),
+    (10, "Add ID sequences", _migration_10_id_sequences),
+    (11, "Add full-text case search", _migration_11_case_search),
+    (12, "Add lookup cache version counter", _migration_12_lookup_version),
+    (13, "Add normalized user identity columns", _migration_13_user_identity),
+    (14, "Track case submission changes in lookup_version", _migration_14_case_state_version),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Database files already migrated by this process
+_migrated_paths = set()
+_migration_lock = threading.Lock()
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database (0 if never migrated)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
         )
     """)
+    row = conn.execute("SELECT value FROM schema_meta WHERE key = 'schema_version'").fetchone()
+    return int(row[0]) if row else 0
+
+def migrate(conn):
+    """
+    Apply every pending migration in a single write transaction
+
+    BEGIN IMMEDIATE takes the write lock up front, so concurrent processes
+    starting at the same time apply each migration exactly once.
+
+    Args:
+        conn: An open connection with no transaction in progress
+
+    Returns:
+        list: Versions applied by this call
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    current = get_schema_version(conn)
+
+    applied = []
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        migration(conn)
+        applied.append(version)
+
+    if applied:
+        conn.execute("""
+            INSERT INTO schema_meta (key, value) VALUES ('schema_version', ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """, (str(applied[-1]),))
+
+    return applied
+
+def init_database():
+    """Bring the database at DB_PATH up to SCHEMA_VERSION (runs once per process)"""
+    with _migration_lock:
+        if DB_PATH in _migrated_paths:
+            return
 
-    conn.commit()
-    conn.close()
+        with get_connection() as conn:
+            migrate(conn)
+        _migrated_paths.add(DB_PATH)
+
+def _ensure_schema():
+    """Hot-path guard: a set lookup once the schema has been bootstrapped"""
+    if DB_PATH not in _migrated_paths:
+        init_database()
+
+# =====================================================
+# Lookup Cache
+# =====================================================
+# get_case, load_case_state and the user lookups are served from memory for
+# up to LOOKUP_CACHE_TTL seconds; writes through this module invalidate them
+# directly, writes by other connections or processes via lookup_version
+# (noticed within LOOKUP_VERSION_INTERVAL seconds)
+LOOKUP_CACHE_TTL = 30.0
+LOOKUP_CACHE_ENTRIES = 1024
+LOOKUP_VERSION_INTERVAL = 0.05
+
+_case_cache = LookupCache('case', LOOKUP_CACHE_ENTRIES, LOOKUP_CACHE_TTL)
+# Rows behind load_case_state, the portal's read on every rerun
+_case_state_cache = LookupCache('case_state', LOOKUP_CACHE_ENTRIES, LOOKUP_CACHE_TTL)
+# Keyed by (email_norm, phone_e164) as passed to find_user
+_user_cache = LookupCache('user', LOOKUP_CACHE_ENTRIES, LOOKUP_CACHE_TTL)
+_lookup_caches = (_case_cache, _case_state_cache, _user_cache)
+
+# Last lookup_version seen per database file
+_lookup_versions = {}
+_lookup_version_lock = threading.Lock()
+
+def _check_lookup_version(conn):
+    """
+    Drop every cached lookup if another connection changed cases or users
+
+    PRAGMA data_version only changes when some other connection commits, so
+    the counter is read only then; the pragma itself runs at most once per
+    LOOKUP_VERSION_INTERVAL per thread.
+    """
+    versions = getattr(_local, 'data_versions', None)
+    if versions is None:
+        versions = _local.data_versions = {}
+
+    now = time.monotonic()
+    seen = versions.get(DB_PATH)
+    if seen is not None and now - seen[1] < LOOKUP_VERSION_INTERVAL:
+        return
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    versions[DB_PATH] = (data_version, now)
+    if seen is not None and seen[0] == data_version:
+        return
+
+    row = conn.execute("SELECT value FROM schema_meta WHERE key = 'lookup_version'").fetchone()
+    version = row[0] if row else None
+    with _lookup_version_lock:
+        if _lookup_versions.get(DB_PATH, version) != version:
+            for cache in _lookup_caches:
+                cache.invalidate()
+        _lookup_versions[DB_PATH] = version
+
+def _cached_lookup(cache, key, load):
+    """
+    Serve load(conn) from cache, loading and storing it on a miss
+
+    Reads inside an open transaction bypass the cache: they may see
+    uncommitted rows that could still be rolled back.
+
+    Returns:
+        Record: The cached row (read-only, shared between callers), or None
+    """
+    _ensure_schema()
+
+    start = time.perf_counter()
+    # Hits only peek at the pooled connection; loads borrow it properly
+    conn = _pool_entry(DB_PATH)[0]
+    if conn.in_transaction:
+        with get_connection() as conn:
+            return load(conn)
+    _check_lookup_version(conn)
+
+    key = (DB_PATH, key)
+    hit, value = cache.get(key)
+    if not hit:
+        generation = cache.generation
+        with get_connection() as conn:
+            value = load(conn)
+        cache.put(key, value, generation)
+    cache.record(hit, time.perf_counter() - start)
+    return value
+
+def invalidate_lookups(case_id=None, users=False):
+    """
+    Drop cached lookups after a write
+
+    Args:
+        case_id: Case whose get_case and load_case_state entries to drop
+        users: Drop every cached user lookup (a user matches several keys)
+        With no arguments, every cached lookup is dropped.
+    """
+    if case_id is None and not users:
+        for cache in _lookup_caches:
+            cache.invalidate()
+        return
+
+    if case_id is not None:
+        _case_cache.invalidate((DB_PATH, case_id))
+        _case_state_cache.invalidate((DB_PATH, case_id))
+    if users:
+        _user_cache.invalidate()
+
+def lookup_cache_stats():
+    """
+    Return hit rate and latency of the lookup caches
+
+    Returns:
+        dict: {'case', 'case_state', 'user'} -> LookupCache.stats()
+    """
+    return {cache.name: cache.stats() for cache in _lookup_caches}
 
 def create_user(full_name, phone, email, user_type='claimant'):
     """
@@ -61,21 +663,33 @@ def create_user(full_name, phone, email, user_type='claimant'):
         user_type: Type of user ('claimant' or 'defendant')
 
     Returns:
-        int: User ID if successful, None otherwise
+        int: User ID if successful, None otherwise (also when the email or
+             phone is already registered in any spelling, or normalizes to
+             nothing, e.g. a phone without digits)
     """
-    init_database()
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    _ensure_schema()
 
+    email_norm = normalize_email(email)
+    phone_e164 = normalize_phone(phone)
+    if email_norm is None or phone_e164 is None:
+        # Unusable identity: it could not be looked up, and the raw UNIQUE
+        # constraints would be the only guard against a second copy
+        return None
     try:
-        cursor.execute("""
-            INSERT INTO users (full_name, phone, email, user_type)
-            VALUES (?, ?, ?, ?)
-        """, (full_name, phone, email, user_type))
+        with get_connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute("""
+                INSERT INTO users (full_name, phone, email, user_type, email_norm, phone_e164)
+                SELECT ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM users WHERE email_norm = ? OR phone_e164 = ?)
+            """, (full_name, phone, email, user_type, email_norm, phone_e164, email_norm, phone_e164))
+            if cursor.rowcount == 0:
+                return None
 
-        conn.commit()
-        user_id = cursor.lastrowid
+            user_id = cursor.lastrowid
+        # A cached "not found" for this email or phone is now wrong
+        invalidate_lookups(users=True)
         return user_id
     except sqlite3.IntegrityError:
         # User already exists
@@ -83,80 +697,64 @@ def create_user(full_name, phone, email, user_type='claimant'):
     except Exception as e:
         print(f"Error creating user: {e}")
         return None
-    finally:
-        conn.close()
 
-def get_user_by_email(email):
+def _load_user(conn, email_norm, phone_e164):
+    """Read the user with this email or phone, preferring an email match"""
+    row = conn.execute(f"""
+        SELECT {', '.join(User._fields)}
+        FROM users
+        WHERE email_norm = ? OR phone_e164 = ?
+        ORDER BY email_norm = ? DESC, id
+        LIMIT 1
+    """, (email_norm, phone_e164, email_norm)).fetchone()
+
+    return User(row) if row else None
+
+def find_user(email=None, phone=None):
     """
-    Retrieve a user by email
+    Retrieve a user by email and/or phone number, in any spelling
+
+    Both identifiers are normalized (see identity.py) and resolved in one
+    query over the email_norm and phone_e164 indexes.
 
     Args:
-        email: User's email address
+        email: Email address (optional)
+        phone: Phone number, national or international format (optional)
 
     Returns:
-        dict: User data or None if not found
+        User: Read-only user record (accessed like a dict), or None if not found
     """
-    init_database()
+    email_norm = normalize_email(email)
+    phone_e164 = normalize_phone(phone)
+    if email_norm is None and phone_e164 is None:
+        return None
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    return _cached_lookup(_user_cache, (email_norm, phone_e164),
+                          lambda conn: _load_user(conn, email_norm, phone_e164))
 
-    cursor.execute("""
-        SELECT id, full_name, phone, email, user_type, created_at
-        FROM users
-        WHERE email = ?
-    """, (email,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if row:
-        return {
-            'id': row[0],
-            'full_name': row[1],
-            'phone': row[2],
-            'email': row[3],
-            'user_type': row[4],
-            'created_at': row[5]
-        }
+def get_user_by_email(email):
+    """
+    Retrieve a user by email (case-insensitive, surrounding spaces ignored)
 
-    return None
+    Args:
+        email: User's email address
+
+    Returns:
+        User: Read-only user record (accessed like a dict), or None if not found
+    """
+    return find_user(email=email)
 
 def get_user_by_phone(phone):
     """
-    Retrieve a user by phone number
+    Retrieve a user by phone number ("050-1234567" and "+972501234567" are the same)
 
     Args:
         phone: User's phone number
 
     Returns:
-        dict: User data or None if not found
+        User: Read-only user record (accessed like a dict), or None if not found
     """
-    init_database()
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, full_name, phone, email, user_type, created_at
-        FROM users
-        WHERE phone = ?
-    """, (phone,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if row:
-        return {
-            'id': row[0],
-            'full_name': row[1],
-            'phone': row[2],
-            'email': row[3],
-            'user_type': row[4],
-            'created_at': row[5]
-        }
-
-    return None
+    return find_user(phone=phone)
 
 def save_case(case_id, claimant_name, claimant_phone, claimant_email, defendant_name, defendant_phone,
               claimant_file=None, defendant_file=None, pdf_path=None, terms_accepted=True,
@@ -181,29 +779,24 @@ def save_case(case_id, claimant_name, claimant_phone, claimant_email, defendant_
     Returns:
         bool: True if successful
     """
-    init_database()
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    _ensure_schema()
 
     try:
-        cursor.execute("""
-            INSERT INTO cases (case_id, claimant_name, claimant_phone, claimant_email,
-                             defendant_name, defendant_phone, claimant_file_path,
-                             defendant_file_path, pdf_path, terms_accepted,
-                             postal_mail_cost, submission_fee)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (case_id, claimant_name, claimant_phone, claimant_email,
-              defendant_name, defendant_phone, claimant_file, defendant_file,
-              pdf_path, terms_accepted, postal_mail_cost, submission_fee))
-
-        conn.commit()
+        with get_connection() as conn:
+            conn.execute("""
+                INSERT INTO cases (case_id, claimant_name, claimant_phone, claimant_email,
+                                 defendant_name, defendant_phone, claimant_file_path,
+                                 defendant_file_path, pdf_path, terms_accepted,
+                                 postal_mail_cost, submission_fee)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (case_id, claimant_name, claimant_phone, claimant_email,
+                  defendant_name, defendant_phone, claimant_file, defendant_file,
+                  pdf_path, terms_accepted, postal_mail_cost, submission_fee))
+        invalidate_lookups(case_id=case_id)
         return True
     except Exception as e:
         print(f"Error saving case: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_case(case_id):
     """
@@ -213,75 +806,757 @@ def get_case(case_id):
         case_id: Unique case identifier
 
     Returns:
-        dict: Case data or None if not found
+        Case: Read-only case record (accessed like a dict), or None if not found
     """
-    init_database()
+    return _cached_lookup(_case_cache, case_id, lambda conn: _load_case(conn, case_id))
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT case_id, claimant_name, claimant_phone, claimant_email,
-               defendant_name, defendant_phone, claimant_file_path,
-               defendant_file_path, status, postal_mail_cost, submission_fee,
-               resolution_fee, terms_accepted, created_at, pdf_path
+def _load_case(conn, case_id):
+    """Read one case row"""
+    row = conn.execute(f"""
+        SELECT {', '.join(Case._fields)}
         FROM cases
         WHERE case_id = ?
-    """, (case_id,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if row:
-        return {
-            'case_id': row[0],
-            'claimant_name': row[1],
-            'claimant_phone': row[2],
-            'claimant_email': row[3],
-            'defendant_name': row[4],
-            'defendant_phone': row[5],
-            'claimant_file_path': row[6],
-            'defendant_file_path': row[7],
-            'status': row[8],
-            'postal_mail_cost': row[9],
-            'submission_fee': row[10],
-            'resolution_fee': row[11],
-            'terms_accepted': row[12],
-            'created_at': row[13],
-            'pdf_path': row[14]
-        }
+    """, (case_id,)).fetchone()
 
-    return None
+    return Case(row) if row else None
 
-def get_all_cases():
+def set_case_pdf_path(case_id, pdf_path):
+    """
+    Record the path of a case's generated award PDF
+
+    Args:
+        case_id: Unique case identifier
+        pdf_path: Path to the generated PDF
+
+    Returns:
+        bool: True if the case exists and was updated
+    """
+    _ensure_schema()
+
+    try:
+        with get_connection() as conn:
+            cursor = conn.execute("UPDATE cases SET pdf_path = ? WHERE case_id = ?", (pdf_path, case_id))
+        invalidate_lookups(case_id=case_id)
+        return cursor.rowcount == 1
+    except Exception as e:
+        print(f"Error saving case PDF path: {e}")
+        return False
+
+# =====================================================
+# Case Listing
+# =====================================================
+LISTING_COLUMNS = ('case_id', 'claimant_name', 'defendant_name', 'status', 'created_at')
+
+def _timestamp_param(value):
+    """Format a datetime the way CURRENT_TIMESTAMP stores it; pass strings through"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+def _case_filters(status=None, claimant_phone=None, defendant_phone=None,
+                  created_from=None, created_to=None):
+    """Build the WHERE clauses and parameters shared by the listing functions"""
+    clauses = []
+    params = []
+
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if claimant_phone is not None:
+        clauses.append("claimant_phone = ?")
+        params.append(claimant_phone)
+    if defendant_phone is not None:
+        clauses.append("defendant_phone = ?")
+        params.append(defendant_phone)
+    if created_from is not None:
+        clauses.append("created_at >= ?")
+        params.append(_timestamp_param(created_from))
+    if created_to is not None:
+        clauses.append("created_at < ?")
+        params.append(_timestamp_param(created_to))
+
+    return clauses, params
+
+def list_cases(limit=50, cursor=None, status=None, claimant_phone=None,
+               defendant_phone=None, created_from=None, created_to=None, columns=None):
+    """
+    Retrieve one page of cases, newest first, using keyset pagination
+
+    Args:
+        limit: Maximum number of cases in the page
+        cursor: next_cursor returned by the previous page (None for the first page)
+        status: Only cases with this status (optional)
+        claimant_phone: Only cases filed by this phone number (optional)
+        defendant_phone: Only cases against this phone number (optional)
+        created_from: Only cases created at or after this time (optional)
+        created_to: Only cases created before this time (optional)
+        columns: Case columns to return (default LISTING_COLUMNS)
+
+    Returns:
+        tuple: (list of read-only case records, next_cursor or None on the last page)
+
+    Raises:
+        ValueError: If columns names an unknown column
+    """
+    _ensure_schema()
+
+    record_type = projection(Case, columns or LISTING_COLUMNS)
+    # The pagination keys are always selected; records ignore trailing values
+    selected = record_type._fields + tuple(key for key in ('created_at', 'case_id')
+                                           if key not in record_type._fields)
+
+    clauses, params = _case_filters(status, claimant_phone, defendant_phone,
+                                    created_from, created_to)
+    if cursor is not None:
+        # Row-value comparison lets SQLite seek straight into the index
+        clauses.append("(created_at, case_id) < (?, ?)")
+        params.extend(cursor)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    with get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT {', '.join(selected)}
+            FROM cases
+            {where}
+            ORDER BY created_at DESC, case_id DESC
+            LIMIT ?
+        """, params + [limit]).fetchall()
+
+    cases = list(map(record_type, rows))
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = (last[selected.index('created_at')], last[selected.index('case_id')])
+
+    return cases, next_cursor
+
+def iter_cases(batch_size=500, columns=None, **filters):
+    """
+    Stream every matching case, newest first, one page at a time
+
+    Each page is a short independent read, so long exports never pin a
+    read transaction or hold the whole table in memory.
+
+    Args:
+        batch_size: Rows fetched per page
+        columns: Case columns to return (default LISTING_COLUMNS); fewer
+                 columns means less to read and to keep in memory
+        **filters: Same filters as list_cases
+
+    Yields:
+        Record: Read-only case record with the requested columns
+    """
+    cursor = None
+    while True:
+        cases, cursor = list_cases(limit=batch_size, cursor=cursor, columns=columns, **filters)
+        yield from cases
+        if cursor is None:
+            return
+
+def get_all_cases(columns=None):
     """
     Retrieve all cases from the database
 
+    Prefer list_cases or iter_cases for large tables.
+
+    Args:
+        columns: Case columns to return (default LISTING_COLUMNS)
+
     Returns:
-        list: List of case dictionaries
+        list: List of read-only case records
     """
-    init_database()
+    return list(iter_cases(columns=columns))
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+# =====================================================
+# Bulk Import
+# =====================================================
+BULK_CASE_COLUMNS = (
+    'case_id', 'claimant_name', 'claimant_phone', 'claimant_email',
+    'defendant_name', 'defendant_phone', 'claimant_file_path', 'defendant_file_path',
+    'pdf_path', 'terms_accepted', 'postal_mail_cost', 'submission_fee',
+    'resolution_fee', 'status', 'created_at'
+)
+REQUIRED_CASE_FIELDS = ('case_id', 'claimant_name', 'claimant_phone', 'claimant_email',
+                        'defendant_name', 'defendant_phone')
 
-    cursor.execute("""
-        SELECT case_id, claimant_name, defendant_name, status, created_at
-        FROM cases
-        ORDER BY created_at DESC
-    """)
+BULK_USER_COLUMNS = ('full_name', 'phone', 'email', 'user_type', 'created_at')
+REQUIRED_USER_FIELDS = ('full_name', 'phone', 'email')
+
+def _chunks(rows, chunk_size):
+    """Yield (start_index, list_of_rows) chunks from any iterable"""
+    iterator = iter(rows)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+def _missing_fields(row, required):
+    """Return the required fields that are absent or empty in a row"""
+    return [field for field in required if row.get(field) in (None, '')]
+
+def _bulk_insert(rows, chunk_size, required, key_fields, existing_keys, insert_sql, to_params, on_reject,
+                 invalid=None):
+    """
+    Shared driver for the bulk APIs: validate, de-duplicate and executemany per chunk
+
+    All chunks run inside one BEGIN IMMEDIATE transaction, so an import is
+    all-or-nothing and the duplicate checks cannot race other writers.
+    invalid is an optional function row -> reason (or None) for rows that
+    have every required field but cannot be stored.
+    """
+    _ensure_schema()
+
+    result = {'inserted': 0, 'duplicates': [], 'errors': []}
+
+    def reject(kind, index, row, reason):
+        if on_reject is not None:
+            on_reject(kind, index, row, reason)
+        else:
+            result[kind].append({'index': index, 'reason': reason})
+
+    with get_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+
+        for start, chunk in _chunks(rows, chunk_size):
+            # Earlier chunks are already visible inside the transaction, so only
+            # keys repeated within this chunk need tracking in memory
+            stored = existing_keys(conn, chunk)
+            seen = {field: set() for field in key_fields}
+
+            batch = []
+            for offset, row in enumerate(chunk):
+                index = start + offset
+
+                missing = _missing_fields(row, required)
+                if missing:
+                    reject('errors', index, row, f"missing fields: {', '.join(missing)}")
+                    continue
+                reason = invalid(row) if invalid is not None else None
+                if reason:
+                    reject('errors', index, row, reason)
+                    continue
+
+                clash = next((field for field in key_fields if row[field] is not None
+                              and (row[field] in stored[field] or row[field] in seen[field])), None)
+                if clash:
+                    reject('duplicates', index, row, f"{clash} '{row[clash]}' already exists")
+                    continue
+
+                for field in key_fields:
+                    if row[field] is not None:
+                        seen[field].add(row[field])
+                batch.append(to_params(row))
+
+            conn.executemany(insert_sql, batch)
+            result['inserted'] += len(batch)
+
+    if result['inserted']:
+        invalidate_lookups()
+    return result
+
+# Keys per IN (...) lookup, well under SQLite's bound-variable limit
+# (999 before 3.32) whatever chunk_size a bulk import uses
+EXISTING_KEYS_BATCH = 500
+
+def _existing_values(conn, table, column, values):
+    """Return the subset of values already stored in table.column, querying in fixed-size batches"""
+    stored = set()
+    for start in range(0, len(values), EXISTING_KEYS_BATCH):
+        batch = values[start:start + EXISTING_KEYS_BATCH]
+        stored.update(row[0] for row in conn.execute(
+            f"SELECT {column} FROM {table} WHERE {column} IN ({', '.join('?' * len(batch))})", batch))
+    return stored
+
+def _existing_case_ids(conn, chunk):
+    """Return {'case_id': set} of chunk case IDs already in the cases table"""
+    case_ids = [row.get('case_id') for row in chunk if row.get('case_id')]
+    return {'case_id': _existing_values(conn, "cases", "case_id", case_ids)}
+
+def _existing_user_keys(conn, chunk):
+    """Return {'email_norm': set, 'phone_e164': set} of chunk identities already in the users table"""
+    return {column: _existing_values(conn, "users", column, [row[column] for row in chunk if row.get(column)])
+            for column in ('email_norm', 'phone_e164')}
+
+def save_cases_bulk(cases, chunk_size=500, on_reject=None):
+    """
+    Insert many cases in a single transaction
+
+    Rows whose case_id already exists (in the table or earlier in the input)
+    are reported as duplicates instead of aborting the import.
+
+    Args:
+        cases: Iterable of dicts keyed by cases column name; status, created_at
+               and the fee columns are optional and fall back to the table defaults
+        chunk_size: Rows per executemany batch
+        on_reject: Optional callback(kind, index, row, reason) for duplicate and
+                   invalid rows; when given, rejects are not collected in the result
+
+    Returns:
+        dict: {'inserted': int, 'duplicates': [...], 'errors': [...]} where each
+              reject is {'index': position in input, 'reason': str}
+    """
+    insert_sql = """
+        INSERT INTO cases (case_id, claimant_name, claimant_phone, claimant_email,
+                           defendant_name, defendant_phone, claimant_file_path,
+                           defendant_file_path, pdf_path, terms_accepted,
+                           postal_mail_cost, submission_fee, resolution_fee,
+                           status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, 1), COALESCE(?, 35.0),
+                COALESCE(?, 120.0), COALESCE(?, 200.0), COALESCE(?, 'Pending'),
+                COALESCE(?, CURRENT_TIMESTAMP))
+    """
+
+    def to_params(row):
+        return tuple(_timestamp_param(row.get(column)) for column in BULK_CASE_COLUMNS)
+
+    return _bulk_insert(cases, chunk_size, REQUIRED_CASE_FIELDS, ('case_id',),
+                        _existing_case_ids, insert_sql, to_params, on_reject)
+
+def create_users_bulk(users, chunk_size=500, on_reject=None):
+    """
+    Insert many users in a single transaction
+
+    Rows whose email or phone is already registered in any spelling (in the
+    table or earlier in the input) are reported as duplicates instead of
+    being swallowed; rows whose email or phone normalizes to nothing are
+    reported as errors.
+
+    Args:
+        users: Iterable of dicts with full_name, phone, email and optional
+               user_type ('claimant' by default) and created_at
+        chunk_size: Rows per executemany batch
+        on_reject: Optional callback(kind, index, row, reason), see save_cases_bulk
+
+    Returns:
+        dict: {'inserted': int, 'duplicates': [...], 'errors': [...]}
+    """
+    insert_sql = """
+        INSERT INTO users (full_name, phone, email, user_type, created_at, email_norm, phone_e164)
+        VALUES (?, ?, ?, COALESCE(?, 'claimant'), COALESCE(?, CURRENT_TIMESTAMP), ?, ?)
+    """
+
+    def with_identity(rows):
+        for row in rows:
+            yield dict(row, email_norm=normalize_email(row.get('email')),
+                       phone_e164=normalize_phone(row.get('phone')))
+
+    def unusable_identity(row):
+        # e.g. a phone without digits; its raw value would only be checked by
+        # the UNIQUE constraint, which aborts the whole import
+        unusable = [field for field, column in (('email', 'email_norm'), ('phone', 'phone_e164'))
+                    if row[column] is None]
+        return f"no usable {' or '.join(unusable)}" if unusable else None
+
+    def to_params(row):
+        return tuple(_timestamp_param(row.get(column)) for column in BULK_USER_COLUMNS) + \
+            (row['email_norm'], row['phone_e164'])
+
+    return _bulk_insert(with_identity(users), chunk_size, REQUIRED_USER_FIELDS, ('email_norm', 'phone_e164'),
+                        _existing_user_keys, insert_sql, to_params, on_reject, invalid=unusable_identity)
+
+# =====================================================
+# Case Lifecycle (portal state)
+# =====================================================
+# Text field name of each submission role, as used by the portal's case_data
+SUBMISSION_TEXT_FIELDS = {
+    'claimant': 'claim_text',
+    'defendant': 'defense_text',
+    'rebuttal': 'text',
+}
+
+def _now():
+    """Local timestamp in the format the portal displays"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _insert_submission(conn, case_id, role, party, text, evidence_files=()):
+    """Insert one submission row and its evidence files"""
+    submitted_at = _now()
+    conn.execute("""
+        INSERT INTO case_submissions (case_id, role, full_name, id_number, email, phone,
+                                      id_document_path, id_document_blob, body, submitted_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (case_id, role, party.get('full_name'), party.get('id_number'), party.get('email'),
+          party.get('phone'), party.get('id_document_path'), party.get('id_document_blob'),
+          text, submitted_at))
+
+    rows = []
+    for position, evidence in enumerate(evidence_files):
+        # A plain path, or an evidence_store record with blob_id and file_name
+        if isinstance(evidence, str):
+            evidence = {'file_path': evidence}
+        rows.append((case_id, role, position, evidence['file_path'], evidence.get('blob_id'),
+                     evidence.get('file_name')))
+
+    conn.executemany("""
+        INSERT INTO case_evidence (case_id, role, position, file_path, blob_id, file_name)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+
+    # Indexed in the same transaction, so search never sees a half-saved submission
+    import case_search
+    case_search.index_document(conn, case_id, role, case_search.SUBMISSION_SOURCE, text)
+
+def create_claim(case_id, claimant, claim_text, evidence_files=()):
+    """
+    Open a new case from the claimant portal
+
+    Args:
+        case_id: Unique case identifier
+        claimant: Dict with full_name, id_number, email, phone, id_document_path
+        claim_text: The statement of claim
+        evidence_files: Saved evidence files in upload order - paths, or
+                        evidence_store records (file_path, blob_id, file_name)
+
+    Returns:
+        bool: True if successful
+    """
+    _ensure_schema()
+
+    try:
+        with get_connection() as conn:
+            # The defendant is only identified once they answer the claim
+            conn.execute("""
+                INSERT INTO cases (case_id, claimant_name, claimant_phone, claimant_email,
+                                   defendant_name, defendant_phone, terms_accepted, stage)
+                VALUES (?, ?, ?, ?, '', '', 1, 'claim_submitted')
+            """, (case_id, claimant['full_name'], claimant['phone'], claimant['email']))
+            _insert_submission(conn, case_id, 'claimant', claimant, claim_text, evidence_files)
+        invalidate_lookups(case_id=case_id)
+        return True
+    except Exception as e:
+        print(f"Error creating claim: {e}")
+        return False
+
+def submit_defense(case_id, defendant, defense_text, evidence_files=()):
+    """
+    Record the defendant's statement of defense
+
+    Args:
+        case_id: Unique case identifier
+        defendant: Dict with full_name, id_number, email, phone, id_document_path
+        defense_text: The statement of defense
+        evidence_files: Saved evidence files in upload order - paths, or
+                        evidence_store records (file_path, blob_id, file_name)
+
+    Returns:
+        bool: True if successful, False if the case is not awaiting a defense
+    """
+    _ensure_schema()
+
+    try:
+        with get_connection() as conn:
+            # The stage check and the update are one statement, so two
+            # concurrent submissions cannot both succeed
+            cursor = conn.execute("""
+                UPDATE cases
+                SET stage = 'defense_submitted', defendant_name = ?, defendant_phone = ?
+                WHERE case_id = ? AND stage = 'claim_submitted'
+            """, (defendant['full_name'], defendant['phone'], case_id))
+            if cursor.rowcount == 0:
+                return False
+            _insert_submission(conn, case_id, 'defendant', defendant, defense_text, evidence_files)
+        invalidate_lookups(case_id=case_id)
+        return True
+    except Exception as e:
+        print(f"Error submitting defense: {e}")
+        return False
+
+def submit_rebuttal(case_id, rebuttal_text):
+    """
+    Record the claimant's rebuttal, which locks the case for ruling
+
+    Args:
+        case_id: Unique case identifier
+        rebuttal_text: The rebuttal text
+
+    Returns:
+        bool: True if successful, False if the case is not awaiting a rebuttal
+    """
+    _ensure_schema()
+
+    try:
+        with get_connection() as conn:
+            cursor = conn.execute("""
+                UPDATE cases SET stage = 'rebuttal_submitted'
+                WHERE case_id = ? AND stage = 'defense_submitted'
+            """, (case_id,))
+            if cursor.rowcount == 0:
+                return False
+            _insert_submission(conn, case_id, 'rebuttal', {}, rebuttal_text)
+        invalidate_lookups(case_id=case_id)
+        return True
+    except Exception as e:
+        print(f"Error submitting rebuttal: {e}")
+        return False
+
+def get_case_stage(case_id):
+    """
+    Retrieve the lifecycle stage of a case
+
+    Args:
+        case_id: Unique case identifier
+
+    Returns:
+        str: claim_submitted, defense_submitted, rebuttal_submitted or locked;
+             None if the case does not exist or has no lifecycle (legacy
+             and imported cases)
+    """
+    _ensure_schema()
+
+    with get_connection() as conn:
+        row = conn.execute("SELECT stage FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+
+    return row[0] if row else None
+
+def _load_case_state_rows(conn, case_id):
+    """Read a case's stage, submissions and evidence as tuples (None if no such case)"""
+    stage_row = conn.execute("SELECT stage FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+    if not stage_row:
+        return None
+
+    submissions = conn.execute("""
+        SELECT role, full_name, id_number, email, phone, id_document_path, body, submitted_at
+        FROM case_submissions
+        WHERE case_id = ?
+    """, (case_id,)).fetchall()
+
+    evidence = conn.execute("""
+        SELECT role, file_path, blob_id, file_name
+        FROM case_evidence
+        WHERE case_id = ?
+        ORDER BY role, position
+    """, (case_id,)).fetchall()
+
+    return stage_row[0], tuple(submissions), tuple(evidence)
+
+def load_case_state(case_id):
+    """
+    Load everything the portal needs to render a case
+
+    The rows are served from the lookup cache (see get_case); the dict is
+    built fresh on every call, so callers may modify it.
+
+    Args:
+        case_id: Unique case identifier
+
+    Returns:
+        dict: {'case_id', 'stage', 'claimant', 'defendant', 'rebuttal'} where each
+              party is a dict (or None) shaped like the portal's case_data, plus
+              'evidence' (file_path, blob_id, file_name per file);
+              None if the case does not exist
+    """
+    rows = _cached_lookup(_case_state_cache, case_id, lambda conn: _load_case_state_rows(conn, case_id))
+    if rows is None:
+        return None
+    stage, submissions, evidence = rows
 
-    rows = cursor.fetchall()
-    conn.close()
-
-    cases = []
-    for row in rows:
-        cases.append({
-            'case_id': row[0],
-            'claimant_name': row[1],
-            'defendant_name': row[2],
-            'status': row[3],
-            'created_at': row[4]
+    files_by_role = {}
+    evidence_by_role = {}
+    for role, file_path, blob_id, file_name in evidence:
+        files_by_role.setdefault(role, []).append(file_path)
+        evidence_by_role.setdefault(role, []).append({
+            'file_path': file_path,
+            'blob_id': blob_id,
+            'file_name': file_name or os.path.basename(file_path)
         })
 
-    return cases
+    state = {
+        'case_id': case_id,
+        'stage': stage,
+        'claimant': None,
+        'defendant': None,
+        'rebuttal': None
+    }
+
+    for role, full_name, id_number, email, phone, id_document_path, body, submitted_at in submissions:
+        if role == 'rebuttal':
+            state['rebuttal'] = {'text': body, 'timestamp': submitted_at}
+            continue
+
+        state[role] = {
+            'full_name': full_name,
+            'id_number': id_number,
+            'email': email,
+            'phone': phone,
+            'id_document_path': id_document_path,
+            SUBMISSION_TEXT_FIELDS[role]: body,
+            'evidence_files': files_by_role.get(role, []),
+            'evidence': evidence_by_role.get(role, []),
+            'timestamp': submitted_at
+        }
+
+    return state
+
+# =====================================================
+# Audit Log
+# =====================================================
+class AuditLogWriter:
+    """
+    Background writer that batches audit events into audit_events
+
+    log() only enqueues, so it never waits on SQLite. A daemon thread
+    commits a batch every batch_size events or flush_interval seconds,
+    whichever comes first.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=0.2, max_pending=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # log() runs on any caller thread and _write() on the writer thread
+        self._counter_lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the writer thread on first use (and again in a forked child)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def log(self, case_id, stage, description):
+        """
+        Queue an audit event without blocking
+
+        Returns:
+            bool: False if the queue was full and the event was dropped
+        """
+        _ensure_schema()
+        self._ensure_started()
+
+        # Timestamp at call time, so batching never reorders the timeline
+        try:
+            self._queue.put_nowait((DB_PATH, case_id, stage, description, _now()))
+            return True
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            print(f"Warning: audit queue full, dropped event for case {case_id}")
+            return False
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every event queued so far is committed
+
+        Returns:
+            bool: True if flushed within the timeout
+        """
+        if self._thread is None:
+            return True
+        self._ensure_started()
+
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _run(self):
+        """Writer loop: gather a batch, commit it, release any flush() waiters"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            # A flush marker ends the batch early
+            while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            events = [item for item in batch if not isinstance(item, threading.Event)]
+            if events:
+                self._write(events)
+
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write(self, events):
+        """Commit events grouped by database file, retrying transient lock errors"""
+        by_path = {}
+        for db_path, *row in events:
+            by_path.setdefault(db_path, []).append(row)
+
+        for db_path, rows in by_path.items():
+            for attempt in range(3):
+                try:
+                    with get_connection(db_path) as conn:
+                        conn.executemany("""
+                            INSERT INTO audit_events (case_id, stage, description, created_at)
+                            VALUES (?, ?, ?, ?)
+                        """, rows)
+                    with self._counter_lock:
+                        self.written += len(rows)
+                    break
+                except sqlite3.Error as e:
+                    print(f"Error writing audit events (attempt {attempt + 1}): {e}")
+                    time.sleep(0.1 * (attempt + 1))
+            else:
+                with self._counter_lock:
+                    self.dropped += len(rows)
+
+    def stats(self):
+        """Return the written and dropped event counters"""
+        with self._counter_lock:
+            return {'written': self.written, 'dropped': self.dropped}
+
+# Process-wide writer; pending events are flushed on interpreter exit
+audit_writer = AuditLogWriter()
+atexit.register(audit_writer.flush, 2.0)
+
+def append_audit_event(case_id, stage, description):
+    """
+    Append an entry to a case's audit log without blocking the caller
+
+    The event is committed by the background writer within
+    audit_writer.flush_interval seconds.
+
+    Args:
+        case_id: Unique case identifier
+        stage: Lifecycle event name (e.g. 'claim_submitted')
+        description: Human readable description
+
+    Returns:
+        bool: True if the event was queued
+    """
+    return audit_writer.log(case_id, stage, description)
+
+def get_case_timeline(case_id, limit=None):
+    """
+    Retrieve a case's audit timeline, oldest first, from the (case_id, created_at) index
+
+    Args:
+        case_id: Unique case identifier
+        limit: Maximum number of events (optional)
+
+    Returns:
+        list: Dicts with timestamp, stage and description
+    """
+    _ensure_schema()
+
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT created_at, stage, description
+            FROM audit_events
+            WHERE case_id = ?
+            ORDER BY created_at, id
+            LIMIT ?
+        """, (case_id, -1 if limit is None else limit)).fetchall()
+
+    return [{'timestamp': row[0], 'stage': row[1], 'description': row[2]} for row in rows]
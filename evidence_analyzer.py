@@ -0,0 +1,307 @@
+"""
+Evidence analyzer for Resolve AI - rule-driven extraction of facts and findings
+
+The keyword -> finding rules are data, compiled once into an EvidenceAnalyzer.
+Each document is scanned once per pattern: the date and amount regexes are
+precompiled, and every rule is reduced to its minimal keyword set and stops
+at the first keyword found.
+
+The live rules are the evidence_rules table (seeded with DEFAULT_RULES by migration 8).
+Results are stored per document, keyed by the text's SHA-256 and a
+fingerprint of that document's rules, so a case is re-analyzed
+incrementally: adding a rebuttal scans only the rebuttal, and editing the
+defense rules invalidates only cached defenses.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+
+import database
+
+DATE_PATTERN = re.compile(r'\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}')
+AMOUNT_PATTERN = re.compile(r'₪?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*₪?')
+
+# Text field of each document in the portal's case_data, in analysis order
+DOCUMENT_TEXT_FIELDS = {
+    'claimant': 'claim_text',
+    'defendant': 'defense_text',
+    'rebuttal': 'text',
+}
+
+# Documents whose dates and amounts are reported as agreed facts
+FACT_DOCUMENTS = ('claimant',)
+
+# (document, keywords, section, finding): the finding is added to the section
+# when any keyword appears in the document. Findings keep table order.
+# These are only the rules migration 8 seeds into evidence_rules; analyzers
+# read the table (load_rules) unless given rules explicitly.
+DEFAULT_RULES = (
+    ('claimant', ('חוזה', 'הסכם'), 'key_findings', "קיומו של הסכם חוזי בין הצדדים"),
+    ('claimant', ('הפרה', 'הפר'), 'key_findings', "טענה להפרת התחייבות חוזית"),
+    ('claimant', ('נזק', 'נזקים'), 'key_findings', "טענה לנזקים שנגרמו לתובע"),
+    ('defendant', ('מכחיש', 'כופר', 'לא נכון'), 'disputed_points', "הנתבע מכחיש את טענות התובע"),
+    ('defendant', ('מאשר', 'מודה'), 'disputed_points', "הנתבע מאשר חלק מהטענות"),
+    ('defendant', ('ראיה', 'ראיות'), 'disputed_points', "הנתבע הציג ראיות נגדיות"),
+    ('rebuttal', ('סותר', 'מפריך'), 'disputed_points', "התובע מפריך את טענות ההגנה"),
+)
+
+# Bump whenever scan() output changes for the same rules; cached results are then ignored
+ANALYZER_VERSION = 1
+
+LEGAL_BASIS = (
+    "התיק עומד בתנאי סף לבוררות על פי חוק הבוררות, התשכ\"ח-1968",
+    "שני הצדדים אישרו את סמכות הבורר והסכימו לתקנון Resolve AI",
+)
+
+
+def _rules_fingerprint(document, rules):
+    """Hash of everything that determines a document's scan result besides its text"""
+    payload = json.dumps([ANALYZER_VERSION, document, document in FACT_DOCUMENTS,
+                          [[list(keywords), section, finding] for keywords, section, finding in rules]],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _minimal_keywords(keywords):
+    """Drop keywords containing another keyword of the same rule; they can never add a match"""
+    return tuple(k for k in keywords if not any(other != k and other in k for other in keywords))
+
+
+class EvidenceAnalyzer:
+    """
+    Analyzer compiled from a rule table
+
+    Substring search on str runs in C, so a handful of minimal keywords per
+    rule beats a pure-Python keyword automaton over the same text.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules: (document, keywords, section, finding) rules; default: the
+                   evidence_rules table (load_rules())
+        """
+        if rules is None:
+            rules = load_rules()
+        by_document = {}
+        for document, keywords, section, finding in rules:
+            by_document.setdefault(document, []).append((tuple(keywords), section, finding))
+
+        self.rules = {document: [(_minimal_keywords(keywords), section, finding)
+                                 for keywords, section, finding in document_rules]
+                      for document, document_rules in by_document.items()}
+        self.fingerprints = {document: _rules_fingerprint(document, by_document.get(document, []))
+                             for document in DOCUMENT_TEXT_FIELDS}
+
+    def scan(self, document, text):
+        """
+        Analyze one document
+
+        Args:
+            document: Document kind ('claimant', 'defendant' or 'rebuttal')
+            text: The document text
+
+        Returns:
+            dict: dates, amounts (for FACT_DOCUMENTS) and findings as (section, finding) pairs
+        """
+        result = {'dates': [], 'amounts': [], 'findings': []}
+        if document in FACT_DOCUMENTS:
+            result['dates'] = DATE_PATTERN.findall(text)
+            result['amounts'] = AMOUNT_PATTERN.findall(text)
+
+        for keywords, section, finding in self.rules.get(document, ()):
+            if any(keyword in text for keyword in keywords):
+                result['findings'].append((section, finding))
+        return result
+
+    def scan_document(self, document, text):
+        """Scan result used by analyze(); subclasses may serve it from a cache"""
+        return self.scan(document, text)
+
+    def analyze(self, case_data):
+        """
+        מנגנון ניתוח ראיות - מנתח את התיק ומחלץ עובדות מרכזיות
+
+        Args:
+            case_data: The portal's case dict (claimant, defendant, rebuttal)
+
+        Returns:
+            dict: agreed_facts, disputed_points, key_findings and legal_basis lists
+        """
+        analysis = {
+            'agreed_facts': [],
+            'disputed_points': [],
+            'key_findings': [],
+            'legal_basis': []
+        }
+
+        for document, field in DOCUMENT_TEXT_FIELDS.items():
+            if not case_data.get(document):
+                continue
+            scanned = self.scan_document(document, case_data[document].get(field, ''))
+
+            if scanned['dates']:
+                analysis['agreed_facts'].append(f"תאריכים רלוונטיים: {', '.join(scanned['dates'])}")
+            if scanned['amounts']:
+                analysis['agreed_facts'].append(f"סכומים נזכרים: {', '.join(scanned['amounts'])}")
+            for section, finding in scanned['findings']:
+                analysis[section].append(finding)
+
+        analysis['legal_basis'].extend(LEGAL_BASIS)
+
+        # ספירת קבצי ראיות
+        claimant_evidence_count = len((case_data.get('claimant') or {}).get('evidence_files', []))
+        defendant_evidence_count = len((case_data.get('defendant') or {}).get('evidence_files', []))
+
+        if claimant_evidence_count > 0:
+            analysis['key_findings'].append(f"התובע הגיש {claimant_evidence_count} קבצי ראיות")
+        if defendant_evidence_count > 0:
+            analysis['key_findings'].append(f"הנתבע הגיש {defendant_evidence_count} קבצי ראיות")
+
+        return analysis
+
+
+class CachedEvidenceAnalyzer(EvidenceAnalyzer):
+    """
+    EvidenceAnalyzer whose per-document results are kept in document_analyses
+
+    Results are keyed by (document, text SHA-256, rules fingerprint), so they
+    never go stale: a changed text or rule set simply looks up another key.
+    """
+
+    def __init__(self, rules=None):
+        super().__init__(rules)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def scan_document(self, document, text):
+        database._ensure_schema()
+        key = (document, hashlib.sha256(text.encode('utf-8')).hexdigest(), self.fingerprints[document])
+
+        with database.get_connection() as conn:
+            row = conn.execute("""
+                SELECT result FROM document_analyses
+                WHERE document = ? AND text_sha256 = ? AND rules_fingerprint = ?
+            """, key).fetchone()
+
+        if row is not None:
+            with self._lock:
+                self.hits += 1
+            result = json.loads(row[0])
+            result['findings'] = [tuple(item) for item in result['findings']]
+            return result
+
+        with self._lock:
+            self.misses += 1
+        result = self.scan(document, text)
+
+        with database.get_connection() as conn:
+            conn.execute("""
+                INSERT OR IGNORE INTO document_analyses
+                    (document, text_sha256, rules_fingerprint, result, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (*key, json.dumps(result, ensure_ascii=False), time.time()))
+        return result
+
+    def stats(self):
+        """Return hit/miss counters of the per-document results"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+# =====================================================
+# Rule Table
+# =====================================================
+def rules_version():
+    """Return the evidence_rules_version counter (bumped by triggers on any rule change)"""
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        row = conn.execute("SELECT value FROM schema_meta WHERE key = 'evidence_rules_version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def load_rules():
+    """
+    Read the rule table
+
+    Returns:
+        tuple: (document, keywords, section, finding) rules, like DEFAULT_RULES
+    """
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        rows = conn.execute("""
+            SELECT document, keywords, section, finding
+            FROM evidence_rules
+            ORDER BY document, position
+        """).fetchall()
+    return tuple((document, tuple(json.loads(keywords)), section, finding)
+                 for document, keywords, section, finding in rows)
+
+
+def set_rules(rules):
+    """
+    Replace the rule table and drop the cached results it invalidates
+
+    Documents whose rules are unchanged keep their fingerprint, and with it
+    their cached results.
+
+    Args:
+        rules: (document, keywords, section, finding) rules, in finding order
+
+    Returns:
+        int: Number of cached document results removed
+    """
+    database._ensure_schema()
+    fingerprints = EvidenceAnalyzer(rules).fingerprints
+
+    positions = {}
+    rows = []
+    for document, keywords, section, finding in rules:
+        if document not in DOCUMENT_TEXT_FIELDS:
+            raise ValueError(f"unknown document: {document!r}")
+        positions[document] = positions.get(document, -1) + 1
+        rows.append((document, positions[document], json.dumps(list(keywords), ensure_ascii=False),
+                     section, finding))
+
+    with database.get_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM evidence_rules")
+        conn.executemany("""
+            INSERT INTO evidence_rules (document, position, keywords, section, finding)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        stale = conn.execute(f"""
+            DELETE FROM document_analyses
+            WHERE rules_fingerprint NOT IN ({', '.join('?' * len(fingerprints))})
+        """, tuple(fingerprints.values())).rowcount
+
+    return stale
+
+
+# Analyzer for the current rule table, rebuilt when the table changes
+_analyzer = None
+_analyzer_key = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer():
+    """Return the shared CachedEvidenceAnalyzer for the database's current rules"""
+    global _analyzer, _analyzer_key
+
+    key = (database.DB_PATH, rules_version())
+    with _analyzer_lock:
+        if _analyzer is None or _analyzer_key != key:
+            _analyzer = CachedEvidenceAnalyzer(load_rules())
+            _analyzer_key = key
+        return _analyzer
+
+
+def analyze_case_evidence(case_data):
+    """Analyze a case with the rule table, reusing cached per-document results"""
+    return get_analyzer().analyze(case_data)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Evidence store for Resolve AI - content-addressed, deduplicated file storage
+
+Every uploaded file is stored once under its SHA-256 (the blob id) in a
+sharded directory tree, uploads/ab/cd/<sha256>. The database holds the
+manifest (case_evidence.blob_id, case_submissions.id_document_blob) and an
+evidence_blobs row per blob whose refcount triggers keep in step with the
+manifest, so unreferenced blobs can be garbage collected safely.
+
+Usage:
+    python evidence_store.py gc [--grace 3600] [--db resolve_ai.db]
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import database
+
+STORE_DIR = "uploads"
+CHUNK_SIZE = 1024 * 1024
+# Unreferenced blobs younger than this are kept: their case may still be saving
+GC_GRACE_SECONDS = 3600
+
+_BLOB_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobTooLargeError(ValueError):
+    """Raised by put_stream when the content exceeds max_bytes"""
+
+
+def blob_path(blob_id):
+    """
+    Path of a blob in the sharded tree
+
+    Raises:
+        ValueError: If blob_id is not a SHA-256 hex digest
+    """
+    if not _BLOB_ID.match(blob_id or ""):
+        raise ValueError(f"invalid blob id: {blob_id!r}")
+    return os.path.join(STORE_DIR, blob_id[:2], blob_id[2:4], blob_id)
+
+
+def put_stream(stream, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """
+    Store the content of a binary stream, hashing it while it is copied
+
+    The content is written to a temporary file and renamed into place, so a
+    blob path never holds a partial file. Content already in the store keeps
+    its single blob and row.
+
+    Args:
+        stream: Binary file-like object (read from its current position)
+        max_bytes: Reject content larger than this many bytes (optional)
+        chunk_size: Bytes copied per read
+
+    Returns:
+        dict: blob_id, size and file_path
+
+    Raises:
+        BlobTooLargeError: If the content exceeds max_bytes
+    """
+    database._ensure_schema()
+    os.makedirs(STORE_DIR, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=STORE_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise BlobTooLargeError(f"content is larger than {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+
+        blob_id = digest.hexdigest()
+        file_path = blob_path(blob_id)
+
+        # Register first: a fresh created_at keeps a re-uploaded, still
+        # unreferenced blob out of the current garbage collection window
+        with database.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO evidence_blobs (blob_id, size, refcount, created_at)
+                VALUES (?, ?, 0, ?)
+                ON CONFLICT(blob_id) DO UPDATE SET created_at = excluded.created_at
+                WHERE evidence_blobs.refcount <= 0
+            """, (blob_id, size, time.time()))
+
+        # Identical content may already be there; replacing it is atomic and
+        # cheaper than deleting the temporary copy
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {'blob_id': blob_id, 'size': size, 'file_path': file_path}
+
+
+def get_blob(blob_id):
+    """
+    Retrieve a blob's metadata
+
+    Returns:
+        dict: blob_id, size, refcount, created_at and file_path; None if unknown
+    """
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        row = conn.execute("""
+            SELECT blob_id, size, refcount, created_at FROM evidence_blobs WHERE blob_id = ?
+        """, (blob_id,)).fetchone()
+
+    if row is None:
+        return None
+    return {'blob_id': row[0], 'size': row[1], 'refcount': row[2], 'created_at': row[3],
+            'file_path': blob_path(row[0])}
+
+
+def get_stream(blob_id):
+    """
+    Open a blob for reading
+
+    Returns:
+        file: Binary file object positioned at the start (caller closes it),
+              or None if the blob is not in the store
+    """
+    try:
+        return open(blob_path(blob_id), "rb")
+    except (OSError, ValueError):
+        return None
+
+
+class BlobReadCache:
+    """
+    Byte-bounded LRU of blob contents for serving downloads
+
+    Blobs are immutable (the id is the content hash), so entries never go
+    stale. Misses are read through a memory map in a single copy.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entry_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def read(self, blob_id):
+        """
+        Return a blob's bytes
+
+        Returns:
+            bytes: The content, or None if the blob is not in the store
+        """
+        with self._lock:
+            data = self._entries.get(blob_id)
+            if data is not None:
+                self._entries.move_to_end(blob_id)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        try:
+            data = _read_mapped(blob_path(blob_id))
+        except (OSError, ValueError):
+            return None
+
+        # Very large files are served but not cached, so they cannot flush the cache
+        if len(data) <= self.max_entry_bytes:
+            with self._lock:
+                if blob_id not in self._entries:
+                    self._entries[blob_id] = data
+                    self._bytes += len(data)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return data
+
+    def stats(self):
+        """Return hit/miss counters and the cached byte total"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                    'bytes': self._bytes}
+
+
+def _read_mapped(path):
+    """Read a whole file through mmap (one copy, no chunk joining)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
+
+# Process-wide cache shared by every portal session
+read_cache = BlobReadCache()
+
+
+def read_blob(blob_id):
+    """Return a blob's bytes from the shared read cache (None if missing)"""
+    return read_cache.read(blob_id)
+
+
+def collect_garbage(grace_seconds=GC_GRACE_SECONDS):
+    """
+    Delete blobs no manifest row references, and abandoned temporary files
+
+    Args:
+        grace_seconds: Only blobs and temp files older than this are removed
+
+    Returns:
+        dict: Number of blobs and bytes removed
+    """
+    database._ensure_schema()
+    cutoff = time.time() - grace_seconds
+
+    removed = {'blobs': 0, 'bytes': 0}
+    with database.get_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        garbage = conn.execute("""
+            DELETE FROM evidence_blobs
+            WHERE refcount <= 0 AND created_at < ?
+            RETURNING blob_id, size
+        """, (cutoff,)).fetchall()
+
+        # Unlink while the write lock is held: a put_stream of the same
+        # content waits to register its row until the file is gone, and
+        # only then moves its own copy into place
+        for blob_id, size in garbage:
+            try:
+                os.remove(blob_path(blob_id))
+            except FileNotFoundError:
+                pass
+            removed['blobs'] += 1
+            removed['bytes'] += size
+
+    if os.path.isdir(STORE_DIR):
+        for name in os.listdir(STORE_DIR):
+            path = os.path.join(STORE_DIR, name)
+            if name.endswith(".part") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the Resolve AI evidence store")
+    parser.add_argument("command", choices=("gc",), help="gc: delete unreferenced blobs")
+    parser.add_argument("--grace", type=float, default=GC_GRACE_SECONDS,
+                        help="Keep unreferenced blobs younger than this many seconds")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    database.DB_PATH = args.db
+    removed = collect_garbage(args.grace)
+    print(f"Removed {removed['blobs']} unreferenced blobs ({removed['bytes']:,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Extraction cache for Resolve AI - content-addressed store of extracted document text
+
+Entries are keyed by the file's SHA-256 and the extractor version, so the same
+evidence file uploaded twice, previewed or re-analyzed is parsed only once, and
+bumping the extractor version invalidates every older entry.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+EXTRACTION_CACHE_DIR = os.path.join("cache", "extraction")
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """
+    Hash a file in fixed-size chunks
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Two-level cache of extracted text: an in-memory LRU in front of an on-disk store
+
+    The disk store lives under cache_dir/<first two hex digits>/ and is kept
+    under max_disk_bytes by evicting the least recently used files (hits
+    refresh a file's mtime).
+    """
+
+    def __init__(self, cache_dir=EXTRACTION_CACHE_DIR, max_disk_bytes=512 * 1024 * 1024,
+                 max_memory_entries=256, max_memory_chars=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_chars = max_memory_chars
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._memory_chars = 0
+        self._disk_bytes = None  # measured lazily on first write
+        # (path, mtime_ns, size) -> digest, so unchanged files are not re-hashed
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_path(self, digest, version):
+        """Path of the on-disk entry for a digest and extractor version"""
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}-v{version}.txt")
+
+    def digest(self, file_path):
+        """Return the file's SHA-256, reusing the last result while the file is unchanged"""
+        stat = os.stat(file_path)
+        memo_key = (os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            digest = self._digests.get(memo_key)
+            if digest is not None:
+                self._digests.move_to_end(memo_key)
+                return digest
+
+        digest = file_sha256(file_path)
+        with self._lock:
+            self._digests[memo_key] = digest
+            if len(self._digests) > 4 * self.max_memory_entries:
+                self._digests.popitem(last=False)
+        return digest
+
+    def get(self, digest, version):
+        """
+        Look up extracted text
+
+        Returns:
+            str: Cached text, or None on a miss
+        """
+        key = (digest, version)
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return text
+
+        path = self._disk_path(digest, version)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)  # mark as recently used for disk eviction
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, text)
+        return text
+
+    def put(self, digest, version, text):
+        """Store extracted text in memory and on disk"""
+        key = (digest, version)
+        with self._lock:
+            self._remember(key, text)
+
+        path = self._disk_path(digest, version)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                # Overwriting an entry (e.g. two workers extracting the same file)
+                # replaces its bytes rather than adding to them
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+            except BaseException:
+                # A failed write or rename must not leave the temp file behind
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Warning: could not write extraction cache entry {path}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._measure_disk()
+            else:
+                self._disk_bytes += size - replaced
+            over_budget = self._disk_bytes > self.max_disk_bytes
+
+        if over_budget:
+            self._evict_disk()
+
+    def get_or_extract(self, file_path, extractor, version, cacheable=None):
+        """
+        Return the cached text for a file, extracting and storing it on a miss
+
+        Args:
+            file_path: Path to the document
+            extractor: Function file_path -> str
+            version: Extractor version; part of the cache key
+            cacheable: Optional predicate text -> bool; failed extractions are not stored
+
+        Returns:
+            str: Extracted text
+        """
+        digest = self.digest(file_path)
+        text = self.get(digest, version)
+        if text is not None:
+            return text
+
+        text = extractor(file_path)
+        if cacheable is None or cacheable(text):
+            self.put(digest, version, text)
+        return text
+
+    def stats(self):
+        """Return hit/miss counters and current sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes
+            }
+
+    def clear_memory(self):
+        """Drop the in-memory front (the disk store is kept)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_chars = 0
+
+    def _remember(self, key, text):
+        """Insert into the memory LRU, evicting from the cold end (caller holds the lock)"""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_chars -= len(previous)
+        self._memory[key] = text
+        self._memory_chars += len(text)
+
+        while self._memory and (len(self._memory) > self.max_memory_entries
+                                or self._memory_chars > self.max_memory_chars):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_chars -= len(evicted)
+
+    def _entries(self):
+        """List (mtime, size, path) for every file in the disk store"""
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _measure_disk(self):
+        """Total bytes currently in the disk store"""
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def _evict_disk(self):
+        """Delete least recently used files until the store is at 90% of its budget"""
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        target = int(self.max_disk_bytes * 0.9)
+
+        evicted = 0
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self.evictions += evicted
@@ -0,0 +1,59 @@
+"""
+User identity normalization for Resolve AI
+
+Users type the same email and phone number in many shapes ("Yossi@Example.com ",
+"050-1234567", "+972 50 123 4567", "00972501234567"). database.py stores the
+canonical form next to the original (users.email_norm, users.phone_e164) and
+looks users up by it, so every shape finds the same user.
+"""
+import re
+
+# Country calling code assumed for national numbers (trunk prefix 0, e.g. 050-1234567)
+DEFAULT_COUNTRY_CODE = "972"
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_email(email):
+    """
+    Canonical form of an email address: trimmed and lower-cased
+
+    Returns:
+        str: Normalized email, or None if empty
+    """
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+
+def normalize_phone(phone, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    Best-effort E.164 form of a phone number (+<country code><number>)
+
+    Separators are dropped; "00" and "+" mean an international number, a
+    leading 0 is the national trunk prefix of country_code, and a number
+    already starting with country_code is taken as international.
+
+    Args:
+        phone: Phone number as typed
+        country_code: Calling code for national numbers (default Israel)
+
+    Returns:
+        str: E.164 number, or None if phone contains no digits
+    """
+    if not phone:
+        return None
+    phone = phone.strip()
+    digits = _NON_DIGITS.sub("", phone)
+    if not digits:
+        return None
+
+    if phone.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):
+        return "+" + digits[2:]
+    if digits.startswith("0"):
+        return "+" + country_code + digits[1:]
+    if digits.startswith(country_code) and len(digits) > len(country_code) + 7:
+        return "+" + digits
+    return "+" + country_code + digits
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Job queue for Resolve AI - runs award generation outside the Streamlit request
+
+Jobs live in the `jobs` table of the main database, so the portal and any
+number of worker processes share one queue without another service. The
+portal submits a job and polls its status; workers claim jobs, run them and
+record the result (for awards, the PDF path also lands in cases.pdf_path).
+
+Usage:
+    python job_queue.py [--workers 2] [--poll 1.0] [--once] [--db resolve_ai.db]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+import case_search
+import database
+
+# Submissions are refused once this many jobs are queued or running
+MAX_QUEUE_DEPTH = 500
+MAX_ATTEMPTS = 3
+# Failed attempts are retried after RETRY_BASE_DELAY * 2^(attempt - 1) seconds
+RETRY_BASE_DELAY = 5.0
+# A running job whose worker has not renewed its lease for this long is
+# handed to another worker; workers renew every HEARTBEAT_SECONDS while a
+# handler runs, so only dead or hung workers lose their jobs
+LEASE_SECONDS = 600
+HEARTBEAT_SECONDS = 60
+
+AWARDS_DIR = "awards"
+
+JOB_COLUMNS = ('id', 'kind', 'idempotency_key', 'case_id', 'status', 'attempts', 'max_attempts',
+               'run_after', 'locked_by', 'locked_at', 'result', 'error', 'created_at', 'updated_at')
+
+
+class QueueFullError(Exception):
+    """Raised by submit_job when the queue is too deep to accept more work"""
+
+    def __init__(self, depth):
+        super().__init__(f"job queue is full ({depth} jobs pending)")
+        self.depth = depth
+
+
+def _job_dict(row):
+    """Convert a jobs row to a dict, decoding the JSON result"""
+    if row is None:
+        return None
+    job = dict(zip(JOB_COLUMNS, row))
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+def _begin_immediate(conn):
+    """Take the write lock now, so check-then-write sequences are atomic across processes"""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def queue_depth():
+    """Number of jobs queued or running"""
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        return conn.execute("""
+            SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')
+        """).fetchone()[0]
+
+
+def submit_job(kind, case_id, max_attempts=MAX_ATTEMPTS, max_depth=MAX_QUEUE_DEPTH, retry_failed=False):
+    """
+    Queue a job, at most one per (kind, case_id)
+
+    Submitting again while a job exists - queued, waiting out a retry
+    backoff, running or finished - returns that job instead of creating a
+    duplicate, so the portal can call this on every rerun.
+
+    Args:
+        kind: Handler name (see HANDLERS)
+        case_id: Case the job works on; part of the idempotency key
+        max_attempts: Attempts before the job is marked failed
+        max_depth: Refuse new jobs once this many are queued or running
+        retry_failed: Requeue the existing job if it previously failed
+
+    Returns:
+        int: The job id
+
+    Raises:
+        QueueFullError: If a new job would exceed max_depth
+    """
+    database._ensure_schema()
+    key = f"{kind}:{case_id}"
+    now = time.time()
+
+    with database.get_connection() as conn:
+        _begin_immediate(conn)
+
+        existing = conn.execute("SELECT id, status FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+        if existing:
+            job_id, status = existing
+            if status == 'failed' and retry_failed:
+                conn.execute("""
+                    UPDATE jobs
+                    SET status = 'queued', attempts = 0, run_after = ?, error = NULL,
+                        locked_by = NULL, locked_at = NULL, updated_at = ?
+                    WHERE id = ?
+                """, (now, now, job_id))
+            return job_id
+
+        depth = conn.execute("""
+            SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')
+        """).fetchone()[0]
+        if depth >= max_depth:
+            raise QueueFullError(depth)
+
+        cursor = conn.execute("""
+            INSERT INTO jobs (kind, idempotency_key, case_id, max_attempts, run_after, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (kind, key, case_id, max_attempts, now, now, now))
+        return cursor.lastrowid
+
+
+def submit_award_job(case_id, **kwargs):
+    """Queue "analyze + render award" for a case (see submit_job)"""
+    return submit_job('award', case_id, **kwargs)
+
+
+def get_job(job_id):
+    """
+    Retrieve a job by id
+
+    Returns:
+        dict: Job fields (result decoded from JSON) or None if not found
+    """
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_dict(row)
+
+
+def get_case_job(case_id, kind='award'):
+    """Retrieve the job of a given kind for a case, or None"""
+    database._ensure_schema()
+
+    with database.get_connection() as conn:
+        row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE idempotency_key = ?",
+                           (f"{kind}:{case_id}",)).fetchone()
+    return _job_dict(row)
+
+
+def claim_job(worker_id, lease_seconds=LEASE_SECONDS):
+    """
+    Claim the oldest runnable job for a worker
+
+    Jobs whose worker stopped renewing its lease are reclaimed first (or
+    failed, if they have used up their attempts).
+
+    Returns:
+        dict: The claimed job, or None if nothing is runnable
+    """
+    database._ensure_schema()
+    now = time.time()
+
+    with database.get_connection() as conn:
+        _begin_immediate(conn)
+
+        conn.execute("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                error = 'worker lease expired', locked_by = NULL, locked_at = NULL, updated_at = ?
+            WHERE status = 'running' AND locked_at < ?
+        """, (now, now - lease_seconds))
+
+        row = conn.execute(f"""
+            UPDATE jobs
+            SET status = 'running', attempts = attempts + 1, locked_by = ?, locked_at = ?, updated_at = ?
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE status = 'queued' AND run_after <= ?
+                ORDER BY run_after, id
+                LIMIT 1
+            )
+            RETURNING {', '.join(JOB_COLUMNS)}
+        """, (worker_id, now, now, now)).fetchone()
+
+    return _job_dict(row)
+
+
+def renew_lease(job_id, worker_id):
+    """
+    Extend a running job's lease (called by the worker's heartbeat)
+
+    Returns:
+        bool: False if the job is no longer held by worker_id
+    """
+    with database.get_connection() as conn:
+        cursor = conn.execute("""
+            UPDATE jobs SET locked_at = ?
+            WHERE id = ? AND status = 'running' AND locked_by = ?
+        """, (time.time(), job_id, worker_id))
+    return cursor.rowcount == 1
+
+
+def complete_job(job_id, worker_id, result=None):
+    """
+    Mark a claimed job as succeeded and store its JSON-serialisable result
+
+    Returns:
+        bool: False if the job is no longer held by worker_id (its lease
+              expired and it was reclaimed or failed); the result is dropped
+    """
+    now = time.time()
+    with database.get_connection() as conn:
+        cursor = conn.execute("""
+            UPDATE jobs
+            SET status = 'succeeded', result = ?, error = NULL, locked_by = NULL, locked_at = NULL,
+                updated_at = ?
+            WHERE id = ? AND status = 'running' AND locked_by = ?
+        """, (json.dumps(result, ensure_ascii=False), now, job_id, worker_id))
+    return cursor.rowcount == 1
+
+
+def fail_job(job_id, worker_id, error, retry_base_delay=None):
+    """
+    Record a failed attempt: requeue with exponential backoff, or fail for good
+
+    Returns:
+        str: The job's new status ('queued' or 'failed')
+    """
+    base = RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+    now = time.time()
+    with database.get_connection() as conn:
+        row = conn.execute("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                run_after = ? + ? * (1 << (attempts - 1)),
+                error = ?, locked_by = NULL, locked_at = NULL, updated_at = ?
+            WHERE id = ? AND status = 'running' AND locked_by = ?
+            RETURNING status
+        """, (now, base, error, now, job_id, worker_id)).fetchone()
+    return row[0] if row else None
+
+
+# =====================================================
+# Handlers
+# =====================================================
+def run_award_job(case_id):
+    """
+    Index a case's evidence for search, analyze it, render its award PDF and
+    record it in cases.pdf_path
+
+    Returns:
+        dict: {'pdf_path', 'render_seconds'}
+    """
+    # reportlab is only needed in worker processes, not by the portal
+    import ai_engine
+
+    state = database.load_case_state(case_id)
+    if state is None:
+        raise ValueError(f"case {case_id} not found")
+
+    # Evidence text is extracted here, where the PDF/Word parsers are available
+    case_search.index_case_evidence(case_id)
+
+    claimant_name = (state['claimant'] or {}).get('full_name') or "התובע"
+    defendant_name = (state['defendant'] or {}).get('full_name') or "הנתבע"
+    analysis = ai_engine.analyze_case(claimant_name, defendant_name, state)
+
+    case_data = {'case_id': case_id, 'claimant': claimant_name, 'defendant': defendant_name}
+    output_path = os.path.join(AWARDS_DIR, f"award_{case_id}.pdf")
+    result = ai_engine.render_awards([(case_data, analysis, output_path)], max_workers=1)[0]
+    if result['error']:
+        raise RuntimeError(result['error'])
+
+    if not database.set_case_pdf_path(case_id, output_path):
+        raise RuntimeError(f"could not record award for case {case_id}")
+    database.append_audit_event(case_id, 'award_generated', "פסק הבוררות הופק")
+    return {'pdf_path': output_path, 'render_seconds': round(result['seconds'], 3)}
+
+
+HANDLERS = {
+    'award': run_award_job,
+}
+
+
+# =====================================================
+# Worker
+# =====================================================
+def _keep_lease(job_id, worker_id, stop, interval):
+    """Heartbeat thread: renew a job's lease until stop is set or the lease is lost"""
+    try:
+        while not stop.wait(interval):
+            try:
+                if not renew_lease(job_id, worker_id):
+                    return
+            except Exception as e:
+                print(f"Warning: could not renew lease of job {job_id}: {e}")
+    finally:
+        database.close_connections()
+
+
+def run_next_job(worker_id, handlers=None, heartbeat_seconds=HEARTBEAT_SECONDS):
+    """
+    Claim and run one job, renewing its lease while the handler runs
+
+    Returns:
+        dict: The finished job, or None if the queue had nothing runnable
+    """
+    handlers = HANDLERS if handlers is None else handlers
+    job = claim_job(worker_id)
+    if job is None:
+        return None
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_keep_lease, args=(job['id'], worker_id, stop, heartbeat_seconds),
+                                 daemon=True)
+    heartbeat.start()
+
+    handler = handlers.get(job['kind'])
+    try:
+        if handler is None:
+            raise ValueError(f"no handler for job kind {job['kind']!r}")
+        result = handler(job['case_id'])
+        stop.set()
+        heartbeat.join()
+        if not complete_job(job['id'], worker_id, result):
+            print(f"Warning: job {job['id']} ({job['kind']} {job['case_id']}) finished after "
+                  f"its lease was lost; result not recorded")
+    except Exception as e:
+        stop.set()
+        heartbeat.join()
+        status = fail_job(job['id'], worker_id, str(e))
+        print(f"Job {job['id']} ({job['kind']} {job['case_id']}) attempt {job['attempts']} failed, {status}: {e}")
+
+    return get_job(job['id'])
+
+
+def work(worker_id=None, handlers=None, poll_interval=1.0, stop_when_idle=False, max_jobs=None):
+    """
+    Worker loop: run jobs until stopped (or until the queue is idle)
+
+    Args:
+        worker_id: Name recorded on claimed jobs (default: host:pid)
+        handlers: kind -> handler(case_id) mapping (default HANDLERS)
+        poll_interval: Seconds to sleep when nothing is runnable
+        stop_when_idle: Return instead of sleeping once nothing is runnable
+        max_jobs: Return after this many jobs (optional)
+
+    Returns:
+        int: Number of jobs run
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        if run_next_job(worker_id, handlers) is None:
+            if stop_when_idle:
+                break
+            time.sleep(poll_interval)
+            continue
+        processed += 1
+    return processed
+
+
+def _worker_process(db_path, poll_interval, stop_when_idle):
+    """Entry point of a worker process started by main()"""
+    database.DB_PATH = db_path
+    processed = work(poll_interval=poll_interval, stop_when_idle=stop_when_idle)
+    database.audit_writer.flush()
+    print(f"Worker {os.getpid()} finished after {processed} jobs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Resolve AI background job workers")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between polls of an empty queue")
+    parser.add_argument("--once", action="store_true", help="Exit once the queue is drained")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    database.DB_PATH = args.db
+    database.init_database()
+    print(f"Starting {args.workers} worker(s) on {args.db} ({queue_depth()} jobs pending)")
+
+    processes = [multiprocessing.Process(target=_worker_process, args=(args.db, args.poll, args.once))
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Lookup cache for Resolve AI - bounded in-memory cache of database reads
+
+Entries expire after a fixed TTL and the least recently used entry is
+evicted once the cache is full. database.py keeps one cache per lookup
+function and invalidates it when cases or users change (see
+database._check_lookup_version).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LookupCache:
+    """
+    Thread-safe TTL + LRU cache with hit/miss counters and lookup latency
+
+    Loads racing an invalidation are not stored: put() only accepts a value
+    if no invalidation happened since the caller read generation.
+    """
+
+    def __init__(self, name, max_entries=1024, ttl=30.0, clock=time.monotonic):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._hit_seconds = 0.0
+        self._miss_seconds = 0.0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a key
+
+        Returns:
+            tuple: (found, value) - value may itself be None (a cached "not found")
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key, value, generation):
+        """Store a value loaded while the cache was at generation"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry if key is None"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def record(self, hit, seconds):
+        """Count a lookup and its latency"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self._hit_seconds += seconds
+            else:
+                self.misses += 1
+                self._miss_seconds += seconds
+
+    def stats(self):
+        """Return entry count, counters, hit rate and mean hit/miss latency in microseconds"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_us': self._hit_seconds / self.hits * 1e6 if self.hits else None,
+                'miss_us': self._miss_seconds / self.misses * 1e6 if self.misses else None,
+            }
@@ -0,0 +1,116 @@
+"""
+Row records for Resolve AI - compact, read-only rows returned by database.py
+
+A record keeps the tuple SQLite already built for the row and maps field
+names to positions on its class, so a row costs one small object instead
+of a 15-key dict. Records read like the dicts they replace (case['status'],
+case.get('pdf_path'), dict(case)) and also by attribute (case.status).
+"""
+from collections.abc import Mapping
+
+
+class Record(Mapping):
+    """Read-only mapping over one result row; subclasses set _fields"""
+
+    __slots__ = ('_values',)
+    _fields = ()
+    _index = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._index = {name: position for position, name in enumerate(cls._fields)}
+        for name, position in cls._index.items():
+            setattr(cls, name, property(lambda self, _position=position: self._values[_position],
+                                        doc=f"The {name} column"))
+
+    def __init__(self, values):
+        # Trailing values beyond _fields (e.g. pagination keys) are ignored
+        self._values = values
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return self._fields
+
+    def get(self, key, default=None):
+        position = self._index.get(key)
+        return default if position is None else self._values[position]
+
+    def to_dict(self):
+        """Return a mutable dict copy"""
+        return dict(zip(self._fields, self._values))
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._fields == other._fields and self._values[:len(self)] == other._values[:len(other)]
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Case(Record):
+    """A cases row as returned by database.get_case"""
+
+    __slots__ = ()
+    _fields = ('case_id', 'claimant_name', 'claimant_phone', 'claimant_email',
+               'defendant_name', 'defendant_phone', 'claimant_file_path',
+               'defendant_file_path', 'status', 'postal_mail_cost', 'submission_fee',
+               'resolution_fee', 'terms_accepted', 'created_at', 'pdf_path')
+
+
+class User(Record):
+    """A users row as returned by database.get_user_by_email / get_user_by_phone"""
+
+    __slots__ = ()
+    _fields = ('id', 'full_name', 'phone', 'email', 'user_type', 'created_at')
+
+
+# (record type, columns) -> projection class
+_projections = {}
+
+
+def projection(record_type, columns):
+    """
+    Record class holding only some of record_type's columns
+
+    Args:
+        record_type: Case or User
+        columns: Column names, in the order they are selected
+
+    Returns:
+        type: A Record subclass (one class per distinct column tuple)
+
+    Raises:
+        ValueError: If a column is not one of record_type's fields
+    """
+    columns = tuple(columns)
+    if columns == record_type._fields:
+        return record_type
+
+    key = (record_type, columns)
+    cls = _projections.get(key)
+    if cls is None:
+        unknown = [column for column in columns if column not in record_type._index]
+        if unknown or not columns or len(set(columns)) != len(columns):
+            raise ValueError(f"invalid {record_type.__name__} columns: {', '.join(unknown) or columns}")
+        cls = _projections[key] = type(f"{record_type.__name__}Projection", (Record,),
+                                       {'__slots__': (), '_fields': columns,
+                                        '__module__': __name__})
+    return cls
+
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Batch award renderer for Resolve AI - re-issues arbitral award PDFs in
+parallel (month-end re-issue, template changes)
+
+Input is JSONL, one job per line:
+    {"case_data": {"case_id": ..., "claimant": ..., "defendant": ...},
+     "analysis": {...}, "output_path": "optional/path.pdf"}
+
+Usage:
+    python render_awards.py jobs.jsonl [--output-dir awards] [--workers N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import ai_engine
+
+
+def read_jobs(path):
+    """
+    Read award jobs from a JSONL file
+
+    Returns:
+        tuple: (jobs, errors) - valid job tuples and (line_no, reason) for rejected lines
+    """
+    jobs, errors = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+                case_data, analysis = row['case_data'], row['analysis']
+                case_data['case_id']
+            except (ValueError, KeyError, TypeError) as e:
+                errors.append((line_no, f"invalid job: {e}"))
+                continue
+            if row.get('output_path'):
+                jobs.append((case_data, analysis, row['output_path']))
+            else:
+                jobs.append((case_data, analysis))
+    return jobs, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render arbitral award PDFs in parallel")
+    parser.add_argument("path", help="JSONL file of award jobs")
+    parser.add_argument("--output-dir", default="awards", help="Directory for awards without an output_path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"Error: {args.path} not found")
+        return 1
+
+    jobs, errors = read_jobs(args.path)
+    for line_no, reason in errors:
+        print(f"line {line_no}: {reason}", file=sys.stderr)
+
+    start = time.perf_counter()
+    results = ai_engine.render_awards(jobs, output_dir=args.output_dir, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if result['error']:
+            failed += 1
+            print(f"{result['case_id']}: failed - {result['error']}", file=sys.stderr)
+        else:
+            print(f"{result['case_id']}: {result['path']} ({result['seconds'] * 1000:.0f} ms)")
+
+    rate = len(results) / elapsed if elapsed else 0.0
+    print(f"Rendered {len(results) - failed} of {len(results)} awards in {elapsed:.1f}s "
+          f"({rate:.1f} awards/sec), {failed} failed, {len(errors)} invalid lines skipped")
+    return 0 if failed == 0 and not errors else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Temporary databases and directories for the Resolve AI test scripts
+
+Every test script points the database module (and, where needed, the evidence
+store) at a throwaway directory. The directories are removed when the next
+one is requested and when the interpreter exits, so repeated runs do not
+leave test databases behind in the system temp directory.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+import database
+
+_temp_dirs = []
+_database_dir = None
+
+
+def make_temp_dir(prefix="resolveai_test_"):
+    """
+    Create a temporary directory that is removed when the interpreter exits
+
+    Args:
+        prefix: Directory name prefix
+
+    Returns:
+        str: Path to the new directory
+    """
+    if not _temp_dirs:
+        atexit.register(remove_temp_dirs)
+    tmp_dir = tempfile.mkdtemp(prefix=prefix)
+    _temp_dirs.append(tmp_dir)
+    return tmp_dir
+
+
+def remove_temp_dirs():
+    """Close this thread's connections and remove every directory created so far"""
+    global _database_dir
+    database.close_connections()
+    while _temp_dirs:
+        shutil.rmtree(_temp_dirs.pop(), ignore_errors=True)
+    _database_dir = None
+
+
+def use_temp_database(prefix="resolveai_test_", with_store=False):
+    """
+    Point the database module at a fresh temporary file
+
+    The directory of the previous temporary database is removed first.
+
+    Args:
+        prefix: Directory name prefix
+        with_store: Also point evidence_store.STORE_DIR into the new directory
+
+    Returns:
+        str: Path to the new database file
+    """
+    global _database_dir
+    database.close_connections()
+    if _database_dir in _temp_dirs:
+        _temp_dirs.remove(_database_dir)
+        shutil.rmtree(_database_dir, ignore_errors=True)
+
+    _database_dir = make_temp_dir(prefix)
+    database.DB_PATH = os.path.join(_database_dir, "test.db")
+    if with_store:
+        import evidence_store
+        evidence_store.STORE_DIR = os.path.join(_database_dir, "uploads")
+    return database.DB_PATH
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio analysis client against the local Messages API stub
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analysis_async
+import analysis_backend
+import database
+from analysis_stub import start_stub
+from temp_database import use_temp_database
+
+
+def make_case(i, deadline=None):
+    case = {'claimant_name': "יוסי כהן", 'defendant_name': "דני לוי", 'case_id': f"RA-{i:04d}",
+            'case_data': {'claimant': {'claim_text': f"תביעה מספר {i}"}}}
+    if deadline is not None:
+        case['deadline'] = deadline
+    return case
+
+
+def test_deadline_order_and_streaming():
+    """Test that the most urgent cases run first and results stream as they finish"""
+    print("\n⏱️  Testing Deadline Scheduling...")
+    use_temp_database()
+    stub = start_stub(delay=0.02)
+    provider = analysis_backend.AnthropicProvider("stub-key", base_url=stub.base_url, timeout=10)
+
+    async def run():
+        now = time.time()
+        cases = [make_case(i, deadline=now + 100 - i) for i in range(6)]
+        async with analysis_async.AsyncAnalysisClient(provider, max_concurrency=1) as client:
+            order = [result['case_id'] async for result in client.stream(cases)]
+            again = await client.submit(**cases[0])
+            return order, again, client.metrics()
+
+    try:
+        order, again, metrics = asyncio.run(run())
+    finally:
+        stub.shutdown()
+
+    assert order == [f"RA-{i:04d}" for i in range(5, -1, -1)], "Earliest deadline should run first"
+    assert again['cached'] and again['analysis'], "Analyzed cases come from the shared cache"
+    assert metrics['completed'] == 7 and metrics['cache_hits'] == 1 and metrics['queue_depth'] == 0
+    assert metrics['latency_p50'] is not None and metrics['in_flight'] == 0
+
+    print("   ✓ Results streamed in deadline order")
+    print("   ✓ Metrics report completions, cache hits and latency")
+    return True
+
+
+def test_budgets_and_retries():
+    """Test request budget throttling, bounded concurrency and retry of overloaded calls"""
+    print("\n🪣 Testing Budgets and Retries...")
+
+    async def take_five():
+        bucket = analysis_async.TokenBucket(600, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire(1)
+        return time.monotonic() - start
+
+    assert asyncio.run(take_five()) >= 0.35, "10 requests/s with no burst should space out 5 requests"
+
+    use_temp_database()
+    stub = start_stub(delay=0.05, fail_next=2)
+    provider = analysis_backend.AnthropicProvider("stub-key", base_url=stub.base_url, timeout=10)
+    try:
+        results = analysis_async.analyze_cases([make_case(i) for i in range(8)], provider=provider,
+                                               max_concurrency=3, base_delay=0.01)
+    finally:
+        stub.shutdown()
+
+    assert [result['case_id'] for result in results] == [f"RA-{i:04d}" for i in range(8)]
+    assert all(result['error'] is None for result in results), "Overloaded calls should be retried"
+    assert sum(result['attempts'] for result in results) == 10
+    assert stub.max_active <= 3, "No more than max_concurrency calls in flight"
+
+    print("   ✓ Request budget spaces out calls")
+    print("   ✓ Overloaded calls retried, concurrency bounded")
+    return True
+
+
+def test_resubmit_during_backoff():
+    """Test that resubmitting a case waiting out a retry backoff neither skips nor duplicates it"""
+    print("\n🔁 Testing Resubmit During Retry Backoff...")
+    use_temp_database()
+    stub = start_stub(fail_next=1)
+    provider = analysis_backend.AnthropicProvider("stub-key", base_url=stub.base_url, timeout=10)
+    original_delay = analysis_async.retry_delay
+    analysis_async.retry_delay = lambda *args: 0.5
+
+    async def run():
+        case = make_case(1, deadline=time.time() + 100)
+        async with analysis_async.AsyncAnalysisClient(provider, max_concurrency=2) as client:
+            first = client.submit(**case)
+            while client.metrics()['retries'] == 0:
+                await asyncio.sleep(0.01)
+            failed_at = time.monotonic()
+
+            # Same case, more urgent, while the first attempt's backoff runs
+            second = client.submit(**dict(case, deadline=time.time() + 10))
+            result = await first
+            return first is second, result, time.monotonic() - failed_at, client.metrics()
+
+    try:
+        shared, result, waited, metrics = asyncio.run(run())
+    finally:
+        analysis_async.retry_delay = original_delay
+        stub.shutdown()
+
+    assert shared, "The resubmitted case shares the pending job"
+    assert result['error'] is None and result['attempts'] == 2
+    assert waited >= 0.45, f"The retry waited out its backoff ({waited:.2f}s)"
+    assert stub.requests == 2 and metrics['submitted'] == 1, "No second job was queued"
+
+    print("   ✓ One job per case, retried only after its backoff")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Async Analysis Client Test")
+    print("=" * 70)
+
+    tests = [
+        ("Deadline Scheduling and Streaming", test_deadline_order_and_streaming),
+        ("Budgets and Retries", test_budgets_and_retries),
+        ("Resubmit During Retry Backoff", test_resubmit_during_backoff),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL ASYNC ANALYSIS TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test the model analysis backend against the local Messages API stub
+"""
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analysis_backend
+import database
+from analysis_stub import start_stub
+from temp_database import use_temp_database
+
+
+def make_backend(stub, api_key="stub-key", **options):
+    provider = analysis_backend.AnthropicProvider(api_key, base_url=stub.base_url, timeout=10)
+    options.setdefault('base_delay', 0.01)
+    return analysis_backend.AnalysisBackend(provider, **options)
+
+
+def case_data(claim_text, defense_text="אני מכחיש את הטענות"):
+    return {'claimant': {'claim_text': claim_text}, 'defendant': {'defense_text': defense_text}}
+
+
+def test_analysis_and_cache():
+    """Test a full analysis and that normalized duplicates are served from the cache"""
+    print("\n🤖 Testing Model Analysis and Cache...")
+    use_temp_database()
+    stub = start_stub()
+    try:
+        backend = make_backend(stub)
+        analysis = backend.analyze("יוסי כהן", "דני לוי", case_data("הנתבע הפר את ההסכם"))
+        for key in analysis_backend.REQUIRED_KEYS + ('legal_expenses',):
+            assert key in analysis, f"Analysis is missing {key}"
+        assert analysis['legal_expenses']['registered_mail'] == 35.0
+
+        again = backend.analyze(" יוסי  כהן", "דני לוי", case_data("הנתבע   הפר את\nההסכם"))
+        assert again == analysis, "Whitespace differences should hit the same cached analysis"
+        assert stub.requests == 1 and backend.stats()['cache_hits'] == 1
+
+        fresh = make_backend(stub)
+        assert fresh.analyze("יוסי כהן", "דני לוי", case_data("הנתבע הפר את ההסכם")) == analysis, \
+            "The cache is shared through the database"
+        assert stub.requests == 1
+    finally:
+        stub.shutdown()
+
+    print("   ✓ Valid analysis structure from the provider")
+    print("   ✓ Normalized duplicates served from the cache")
+    return True
+
+
+def test_retries_and_errors():
+    """Test retry of overloaded responses and immediate failure on client errors"""
+    print("\n🔁 Testing Retries...")
+    use_temp_database()
+    stub = start_stub(fail_next=2)
+    try:
+        backend = make_backend(stub, max_retries=3)
+        backend.analyze("א", "ב", case_data("תביעה"))
+        assert stub.requests == 3 and backend.stats()['retries'] == 2, "Overloaded calls are retried"
+
+        stub.fail_next = 5
+        try:
+            make_backend(stub, max_retries=1).analyze("א", "ב", case_data("תביעה אחרת"))
+            raise AssertionError("Exhausted retries should raise")
+        except analysis_backend.AnalysisError as e:
+            assert e.retryable
+
+        stub.fail_next = 0
+        unauthenticated = make_backend(stub, api_key="")
+        try:
+            unauthenticated.analyze("א", "ב", case_data("תביעה שלישית"))
+            raise AssertionError("Authentication errors should raise")
+        except analysis_backend.AnalysisError as e:
+            assert not e.retryable and unauthenticated.stats()['calls'] == 1, "Client errors are not retried"
+    finally:
+        stub.shutdown()
+
+    try:
+        analysis_backend.parse_analysis('```json\n{"dispute_table": []}\n```')
+        raise AssertionError("Incomplete responses should be rejected")
+    except analysis_backend.AnalysisError as e:
+        assert "mediation_proposal" in str(e)
+
+    valid = {'dispute_table': [{'issue': "x", 'claimant_version': "x", 'defendant_version': "x",
+                                'ai_analysis': "x"}],
+             'mediation_proposal': {}, 'reasoning': {},
+             'final_verdict': {'amount_awarded': 1000, 'total_payment': 1035.0, 'payment_deadline_days': 30}}
+    assert analysis_backend.parse_analysis(json.dumps(valid))['legal_expenses']['registered_mail'] == 35.0
+    malformed = [
+        (dict(valid, final_verdict=dict(valid['final_verdict'], amount_awarded="1,000 ₪")), "amount_awarded"),
+        (dict(valid, final_verdict=dict(valid['final_verdict'], payment_deadline_days=None)),
+         "payment_deadline_days"),
+        (dict(valid, dispute_table=[{'issue': "x"}]), "claimant_version"),
+        (dict(valid, dispute_table=["x"]), "dispute_table[0]"),
+    ]
+    for response, field in malformed:
+        try:
+            analysis_backend.parse_analysis(json.dumps(response))
+            raise AssertionError(f"Malformed {field} should be rejected")
+        except analysis_backend.AnalysisError as e:
+            assert e.retryable and field in str(e), str(e)
+
+    print("   ✓ Transient failures retried with backoff")
+    print("   ✓ Client errors and invalid responses surface as AnalysisError")
+    return True
+
+
+def test_concurrency_limit():
+    """Test that concurrent analyses respect max_concurrency and share duplicate calls"""
+    print("\n🚦 Testing Concurrency Limit...")
+    use_temp_database()
+    stub = start_stub(delay=0.1)
+    try:
+        backend = make_backend(stub, max_concurrency=2)
+        cases = [("א", "ב", case_data(f"תביעה {i % 6}")) for i in range(12)]
+        results = backend.analyze_many(cases, max_workers=8)
+
+        assert all(result['error'] is None for result in results)
+        assert results[0]['analysis'] == results[6]['analysis']
+        assert stub.max_active <= 2, "No more than max_concurrency calls in flight"
+        assert stub.requests == 6, "Each distinct case is analyzed once"
+    finally:
+        stub.shutdown()
+
+    print("   ✓ In-flight calls bounded, duplicates coalesced")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Analysis Backend Test")
+    print("=" * 70)
+
+    tests = [
+        ("Model Analysis and Cache", test_analysis_and_cache),
+        ("Retries", test_retries_and_errors),
+        ("Concurrency Limit", test_concurrency_limit),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL ANALYSIS BACKEND TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
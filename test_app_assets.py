@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test portal helpers in app.py: the static asset cache and upload limits
+"""
+import base64
+import io
+import os
+import sys
+import tomllib
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from temp_database import make_temp_dir, use_temp_database
+
+
+def import_app(work_dir):
+    """Import app.py in Streamlit bare mode, with its database and files under work_dir"""
+    os.chdir(work_dir)
+    import database
+    database.close_connections()
+    database.DB_PATH = os.path.join(work_dir, "test.db")
+    import app
+    return app
+
+
+def test_asset_cache():
+    """Test that assets are encoded once and re-read only when mtime or size change"""
+    print("\n🖼️  Testing Static Asset Cache...")
+    work_dir = make_temp_dir("resolveai_assets_test_")
+    previous_dir = os.getcwd()
+    try:
+        app = import_app(work_dir)
+        app._encoded_asset.clear()
+
+        logo = os.path.join(work_dir, "logo.jpg")
+        with open(logo, "wb") as f:
+            f.write(b"\xff\xd8 first logo")
+        first = app.asset_base64(logo)
+        assert base64.b64decode(first) == b"\xff\xd8 first logo"
+
+        # Same mtime and size: served from the cache without reading the file
+        stat = os.stat(logo)
+        with open(logo, "wb") as f:
+            f.write(b"\xff\xd8 other logo")
+        os.utime(logo, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert app.asset_base64(logo) is first, "Unchanged mtime and size hit the cache"
+
+        # A replaced file is picked up without a restart
+        with open(logo, "wb") as f:
+            f.write(b"\xff\xd8 replaced, larger logo")
+        assert base64.b64decode(app.asset_base64(logo)) == b"\xff\xd8 replaced, larger logo"
+
+        assert app.asset_base64(os.path.join(work_dir, "missing.jpg")) is None
+    finally:
+        os.chdir(previous_dir)
+
+    print("   ✓ Encoded once per (path, mtime, size)")
+    print("   ✓ Replaced files re-encoded, missing files return None")
+    return True
+
+
+class FakeUpload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile: a BytesIO with a name and a size"""
+
+    def __init__(self, name, content, size=None):
+        super().__init__(content)
+        self.name = name
+        self.size = len(content) if size is None else size
+
+
+def test_upload_limits():
+    """Test that uploads are streamed into the store and oversized ones rejected"""
+    print("\n📤 Testing Upload Streaming and Size Limit...")
+    work_dir = make_temp_dir("resolveai_uploads_test_")
+    previous_dir = os.getcwd()
+    try:
+        app = import_app(work_dir)
+        use_temp_database(with_store=True)
+        import evidence_store
+
+        with open(os.path.join(previous_dir, ".streamlit", "config.toml"), "rb") as f:
+            max_upload_mb = tomllib.load(f)['server']['maxUploadSize']
+        assert max_upload_mb * 1024 * 1024 == app.MAX_UPLOAD_BYTES, "Streamlit enforces the same limit"
+
+        small = FakeUpload("contract.pdf", b"%PDF-1.4 contract")
+        large = FakeUpload("video.mp4", b"", size=app.MAX_UPLOAD_BYTES + 1)
+        assert app.oversized_uploads([small, None, large]) == ["video.mp4"]
+
+        # A partly read upload (e.g. after a preview) is stored from the start
+        small.read(4)
+        first = app.save_uploaded_file(small)
+        second = app.save_uploaded_file(FakeUpload("same_contract.pdf", b"%PDF-1.4 contract"))
+        assert first['file_name'] == "contract.pdf" and second['file_name'] == "same_contract.pdf"
+        assert first['blob_id'] == second['blob_id'], "Identical uploads share one blob"
+        with open(first['file_path'], "rb") as f:
+            assert f.read() == b"%PDF-1.4 contract"
+
+        # An upload whose reported size understates its content is stopped while streaming
+        original_limit = app.MAX_UPLOAD_BYTES
+        app.MAX_UPLOAD_BYTES = 1000
+        try:
+            app.save_uploaded_file(FakeUpload("evidence.pdf", b"x" * 5000, size=10))
+            raise AssertionError("Oversized content should be rejected")
+        except evidence_store.BlobTooLargeError:
+            pass
+        finally:
+            app.MAX_UPLOAD_BYTES = original_limit
+        leftovers = [n for n in os.listdir(evidence_store.STORE_DIR) if n.endswith(".part")]
+        assert not leftovers, "A rejected upload leaves no partial file"
+    finally:
+        os.chdir(previous_dir)
+
+    print("   ✓ Uploads stored whole and deduplicated")
+    print("   ✓ Oversized uploads rejected by name and while streaming")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Portal Helpers Test")
+    print("=" * 70)
+
+    tests = [
+        ("Static Asset Cache", test_asset_cache),
+        ("Upload Streaming and Size Limit", test_upload_limits),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL PORTAL HELPER TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
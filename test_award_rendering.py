@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test arbitral award PDF rendering (AwardRenderer and render_awards)
+"""
+import copy
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import PyPDF2
+
+import ai_engine
+from temp_database import make_temp_dir
+
+
+def award_jobs(count):
+    """(case_data, analysis) jobs for count distinct cases"""
+    analysis = ai_engine.analyze_case("יוסי כהן", "דני לוי")
+    return [({'case_id': f"RA-20260101-{i:06d}", 'claimant': "יוסי כהן", 'defendant': "דני לוי"}, analysis)
+            for i in range(count)]
+
+
+def first_page_text(path):
+    with open(path, 'rb') as f:
+        return PyPDF2.PdfReader(f).pages[0].extract_text()
+
+
+# Page count and extracted lines per page of the original single-function
+# renderer (before AwardRenderer) for award_jobs' analysis
+LEGACY_PAGE_LINES = [46, 54, 36, 20]
+# Text the original award showed, by page; Hebrew is extracted in visual order
+LEGACY_KEY_TEXT = [
+    ["RA-20260101-000000", "פסק בוררות"[::-1], "ניתוח נקודות המחלוקת"[::-1], "2,500"],
+    ["הצעת פשרה"[::-1], "3,500", "ההחלטה הסופית"[::-1]],
+    ["4,000.00 ₪", "35.00 ₪", "4,035.00 ₪", "נספח אימות ושלמות מסמך"[::-1]],
+    ["נחתם דיגיטלית על ידי:"[::-1], "Resolve AI"],
+]
+
+
+def test_matches_original_layout():
+    """Test that the shared renderer produces the same document as the original renderer"""
+    print("\n🖨️  Testing Award Layout...")
+    output_dir = make_temp_dir("resolveai_awards_test_")
+    (case_data, analysis), = award_jobs(1)
+
+    paths = [os.path.join(output_dir, name) for name in ("fresh.pdf", "shared.pdf", "again.pdf")]
+    ai_engine.AwardRenderer(logo_path=None).render(case_data, analysis, paths[0])
+    ai_engine.generate_arbitral_award_pdf(case_data, analysis, paths[1])
+    ai_engine.generate_arbitral_award_pdf(case_data, analysis, paths[2])
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages = [page.extract_text() for page in PyPDF2.PdfReader(f).pages]
+        assert [len(text.splitlines()) for text in pages] == LEGACY_PAGE_LINES, \
+            f"{os.path.basename(path)}: page layout differs from the original renderer"
+        for page_no, (text, expected) in enumerate(zip(pages, LEGACY_KEY_TEXT), 1):
+            missing = [key for key in expected if key not in text]
+            assert not missing, f"{os.path.basename(path)} page {page_no} is missing {missing}"
+
+    print(f"   ✓ {len(LEGACY_PAGE_LINES)} pages with the original text, fresh and reused renderer")
+    return True
+
+
+def test_order_across_processes():
+    """Test that results come back in submission order with each case in its own file"""
+    print("\n📑 Testing Batch Order...")
+    output_dir = make_temp_dir("resolveai_awards_test_")
+    jobs = award_jobs(6)
+
+    results = ai_engine.render_awards(jobs, output_dir=output_dir, max_workers=3)
+    assert [r['case_id'] for r in results] == [case['case_id'] for case, _ in jobs], \
+        "Results keep submission order"
+    for result in results:
+        assert result['error'] is None and result['seconds'] > 0
+        assert result['path'] == os.path.join(output_dir, f"award_{result['case_id']}.pdf")
+        assert result['case_id'] in first_page_text(result['path']), "Each file holds its own case"
+
+    print(f"   ✓ {len(results)} awards rendered by 3 workers, in order")
+    return True
+
+
+def test_failures_are_atomic_and_per_job():
+    """Test that a failed render leaves no partial file and does not affect other jobs"""
+    print("\n🧯 Testing Failed Renders...")
+    output_dir = make_temp_dir("resolveai_awards_test_")
+    (good, analysis), (bad, _), (other, _) = award_jobs(3)
+
+    broken = copy.deepcopy(analysis)
+    del broken['final_verdict']['total_payment']
+    previous = os.path.join(output_dir, f"award_{bad['case_id']}.pdf")
+    with open(previous, 'wb') as f:
+        f.write(b"award rendered before the analysis changed")
+
+    for workers in (1, 3):
+        results = ai_engine.render_awards([(good, analysis), (bad, broken), (other, analysis)],
+                                          output_dir=output_dir, max_workers=workers)
+        assert [r['error'] is None for r in results] == [True, False, True], "Only the bad job fails"
+        assert "total_payment" in results[1]['error'] and results[1]['path'] is None
+        assert results[1]['case_id'] == bad['case_id']
+
+        with open(previous, 'rb') as f:
+            assert f.read() == b"award rendered before the analysis changed", \
+                "A failed render does not touch the existing award"
+        leftovers = [name for name in os.listdir(output_dir) if name.endswith(".tmp")]
+        assert not leftovers, "Temporary files are removed after a failure"
+
+    print("   ✓ Failures reported per job, existing awards left intact")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Award Rendering Test")
+    print("=" * 70)
+
+    tests = [
+        ("Award Layout", test_matches_original_layout),
+        ("Batch Order", test_order_across_processes),
+        ("Failed Renders", test_failures_are_atomic_and_per_job),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL AWARD RENDERING TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test the shared case ID allocator
+"""
+import multiprocessing
+import os
+import re
+import sys
+from datetime import datetime
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ai_engine
+import case_ids
+import database
+from temp_database import use_temp_database
+
+
+def allocate(db_path, count, queue):
+    """Child process: allocate count IDs from its own allocator"""
+    database.DB_PATH = db_path
+    allocator = case_ids.CaseIdAllocator(block_size=10)
+    queue.put([allocator.next_id() for _ in range(count)])
+
+
+def test_format_and_order():
+    """Test the ID format, ordering and day rollover"""
+    print("\n🔢 Testing Case ID Format and Order...")
+    use_temp_database()
+
+    now = [datetime(2026, 3, 1, 23, 59)]
+    allocator = case_ids.CaseIdAllocator(block_size=4, clock=lambda: now[0])
+    ids = [allocator.next_id() for _ in range(10)]
+    assert all(re.fullmatch(r"RA-20260301-\d{6}", case_id) for case_id in ids)
+    assert ids == sorted(ids) and len(set(ids)) == 10, "IDs are unique and increasing"
+    assert ids[0] == "RA-20260301-000001" and allocator.reservations == 3, "One reservation per block"
+
+    now[0] = datetime(2026, 3, 2, 0, 0)
+    assert allocator.next_id() == "RA-20260302-000001", "A new day starts a new sequence"
+
+    # A process whose clock is behind continues the latest day instead of reusing numbers
+    behind = case_ids.CaseIdAllocator(block_size=4, clock=lambda: datetime(2026, 3, 1, 23, 59))
+    assert behind.next_id() == "RA-20260302-000005"
+
+    print("   ✓ RA-YYYYMMDD-NNNNNN, increasing, one transaction per block")
+    return True
+
+
+def test_existing_ids_and_processes():
+    """Test that sequences skip existing case IDs and never collide across processes"""
+    print("\n🧵 Testing Cross-Process Allocation...")
+    db_path = use_temp_database()
+
+    today = datetime.now().strftime("%Y%m%d")
+    database.save_case(f"RA-{today}-004711", "יוסי כהן", "0501234567", "yossi@example.com",
+                       "דני לוי", "0527654321")
+    allocator = case_ids.CaseIdAllocator()
+    assert allocator.next_id() == f"RA-{today}-004712", "Existing case IDs of the day are skipped"
+
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=allocate, args=(db_path, 200, queue)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    batches = [queue.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+
+    allocated = [case_id for batch in batches for case_id in batch] + [allocator.next_id()]
+    assert len(set(allocated)) == len(allocated) == 801, "No ID is handed out twice"
+    for batch in batches:
+        assert batch == sorted(batch), "Each process hands out increasing IDs"
+
+    print("   ✓ Starts above existing IDs of the day")
+    print("   ✓ 4 processes, 800 IDs, no collisions")
+    return True
+
+
+def test_analysis_allocates_nothing():
+    """Test that analyzing a case never reserves IDs from the sequence"""
+    print("\n🧾 Testing Analysis Without Allocation...")
+    use_temp_database()
+
+    sample = ai_engine.analyze_case("יוסי כהן", "דני לוי")
+    assert sample['case_metadata']['case_id'] is None
+    portal = ai_engine.analyze_case("יוסי כהן", "דני לוי", {'case_id': "RA-20260301-000042"})
+    assert portal['case_metadata']['case_id'] == "RA-20260301-000042", "The case's own ID is echoed"
+
+    with database.get_connection() as conn:
+        reserved = conn.execute("SELECT COUNT(*) FROM id_sequences").fetchone()[0]
+    assert reserved == 0, "No ID block was reserved"
+
+    print("   ✓ Sample and portal analyses leave id_sequences untouched")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Case ID Allocator Test")
+    print("=" * 70)
+
+    tests = [
+        ("Format and Order", test_format_and_order),
+        ("Existing IDs and Processes", test_existing_ids_and_processes),
+        ("Analysis Without Allocation", test_analysis_allocates_nothing),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL CASE ID TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test full-text case search (FTS5) over submissions and evidence
+"""
+import io
+import os
+import sys
+
+from docx import Document
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import case_search
+import database
+import evidence_store
+from temp_database import use_temp_database
+
+
+def party(name, phone):
+    return {'full_name': name, 'id_number': "123456789", 'email': f"{phone}@example.com", 'phone': phone}
+
+
+def test_submissions_are_searchable():
+    """Test incremental indexing on submit, Hebrew variants, ranking and snippets"""
+    print("\n🔍 Testing Submission Search...")
+    use_temp_database()
+
+    database.create_claim("RA-0001", party("יוסי כהן", "0501234567"),
+                          "הנתבע הפר את החוזה שנחתם בינינו ולא סיפק את הסחורה במועד. החוזה קבע קנס על איחור.")
+    database.create_claim("RA-0002", party("רינה לוי", "0507654321"),
+                          "השוכר לא שילם את דמי השכירות במשך שלושה חודשים, בניגוד להסכם.")
+    database.submit_defense("RA-0002", party("דני לוי", "0527654321"),
+                            "אני מכחיש. שילמתי במזומן, כפי שיעיד עו״ד כהן. הַסֶּכֶם השכירות בוטל.")
+
+    results = case_search.search("חוזה")
+    assert [r['case_id'] for r in results] == ["RA-0001"], "Claims are indexed on submit"
+    assert "**החוזה**" in results[0]['snippet'], "Particle variants match and are highlighted"
+
+    defense = case_search.search("עו״ד")
+    assert defense and defense[0]['role'] == 'defendant', "Gershayim stay inside the token"
+    assert case_search.search("הסכם השכירות")[0]['case_id'] == "RA-0002", "Niqqud is ignored"
+    assert case_search.search("בהסכם", role='claimant')[0]['case_id'] == "RA-0002", \
+        "Particles are stripped from query words"
+
+    assert case_search.search("שכירות", case_id="RA-0001") == []
+    assert case_search.search('" OR NEAR(') == [], "Query syntax in user input is neutralized"
+
+    database.submit_rebuttal("RA-0002", "ההגנה סותרת את הקבלות")
+    assert case_search.search("קבלות")[0]['role'] == 'rebuttal'
+
+    # Submissions made before migration 11 are only indexed by reindex
+    with database.get_connection() as conn:
+        conn.execute("INSERT INTO case_search (case_search) VALUES ('delete-all')")
+        conn.execute("DELETE FROM search_documents")
+    assert case_search.search("חוזה") == []
+    assert case_search.reindex()['submissions'] == 4
+    assert [r['case_id'] for r in case_search.search("חוזה")] == ["RA-0001"], "Reindex backfills submissions"
+
+    print("   ✓ Claims, defenses and rebuttals indexed on submit")
+    print("   ✓ Hebrew particles, niqqud and gershayim handled")
+    return True
+
+
+def test_evidence_and_reindex():
+    """Test indexing extracted evidence text and rebuilding the index"""
+    print("\n📎 Testing Evidence Indexing...")
+    use_temp_database()
+
+    evidence_store.STORE_DIR = os.path.join(os.path.dirname(database.DB_PATH), "uploads")
+
+    document = Document()
+    document.add_paragraph("חשבונית מס 4471 על סך 12,000 ש״ח")
+    invoice = io.BytesIO()
+    document.save(invoice)
+    invoice.seek(0)
+    stored = evidence_store.put_stream(invoice)
+    unreadable = evidence_store.put_stream(io.BytesIO(b"\x00\x01 scanned receipt"))
+
+    evidence = [dict(stored, file_name="invoice.docx"), dict(unreadable, file_name="receipt.bin")]
+    database.create_claim("RA-0003", party("יוסי כהן", "0501234567"), "תביעה על חשבונית שלא שולמה",
+                          evidence)
+
+    assert case_search.index_case_evidence("RA-0003") == 1, "Unsupported files are not indexed"
+    assert case_search.index_case_evidence("RA-0003") == 0, "Indexed files are skipped"
+    assert case_search.search("Unsupported") == []
+
+    results = case_search.search("4471")
+    assert results[0]['title'] == "invoice.docx" and results[0]['source'] == "evidence:" + stored['blob_id']
+
+    assert case_search.reindex()['submissions'] == 1
+    assert len(case_search.search("חשבונית")) == 2, "Reindex keeps evidence and submissions"
+
+    print("   ✓ Evidence text searchable with its file name")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Case Search Test")
+    print("=" * 70)
+
+    tests = [
+        ("Submission Search", test_submissions_are_searchable),
+        ("Evidence Indexing", test_evidence_and_reindex),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL CASE SEARCH TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
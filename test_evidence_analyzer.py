@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test the rule-driven evidence analyzer against the original inline analysis,
+and its incremental per-document cache
+"""
+import os
+import re
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import evidence_analyzer
+from temp_database import use_temp_database
+
+
+def legacy_analyze_case_evidence(case_data):
+    """The original app.analyze_case_evidence, kept as the reference"""
+    analysis = {'agreed_facts': [], 'disputed_points': [], 'key_findings': [], 'legal_basis': []}
+
+    if 'claimant' in case_data and case_data['claimant']:
+        claim_text = case_data['claimant'].get('claim_text', '')
+        dates = re.findall(r'\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}', claim_text)
+        if dates:
+            analysis['agreed_facts'].append(f"תאריכים רלוונטיים: {', '.join(dates)}")
+        amounts = re.findall(r'₪?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*₪?', claim_text)
+        if amounts:
+            analysis['agreed_facts'].append(f"סכומים נזכרים: {', '.join(amounts)}")
+        if 'חוזה' in claim_text or 'הסכם' in claim_text:
+            analysis['key_findings'].append("קיומו של הסכם חוזי בין הצדדים")
+        if 'הפרה' in claim_text or 'הפר' in claim_text:
+            analysis['key_findings'].append("טענה להפרת התחייבות חוזית")
+        if 'נזק' in claim_text or 'נזקים' in claim_text:
+            analysis['key_findings'].append("טענה לנזקים שנגרמו לתובע")
+
+    if 'defendant' in case_data and case_data['defendant']:
+        defense_text = case_data['defendant'].get('defense_text', '')
+        if 'מכחיש' in defense_text or 'כופר' in defense_text or 'לא נכון' in defense_text:
+            analysis['disputed_points'].append("הנתבע מכחיש את טענות התובע")
+        if 'מאשר' in defense_text or 'מודה' in defense_text:
+            analysis['disputed_points'].append("הנתבע מאשר חלק מהטענות")
+        if 'ראיה' in defense_text or 'ראיות' in defense_text:
+            analysis['disputed_points'].append("הנתבע הציג ראיות נגדיות")
+
+    if 'rebuttal' in case_data and case_data['rebuttal']:
+        rebuttal_text = case_data['rebuttal'].get('text', '')
+        if 'סותר' in rebuttal_text or 'מפריך' in rebuttal_text:
+            analysis['disputed_points'].append("התובע מפריך את טענות ההגנה")
+
+    analysis['legal_basis'].append("התיק עומד בתנאי סף לבוררות על פי חוק הבוררות, התשכ\"ח-1968")
+    analysis['legal_basis'].append("שני הצדדים אישרו את סמכות הבורר והסכימו לתקנון Resolve AI")
+
+    claimant_evidence_count = len(case_data.get('claimant', {}).get('evidence_files', []))
+    defendant_evidence_count = len(case_data.get('defendant', {}).get('evidence_files', []))
+    if claimant_evidence_count > 0:
+        analysis['key_findings'].append(f"התובע הגיש {claimant_evidence_count} קבצי ראיות")
+    if defendant_evidence_count > 0:
+        analysis['key_findings'].append(f"הנתבע הגיש {defendant_evidence_count} קבצי ראיות")
+
+    return analysis
+
+
+SAMPLE_CASES = [
+    {
+        'claimant': {'claim_text': "ביום 15/03/2024 נחתם הסכם. הנתבע הפר את החוזה וגרם נזקים של ₪ 12,500.00",
+                     'evidence_files': ["a.pdf", "b.pdf"]},
+        'defendant': {'defense_text': "אני מכחיש. לא נכון שהפרתי, ויש לי ראיות", 'evidence_files': ["c.pdf"]},
+        'rebuttal': {'text': "הראיות סותרות את הטענה"},
+    },
+    {
+        'claimant': {'claim_text': "הפרה של ההסכם מיום 1.1.23, נזקים 3000", 'evidence_files': []},
+        'defendant': {'defense_text': "אני מודה בחלק ומאשר את התשלום", 'evidence_files': []},
+        'rebuttal': None,
+    },
+    {
+        'claimant': {'claim_text': "טקסט ללא מילות מפתח", 'evidence_files': []},
+        'defendant': {'defense_text': "", 'evidence_files': []},
+    },
+    {'claimant': {'claim_text': "מפריך 5-6-2020"}, 'defendant': {}, 'rebuttal': {'text': "מפריך"}},
+]
+
+
+def test_matches_legacy_output():
+    """Test identical output to the original analysis on sample cases"""
+    print("\n🔎 Testing Evidence Analyzer Output...")
+
+    analyzer = evidence_analyzer.EvidenceAnalyzer(evidence_analyzer.DEFAULT_RULES)
+    for case_data in SAMPLE_CASES:
+        assert analyzer.analyze(case_data) == legacy_analyze_case_evidence(case_data)
+
+    first = analyzer.analyze(SAMPLE_CASES[0])
+    assert first['key_findings'][:3] == [rule[3] for rule in evidence_analyzer.DEFAULT_RULES[:3]], \
+        "Findings keep rule table order"
+
+    print("   ✓ Same facts, findings and order as the inline analysis")
+    return True
+
+
+def test_minimal_keywords():
+    """Test that keywords containing another keyword of their rule are dropped"""
+    print("\n✂️  Testing Keyword Minimization...")
+
+    assert evidence_analyzer._minimal_keywords(('הפרה', 'הפר')) == ('הפר',)
+    assert evidence_analyzer._minimal_keywords(('נזק', 'נזקים')) == ('נזק',)
+    assert evidence_analyzer._minimal_keywords(('מכחיש', 'כופר', 'לא נכון')) == ('מכחיש', 'כופר', 'לא נכון')
+
+    analyzer = evidence_analyzer.EvidenceAnalyzer([('claimant', ('x', 'xy'), 'key_findings', "found")])
+    assert analyzer.scan('claimant', "xy 1/2/2020")['findings'] == [('key_findings', "found")]
+    assert analyzer.scan('defendant', "x")['findings'] == [], "Rules apply only to their document"
+
+    print("   ✓ Redundant keywords removed without changing matches")
+    return True
+
+
+def test_incremental_analysis():
+    """Test that only new or re-ruled documents are scanned again"""
+    print("\n♻️  Testing Incremental Analysis...")
+    use_temp_database()
+
+    assert evidence_analyzer.load_rules() == evidence_analyzer.DEFAULT_RULES, "The migration seed matches the shipped rules"
+
+    case_data = dict(SAMPLE_CASES[0], rebuttal=None)
+    before = evidence_analyzer.analyze_case_evidence(case_data)
+    assert before == legacy_analyze_case_evidence(case_data)
+    analyzer = evidence_analyzer.get_analyzer()
+    assert analyzer.stats() == {'hits': 0, 'misses': 2}
+
+    case_data['rebuttal'] = SAMPLE_CASES[0]['rebuttal']
+    after = evidence_analyzer.analyze_case_evidence(case_data)
+    assert after == legacy_analyze_case_evidence(case_data)
+    assert analyzer.stats() == {'hits': 2, 'misses': 3}, "Adding a rebuttal scans only the rebuttal"
+
+    # Change one defense rule: only the defense is invalidated
+    rules = [rule if rule[0] != 'defendant' or rule[1] != ('ראיה', 'ראיות')
+             else ('defendant', ('ראיות',), 'disputed_points', "הנתבע הציג ראיה נגדית")
+             for rule in evidence_analyzer.DEFAULT_RULES]
+    version = evidence_analyzer.rules_version()
+    assert evidence_analyzer.set_rules(rules) == 1, "Only the cached defense is dropped"
+    assert evidence_analyzer.rules_version() > version
+    assert evidence_analyzer.EvidenceAnalyzer().scan('defendant', "ראיות")['findings'] == \
+        [('disputed_points', "הנתבע הציג ראיה נגדית")], "Analyzers built directly read the edited table"
+
+    changed = evidence_analyzer.analyze_case_evidence(case_data)
+    analyzer = evidence_analyzer.get_analyzer()
+    assert analyzer.stats() == {'hits': 2, 'misses': 1}, "Claim and rebuttal results are reused"
+    assert "הנתבע הציג ראיה נגדית" in changed['disputed_points']
+
+    print("   ✓ Adding a rebuttal re-scans only the rebuttal")
+    print("   ✓ Rule changes invalidate only the affected documents")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Evidence Analyzer Test")
+    print("=" * 70)
+
+    tests = [
+        ("Matches Legacy Output", test_matches_legacy_output),
+        ("Keyword Minimization", test_minimal_keywords),
+        ("Incremental Analysis", test_incremental_analysis),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL EVIDENCE ANALYZER TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
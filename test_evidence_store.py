@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed evidence store and its reference counting
+"""
+import io
+import os
+import sys
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import evidence_store
+from temp_database import use_temp_database
+
+
+def party(name, phone, id_doc):
+    """Portal-style party details referencing a stored ID document"""
+    return {'full_name': name, 'id_number': "123456789", 'email': f"{phone}@example.com", 'phone': phone,
+            'id_document_path': id_doc['file_path'], 'id_document_blob': id_doc['blob_id']}
+
+
+def test_dedup_and_sharding():
+    """Test that identical content is stored once in the sharded tree"""
+    print("\n🗄️  Testing Evidence Store Deduplication...")
+    use_temp_database(with_store=True)
+
+    contract = b"%PDF-1.4 signed contract " * 1000
+    first = evidence_store.put_stream(io.BytesIO(contract))
+    second = evidence_store.put_stream(io.BytesIO(contract), chunk_size=100)
+    assert first == second, "Identical content should map to one blob"
+
+    blob_id = first['blob_id']
+    expected = os.path.join(evidence_store.STORE_DIR, blob_id[:2], blob_id[2:4], blob_id)
+    assert first['file_path'] == expected, "Blobs live under ab/cd/<sha256>"
+    assert first['size'] == len(contract)
+
+    with evidence_store.get_stream(blob_id) as stream:
+        assert stream.read() == contract, "get_stream should return the stored bytes"
+    assert evidence_store.get_stream("0" * 64) is None
+    assert evidence_store.get_stream("../../etc/passwd") is None, "Blob ids are validated"
+
+    try:
+        evidence_store.put_stream(io.BytesIO(contract), max_bytes=100)
+        raise AssertionError("Oversized content should be rejected")
+    except evidence_store.BlobTooLargeError:
+        pass
+    leftovers = [n for n in os.listdir(evidence_store.STORE_DIR) if n.endswith(".part")]
+    assert not leftovers, "Rejected uploads should not leave temporary files"
+
+    print("   ✓ One blob for identical uploads, sharded by hash")
+    return True
+
+
+def test_refcounts_and_gc():
+    """Test that manifest rows hold references and GC only removes orphans"""
+    print("\n♻️  Testing Reference Counting and GC...")
+    use_temp_database(with_store=True)
+
+    shared = evidence_store.put_stream(io.BytesIO(b"shared evidence"))
+    claimant_id = evidence_store.put_stream(io.BytesIO(b"claimant id card"))
+    defendant_id = evidence_store.put_stream(io.BytesIO(b"defendant id card"))
+    orphan = evidence_store.put_stream(io.BytesIO(b"upload of a claim that was never saved"))
+
+    evidence = dict(shared, file_name="contract.pdf")
+    assert database.create_claim("RA-0001", party("יוסי כהן", "0501234567", claimant_id),
+                                 "x" * 60, [evidence])
+    assert database.submit_defense("RA-0001", party("דני לוי", "0527654321", defendant_id),
+                                   "y" * 60, [evidence])
+
+    assert evidence_store.get_blob(shared['blob_id'])['refcount'] == 2, "Both parties reference it"
+    assert evidence_store.get_blob(claimant_id['blob_id'])['refcount'] == 1, "ID documents count too"
+    assert evidence_store.get_blob(orphan['blob_id'])['refcount'] == 0
+
+    state = database.load_case_state("RA-0001")
+    assert state['claimant']['evidence'][0]['blob_id'] == shared['blob_id']
+    assert state['claimant']['evidence'][0]['file_name'] == "contract.pdf"
+    assert state['claimant']['evidence_files'] == [shared['file_path']]
+
+    assert evidence_store.collect_garbage()['blobs'] == 0, "Young orphans are kept"
+    removed = evidence_store.collect_garbage(grace_seconds=-1)
+    assert removed['blobs'] == 1, "Only the unreferenced blob is collected"
+    assert not os.path.exists(orphan['file_path'])
+    assert os.path.exists(shared['file_path'])
+
+    with database.get_connection() as conn:
+        conn.execute("DELETE FROM case_evidence WHERE case_id = 'RA-0001' AND role = 'defendant'")
+    assert evidence_store.get_blob(shared['blob_id'])['refcount'] == 1, "Deletes release references"
+
+    print("   ✓ Refcounts follow the manifest")
+    print("   ✓ GC removes only unreferenced blobs past the grace period")
+    return True
+
+
+def test_gc_races_reupload():
+    """Test that content re-uploaded while GC runs keeps its file"""
+    print("\n🏁 Testing GC Against a Concurrent Upload...")
+    use_temp_database(with_store=True)
+
+    content = b"evidence uploaded again while the collector runs"
+    orphan = evidence_store.put_stream(io.BytesIO(content))
+    with database.get_connection() as conn:
+        conn.execute("UPDATE evidence_blobs SET created_at = created_at - 3600")
+
+    # Start the re-upload just before the collector unlinks the orphan
+    uploads = []
+    uploader = threading.Thread(target=lambda: uploads.append(evidence_store.put_stream(io.BytesIO(content))))
+    original_blob_path = evidence_store.blob_path
+
+    def blob_path_with_upload(blob_id):
+        if threading.current_thread() is threading.main_thread() and not uploader.is_alive() and not uploads:
+            uploader.start()
+            time.sleep(0.5)
+        return original_blob_path(blob_id)
+
+    evidence_store.blob_path = blob_path_with_upload
+    try:
+        assert evidence_store.collect_garbage(grace_seconds=60)['blobs'] == 1
+    finally:
+        evidence_store.blob_path = original_blob_path
+    uploader.join()
+
+    assert uploads and uploads[0]['blob_id'] == orphan['blob_id']
+    assert evidence_store.get_blob(orphan['blob_id']) is not None, "The re-upload registered its row"
+    with evidence_store.get_stream(orphan['blob_id']) as stream:
+        assert stream.read() == content, "The re-uploaded file survives the collection"
+
+    print("   ✓ Re-upload waits for the collector and keeps its blob")
+    return True
+
+
+def test_read_cache():
+    """Test that downloads are served from a byte-bounded LRU"""
+    print("\n📦 Testing Blob Read Cache...")
+    use_temp_database(with_store=True)
+
+    blobs = [evidence_store.put_stream(io.BytesIO(bytes([i]) * 1000)) for i in range(5)]
+    empty = evidence_store.put_stream(io.BytesIO(b""))
+    cache = evidence_store.BlobReadCache(max_bytes=2500, max_entry_bytes=1000)
+
+    assert cache.read(blobs[0]['blob_id']) == b"\x00" * 1000
+    assert cache.read(blobs[0]['blob_id']) == b"\x00" * 1000
+    assert cache.stats()['hits'] == 1, "Repeated reads should hit the cache"
+
+    for blob in blobs[1:]:
+        cache.read(blob['blob_id'])
+    stats = cache.stats()
+    assert stats['bytes'] <= 2500 and stats['entries'] == 2, "Cache should stay within its byte budget"
+
+    assert cache.read(empty['blob_id']) == b"", "Empty files can be mapped"
+    assert cache.read("f" * 64) is None, "Missing blobs return None"
+
+    print("   ✓ Hits served from memory, LRU bounded by bytes")
+    return True
+
+
+def test_blob_file_types():
+    """Test that extensionless blobs are extracted by their original name or content"""
+    print("\n📄 Testing Blob File Types...")
+    use_temp_database(with_store=True)
+    import ai_engine
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("הסכם שכירות בין הצדדים")
+    docx_bytes = io.BytesIO()
+    document.save(docx_bytes)
+    docx_bytes.seek(0)
+    blob = evidence_store.put_stream(docx_bytes)
+
+    assert not os.path.splitext(blob['file_path'])[1], "Blobs are stored without an extension"
+    assert ai_engine.detect_file_type(blob['file_path'], "Lease.DOCX") == ".docx"
+    assert ai_engine.detect_file_type(blob['file_path']) == ".docx", "DOCX is recognised by content"
+    text = ai_engine.extract_text_from_file(blob['file_path'], use_cache=False, file_name="lease.docx")
+    assert text == "הסכם שכירות בין הצדדים"
+    assert ai_engine.extract_text_from_file(blob['file_path'], use_cache=False) == text
+
+    notes = evidence_store.put_stream(io.BytesIO(b"plain notes"))
+    assert ai_engine.detect_file_type(notes['file_path']) == ""
+    assert ai_engine.extract_text_from_file(notes['file_path'], use_cache=False).startswith(
+        "[Unsupported file format")
+
+    print("   ✓ Blob type taken from the uploaded name, else from the file signature")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Evidence Store Test")
+    print("=" * 70)
+
+    tests = [
+        ("Deduplication and Sharding", test_dedup_and_sharding),
+        ("Reference Counting and GC", test_refcounts_and_gc),
+        ("GC Against a Concurrent Upload", test_gc_races_reupload),
+        ("Blob Read Cache", test_read_cache),
+        ("Blob File Types", test_blob_file_types),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL EVIDENCE STORE TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Test evidence text extraction: extract_texts and its limits, iter_pdf_pages
+"""
+import mmap
+import os
+import sys
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from docx import Document
+from reportlab.pdfgen import canvas
+
+import ai_engine
+from temp_database import make_temp_dir
+
+
+def make_pdf(path, pages):
+    """Write a PDF with one line of text per page"""
+    pdf = canvas.Canvas(path)
+    for line in pages:
+        pdf.drawString(72, 720, line)
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+def make_docx(path, text):
+    """Write a Word document with a single paragraph"""
+    document = Document()
+    document.add_paragraph(text)
+    document.save(path)
+    return path
+
+
+def open_descriptors(path):
+    """File descriptors of this process open on path (Linux /proc)"""
+    fd_dir = "/proc/self/fd"
+    found = []
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)) == os.path.realpath(path):
+                found.append(fd)
+        except OSError:
+            pass
+    return found
+
+
+def allocating_extract(megabytes):
+    """Stand-in for a parse that needs megabytes of fresh memory"""
+    def extract(file_path, use_cache=True, file_name=None):
+        return str(len(bytearray(megabytes * 1024 * 1024)))
+    return extract
+
+
+def slow_extract(file_path, use_cache=True, file_name=None):
+    """Stand-in for a parse that never finishes"""
+    time.sleep(30)
+    return "unreachable"
+
+
+def test_order_and_errors():
+    """Test that results keep submission order and report per-file errors"""
+    print("\n📚 Testing Result Order and Errors...")
+    tmp_dir = make_temp_dir("resolveai_extract_test_")
+
+    paths = []
+    for i in range(6):
+        if i % 2:
+            paths.append(make_docx(os.path.join(tmp_dir, f"evidence_{i}.docx"), f"Word evidence {i}"))
+        else:
+            paths.append(make_pdf(os.path.join(tmp_dir, f"evidence_{i}.pdf"), [f"PDF evidence {i}"]))
+    broken = os.path.join(tmp_dir, "broken.pdf")
+    with open(broken, 'wb') as f:
+        f.write(b"%PDF-1.4 truncated")
+    missing = os.path.join(tmp_dir, "missing.pdf")
+    paths[2:2] = [broken, missing]
+
+    results = ai_engine.extract_texts(paths, max_workers=3, use_cache=False)
+    assert [r['path'] for r in results] == paths, "Results come back in submission order"
+
+    by_path = {r['path']: r for r in results}
+    assert by_path[broken]['error'].startswith("[Error extracting PDF text") and not by_path[broken]['text']
+    assert by_path[missing]['error'] == "[File not found]"
+    good = [r for r in results if r['path'] not in (broken, missing)]
+    assert all(r['error'] is None for r in good)
+    assert [r['text'] for r in good] == [f"{'Word' if i % 2 else 'PDF'} evidence {i}" for i in range(6)]
+
+    sequential = ai_engine.extract_texts(paths, max_workers=1, max_memory_mb=None, use_cache=False)
+    assert [r['text'] for r in sequential] == [r['text'] for r in results], "Both paths agree"
+
+    print("   ✓ Order kept across workers, failures reported per file")
+    return True
+
+
+def test_timeouts():
+    """Test the per-file timeout in the pool, in process and off the main thread"""
+    print("\n⏱️  Testing Extraction Timeouts...")
+    tmp_dir = make_temp_dir("resolveai_extract_test_")
+    paths = [make_pdf(os.path.join(tmp_dir, f"contract_{i}.pdf"), ["contract"]) for i in range(2)]
+
+    original = ai_engine.extract_text_from_file
+    ai_engine.extract_text_from_file = slow_extract
+    try:
+        start = time.perf_counter()
+        pooled = ai_engine.extract_texts(paths, max_workers=2, timeout=0.2, use_cache=False)
+        in_process = ai_engine.extract_texts(paths[:1], timeout=0.2, max_memory_mb=None, use_cache=False)
+
+        # Signal handlers cannot be installed off the main thread: the call
+        # must neither raise nor run without its time limit
+        threaded = []
+        worker = threading.Thread(target=lambda: threaded.extend(
+            ai_engine.extract_texts(paths[:1], timeout=0.2, max_memory_mb=None, use_cache=False)))
+        worker.start()
+        worker.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        ai_engine.extract_text_from_file = original
+
+    for result in pooled + in_process + threaded:
+        assert result['error'] == "timed out after 0.2s", result['error']
+    assert len(threaded) == 1, "Extraction from a worker thread completes"
+    assert elapsed < 20, "Timed-out files do not block the caller"
+
+    print(f"   ✓ Runaway parses stopped in pool, main thread and worker thread ({elapsed:.1f}s)")
+    return True
+
+
+def test_memory_cap():
+    """Test that the default cap is headroom above a large parent, and still stops runaway parses"""
+    print("\n🧠 Testing Worker Memory Cap...")
+    tmp_dir = make_temp_dir("resolveai_extract_test_")
+    paths = [make_pdf(os.path.join(tmp_dir, f"statement_{i}.pdf"), [f"Statement {i}"]) for i in range(2)]
+
+    # A portal process (Streamlit, reportlab, ...) can already map more than
+    # the default cap; forked workers inherit that address space
+    original = ai_engine.extract_text_from_file
+    reserved = mmap.mmap(-1, 1536 * 1024 * 1024)
+    try:
+        results = ai_engine.extract_texts(paths, max_workers=2, use_cache=False)
+        # Small parses fit in memory the worker already has; one that needs
+        # fresh memory shows whether the cap leaves room above the parent
+        ai_engine.extract_text_from_file = allocating_extract(200)
+        large = ai_engine.extract_texts(paths[:1], use_cache=False)
+        ai_engine.extract_text_from_file = allocating_extract(512)
+        capped = ai_engine.extract_texts(paths[:1], max_memory_mb=64, use_cache=False)
+    finally:
+        ai_engine.extract_text_from_file = original
+        reserved.close()
+
+    assert [r['error'] for r in results] == [None, None], [r['error'] for r in results]
+    assert [r['text'].strip() for r in results] == ["Statement 0", "Statement 1"]
+    assert large[0]['error'] is None, large[0]['error']
+    assert capped[0]['error'] == "exceeded worker memory limit", capped[0]['error']
+
+    print("   ✓ Extraction succeeds under the default cap with a 1.5 GB parent")
+    print("   ✓ A parse over its headroom fails with MemoryError")
+    return True
+
+
+def test_pdf_page_iteration():
+    """Test page ranges of iter_pdf_pages and that stopping early closes the file"""
+    print("\n📄 Testing Page-by-Page PDF Extraction...")
+    tmp_dir = make_temp_dir("resolveai_extract_test_")
+    contract = make_pdf(os.path.join(tmp_dir, "contract.pdf"), [f"Clause {n}" for n in range(1, 6)])
+
+    pages = [(n, text.strip()) for n, text in ai_engine.iter_pdf_pages(contract)]
+    assert pages == [(n, f"Clause {n}") for n in range(1, 6)]
+    assert [n for n, _ in ai_engine.iter_pdf_pages(contract, first_page=2, last_page=4)] == [2, 3, 4]
+    assert [n for n, _ in ai_engine.iter_pdf_pages(contract, first_page=0, last_page=1)] == [1]
+    assert [n for n, _ in ai_engine.iter_pdf_pages(contract, first_page=4, last_page=99)] == [4, 5], \
+        "last_page is clamped to the document"
+    assert list(ai_engine.iter_pdf_pages(contract, first_page=6)) == []
+    assert ai_engine.extract_text_from_pdf(contract).split() == " ".join(text for _, text in pages).split()
+
+    if os.path.isdir("/proc/self/fd"):
+        iterator = ai_engine.iter_pdf_pages(contract)
+        assert next(iterator)[0] == 1
+        assert open_descriptors(contract), "The file stays open while iterating"
+        iterator.close()
+        assert not open_descriptors(contract), "Stopping early closes the file"
+
+        for page_no, _text in ai_engine.iter_pdf_pages(contract):
+            if page_no == 2:
+                break
+        assert not open_descriptors(contract), "Breaking out of the loop closes the file"
+
+    print("   ✓ Page ranges clamped to the document")
+    print("   ✓ File closed as soon as the caller stops iterating")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Evidence Extraction Test")
+    print("=" * 70)
+
+    tests = [
+        ("Result Order and Errors", test_order_and_errors),
+        ("Extraction Timeouts", test_timeouts),
+        ("Worker Memory Cap", test_memory_cap),
+        ("Page-by-Page PDF Extraction", test_pdf_page_iteration),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL EXTRACTION TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed extraction cache without PDF/Word libraries
+"""
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extraction_cache import ExtractionCache, file_sha256
+from temp_database import make_temp_dir
+
+
+def make_file(directory, name, content):
+    """Write a small evidence file and return its path"""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_cache_hits_and_versions():
+    """Test that identical content is extracted once per extractor version"""
+    print("\n🗂️  Testing Extraction Cache Hits...")
+    tmp_dir = make_temp_dir("resolveai_cache_test_")
+    cache = ExtractionCache(cache_dir=os.path.join(tmp_dir, "cache"))
+
+    calls = []
+
+    def extractor(path):
+        calls.append(path)
+        return f"טקסט מתוך {os.path.basename(path)}"
+
+    claimant_copy = make_file(tmp_dir, "claimant.pdf", b"%PDF-1.4 same evidence")
+    defendant_copy = make_file(tmp_dir, "defendant.pdf", b"%PDF-1.4 same evidence")
+
+    first = cache.get_or_extract(claimant_copy, extractor, version=1)
+    second = cache.get_or_extract(defendant_copy, extractor, version=1)
+    assert first == second and len(calls) == 1, "Identical content should be extracted once"
+
+    cache.clear_memory()
+    cache.get_or_extract(claimant_copy, extractor, version=1)
+    assert len(calls) == 1 and cache.disk_hits == 1, "Disk store should survive a cold memory cache"
+
+    cache.get_or_extract(claimant_copy, extractor, version=2)
+    assert len(calls) == 2, "A new extractor version should re-extract"
+
+    failing = make_file(tmp_dir, "broken.pdf", b"not really a pdf")
+    for _ in range(2):
+        cache.get_or_extract(failing, lambda path: "[Error extracting PDF text: bad]", version=1,
+                             cacheable=lambda text: not text.startswith("[Error"))
+    assert cache.get(file_sha256(failing), 1) is None, "Failed extractions should not be cached"
+
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['memory_hits'] == 1, "Counters should track hits"
+    print(f"   ✓ Stats: {stats['hits']} hits, {stats['misses']} misses")
+    return True
+
+
+def test_disk_eviction():
+    """Test that the disk store stays within its byte budget, oldest first"""
+    print("\n🧹 Testing Extraction Cache Eviction...")
+    tmp_dir = make_temp_dir("resolveai_cache_test_")
+    cache = ExtractionCache(cache_dir=os.path.join(tmp_dir, "cache"), max_disk_bytes=5000,
+                            max_memory_entries=2)
+
+    digests = []
+    for i in range(10):
+        digest = f"{i:02d}" + "a" * 62
+        cache.put(digest, 1, "x" * 1000)
+        os.utime(cache._disk_path(digest, 1), (i, i))  # deterministic LRU order
+        digests.append(digest)
+
+    assert cache.stats()['disk_bytes'] <= 5000, "Disk store should respect its budget"
+    assert cache.evictions > 0, "Evictions should be counted"
+    assert not os.path.exists(cache._disk_path(digests[0], 1)), "Oldest entry should go first"
+    assert os.path.exists(cache._disk_path(digests[-1], 1)), "Newest entry should be kept"
+    assert cache.stats()['memory_entries'] == 2, "Memory front should respect its bound"
+
+    # Rewriting an existing entry must not count its bytes twice
+    before = cache.stats()['disk_bytes']
+    evictions = cache.evictions
+    for _ in range(5):
+        cache.put(digests[-1], 1, "x" * 1000)
+        assert cache.stats()['disk_bytes'] == before, "Overwrites replace, not add, the entry's size"
+    assert cache.evictions == evictions and before == cache._measure_disk()
+
+    print("   ✓ Least recently used entries evicted under the byte budget")
+    return True
+
+
+def test_failed_writes():
+    """Test that a failed write or rename leaves no temporary file in the cache"""
+    print("\n🧯 Testing Failed Cache Writes...")
+    tmp_dir = make_temp_dir("resolveai_cache_test_")
+    cache = ExtractionCache(cache_dir=os.path.join(tmp_dir, "cache"))
+
+    def temp_files():
+        return [name for _root, _dirs, files in os.walk(cache.cache_dir) for name in files
+                if name.endswith(".tmp")]
+
+    # The rename fails: a directory is in the way of the entry
+    blocked = "bb" + "c" * 62
+    os.makedirs(cache._disk_path(blocked, 1))
+    cache.put(blocked, 1, "text")
+    assert not temp_files(), "A failed rename removes the temporary file"
+
+    # The write fails: text that cannot be encoded
+    broken = "dd" + "e" * 62
+    try:
+        cache.put(broken, 1, "\ud800")
+        raise AssertionError("Unencodable text should raise")
+    except UnicodeEncodeError:
+        pass
+    assert not temp_files(), "A failed write removes the temporary file"
+    assert not os.path.exists(cache._disk_path(broken, 1))
+
+    print("   ✓ No temporary files left after failed writes")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Extraction Cache Test")
+    print("=" * 70)
+
+    tests = [
+        ("Cache Hits and Versions", test_cache_hits_and_versions),
+        ("Disk Eviction", test_disk_eviction),
+        ("Failed Cache Writes", test_failed_writes),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL EXTRACTION CACHE TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite-backed job queue with stand-in handlers (no PDF rendering)
+"""
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import job_queue
+from temp_database import use_temp_database
+
+
+def test_idempotent_submission_and_backpressure():
+    """Test one job per case and refusal of new work when the queue is deep"""
+    print("\n📬 Testing Job Submission...")
+    use_temp_database()
+
+    first = job_queue.submit_award_job("RA-0001")
+    again = job_queue.submit_award_job("RA-0001")
+    assert first == again, "Resubmitting a case should return the existing job"
+    assert job_queue.get_case_job("RA-0001")['status'] == 'queued'
+
+    job_queue.submit_award_job("RA-0002", max_depth=2)
+    try:
+        job_queue.submit_award_job("RA-0003", max_depth=2)
+        raise AssertionError("A full queue should refuse new jobs")
+    except job_queue.QueueFullError as e:
+        assert e.depth == 2
+    assert job_queue.submit_award_job("RA-0001", max_depth=2) == first, \
+        "Existing jobs are returned even when the queue is full"
+
+    print("   ✓ Duplicate submissions collapse to one job")
+    print("   ✓ QueueFullError raised past max_depth")
+    return True
+
+
+def test_worker_retries_and_results():
+    """Test claiming, retry with backoff, permanent failure and stored results"""
+    print("\n⚙️  Testing Job Worker...")
+    use_temp_database()
+    job_queue.RETRY_BASE_DELAY = 0.05
+
+    calls = []
+
+    def flaky(case_id):
+        calls.append(case_id)
+        if case_id == "RA-FLAKY" and calls.count(case_id) == 1:
+            raise RuntimeError("temporary failure")
+        if case_id == "RA-BROKEN":
+            raise RuntimeError("always fails")
+        return {'pdf_path': f"awards/award_{case_id}.pdf"}
+
+    handlers = {'award': flaky}
+    for case_id in ("RA-OK", "RA-FLAKY", "RA-BROKEN"):
+        job_queue.submit_award_job(case_id, max_attempts=2)
+
+    job_queue.work("test-worker", handlers=handlers, stop_when_idle=True)
+    flaky_job = job_queue.get_case_job("RA-FLAKY")
+    assert flaky_job['status'] == 'queued' and flaky_job['run_after'] > time.time() - 1, \
+        "A failed attempt should be requeued with a delay"
+
+    # Submitting again while the job waits out its backoff neither adds a job
+    # nor moves the retry forward
+    for retry_failed in (False, True):
+        assert job_queue.submit_award_job("RA-FLAKY", retry_failed=retry_failed) == flaky_job['id']
+    waiting = job_queue.get_case_job("RA-FLAKY")
+    assert (waiting['run_after'], waiting['attempts']) == (flaky_job['run_after'], 1), \
+        "The backoff and attempt count are kept"
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs WHERE case_id = 'RA-FLAKY'").fetchone()[0] == 1
+
+    time.sleep(0.3)
+    job_queue.work("test-worker", handlers=handlers, stop_when_idle=True)
+
+    ok, flaky_job, broken = (job_queue.get_case_job(c) for c in ("RA-OK", "RA-FLAKY", "RA-BROKEN"))
+    assert ok['status'] == 'succeeded' and ok['result']['pdf_path'].endswith("award_RA-OK.pdf")
+    assert flaky_job['status'] == 'succeeded' and flaky_job['attempts'] == 2, "Retry should succeed"
+    assert broken['status'] == 'failed' and broken['error'] == "always fails"
+    assert job_queue.queue_depth() == 0
+
+    job_queue.submit_award_job("RA-BROKEN", retry_failed=True)
+    assert job_queue.get_case_job("RA-BROKEN")['status'] == 'queued', "Failed jobs can be requeued"
+
+    # A worker that died mid-job loses its lease
+    job_queue.submit_award_job("RA-STALE")
+    dead = [job_queue.claim_job("dead-worker"), job_queue.claim_job("dead-worker")]
+    assert job_queue.claim_job("live-worker") is None, "Leased jobs are not handed out twice"
+    reclaimed = job_queue.claim_job("live-worker", lease_seconds=-1)
+    assert reclaimed['id'] in {job['id'] for job in dead} and reclaimed['locked_by'] == "live-worker", \
+        "Expired leases should be reclaimed"
+
+    print("   ✓ Failed attempts retried with backoff, then failed for good")
+    print("   ✓ Results stored on the job")
+    return True
+
+
+def test_lease_heartbeat():
+    """Test that a long-running job keeps its lease and a lost lease is reported"""
+    print("\n💓 Testing Lease Heartbeat...")
+    use_temp_database()
+
+    stolen = []
+
+    def slow(case_id):
+        claimed_at = job_queue.get_case_job(case_id)['locked_at']
+        time.sleep(0.5)
+        assert job_queue.get_case_job(case_id)['locked_at'] > claimed_at, "The heartbeat renews the lease"
+        assert job_queue.claim_job("other-worker", lease_seconds=0.3) is None, \
+            "A renewed lease is not reclaimed"
+        return {'pdf_path': f"awards/award_{case_id}.pdf"}
+
+    def hung(case_id):
+        # Simulates a worker that stopped renewing: another worker takes the job
+        stolen.append(job_queue.claim_job("other-worker", lease_seconds=-1))
+        return {'pdf_path': "late.pdf"}
+
+    job_queue.submit_award_job("RA-SLOW")
+    job = job_queue.run_next_job("test-worker", handlers={'award': slow}, heartbeat_seconds=0.1)
+    assert job['status'] == 'succeeded'
+
+    job_queue.submit_award_job("RA-HUNG")
+    job = job_queue.run_next_job("test-worker", handlers={'award': hung}, heartbeat_seconds=10)
+    assert stolen[0]['locked_by'] == "other-worker"
+    assert job['status'] == 'running' and job['result'] is None, \
+        "A worker that lost its lease does not overwrite the new holder's job"
+    assert not job_queue.complete_job(job['id'], "test-worker", {}), "complete_job reports the lost lease"
+
+    print("   ✓ Leases renewed while the handler runs")
+    print("   ✓ Completion after a lost lease is detected")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Job Queue Test")
+    print("=" * 70)
+
+    tests = [
+        ("Idempotent Submission and Backpressure", test_idempotent_submission_and_backpressure),
+        ("Worker Retries and Results", test_worker_retries_and_results),
+        ("Lease Heartbeat", test_lease_heartbeat),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL JOB QUEUE TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test the read-through cache in front of get_case, load_case_state and the user lookups
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+from lookup_cache import LookupCache
+from temp_database import use_temp_database
+
+
+def rename_defendant(db_path, case_id, name):
+    """Child process: change a case through its own connection"""
+    database.DB_PATH = db_path
+    with database.get_connection() as conn:
+        conn.execute("UPDATE cases SET defendant_name = ? WHERE case_id = ?", (name, case_id))
+
+
+def drop_evidence(db_path, case_id):
+    """Child process: remove a case's evidence rows through its own connection"""
+    database.DB_PATH = db_path
+    with database.get_connection() as conn:
+        conn.execute("DELETE FROM case_evidence WHERE case_id = ?", (case_id,))
+
+
+def test_ttl_and_lru():
+    """Test expiry, eviction and the invalidation guard of LookupCache"""
+    print("\n⏱️  Testing TTL and LRU...")
+    now = [0.0]
+    cache = LookupCache('test', max_entries=2, ttl=10.0, clock=lambda: now[0])
+
+    for key in ("a", "b"):
+        cache.put(key, key.upper(), cache.generation)
+    cache.get("a")
+    cache.put("c", "C", cache.generation)
+    assert cache.get("b") == (False, None), "Least recently used entry is evicted"
+    assert cache.get("a") == (True, "A") and cache.evictions == 1
+
+    now[0] = 10.0
+    assert cache.get("a") == (False, None) and cache.expirations == 1, "Entries expire after the TTL"
+
+    # A value loaded before an invalidation must not be stored after it
+    generation = cache.generation
+    cache.invalidate("c")
+    cache.put("c", "stale", generation)
+    assert cache.get("c") == (False, None), "Racing load is discarded"
+
+    cache.record(True, 0.000002)
+    cache.record(False, 0.000050)
+    stats = cache.stats()
+    assert stats['hit_rate'] == 0.5 and round(stats['miss_us']) == 50
+
+    print("   ✓ LRU eviction, TTL expiry, no stale values after invalidation")
+    return True
+
+
+def test_read_through_and_invalidation():
+    """Test cache hits, write invalidation and cross-process invalidation"""
+    print("\n🗃️  Testing Read-Through Cache...")
+    db_path = use_temp_database()
+
+    assert database.get_user_by_email("yossi@example.com") is None
+    database.create_user("יוסי כהן", "0501234567", "yossi@example.com")
+    assert database.get_user_by_email("yossi@example.com")['phone'] == "0501234567", \
+        "Creating a user drops the cached miss"
+
+    claimant = {'full_name': "יוסי כהן", 'phone': "0501234567", 'email': "yossi@example.com"}
+    assert database.create_claim("RA-0001", claimant, "כתב תביעה")
+    assert database.get_case("RA-0001")['defendant_name'] == ""
+
+    # A hit runs no query against cases
+    statements = []
+    with database.get_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        case = database.get_case("RA-0001")
+        conn.set_trace_callback(None)
+    assert not any("FROM cases" in s for s in statements), "Second read is served from memory"
+    try:
+        case['defendant_name'] = "modified by caller"
+        assert False, "Cached records must be read-only"
+    except TypeError:
+        pass
+
+    defendant = {'full_name': "דני לוי", 'phone': "0527654321", 'email': "dani@example.com"}
+    assert database.submit_defense("RA-0001", defendant, "כתב הגנה")
+    assert database.get_case("RA-0001")['defendant_name'] == "דני לוי", "Writes invalidate the case"
+
+    process = multiprocessing.Process(target=rename_defendant, args=(db_path, "RA-0001", "דני כהן"))
+    process.start()
+    process.join()
+    time.sleep(database.LOOKUP_VERSION_INTERVAL)
+    assert database.get_case("RA-0001")['defendant_name'] == "דני כהן", \
+        "Another process's write is seen before the TTL expires"
+
+    stats = database.lookup_cache_stats()
+    assert stats['case']['hits'] >= 1 and stats['case']['hit_us'] is not None
+    print(f"   ✓ get_case hit rate {stats['case']['hit_rate']:.0%}, "
+          f"hit {stats['case']['hit_us']:.0f} µs, miss {stats['case']['miss_us']:.0f} µs")
+    print("   ✓ Invalidated by writes here and in other processes")
+    return True
+
+
+def test_portal_case_state():
+    """Test that the portal's per-rerun load_case_state read is served from the cache"""
+    print("\n🖥️  Testing Cached Portal Case State...")
+    db_path = use_temp_database()
+
+    claimant = {'full_name': "יוסי כהן", 'phone': "0501234567", 'email': "yossi@example.com"}
+    assert database.create_claim("RA-0002", claimant, "כתב תביעה", ["uploads/contract.pdf"])
+    assert database.load_case_state("RA-0002")['stage'] == 'claim_submitted'
+    before = database.lookup_cache_stats()['case_state']
+
+    statements = []
+    with database.get_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        for _ in range(5):
+            state = database.load_case_state("RA-0002")
+        conn.set_trace_callback(None)
+    assert not any("case_submissions" in s or "case_evidence" in s for s in statements), \
+        "Reruns are served from memory"
+    assert database.lookup_cache_stats()['case_state']['hits'] == before['hits'] + 5
+
+    # Each call gets its own dict, so a caller cannot corrupt the cache
+    state['claimant']['claim_text'] = "modified by caller"
+    state['claimant']['evidence_files'].append("other.pdf")
+    fresh = database.load_case_state("RA-0002")
+    assert fresh['claimant']['claim_text'] == "כתב תביעה"
+    assert fresh['claimant']['evidence_files'] == ["uploads/contract.pdf"]
+
+    defendant = {'full_name': "דני לוי", 'phone': "0527654321", 'email': "dani@example.com"}
+    assert database.submit_defense("RA-0002", defendant, "כתב הגנה")
+    state = database.load_case_state("RA-0002")
+    assert state['stage'] == 'defense_submitted' and state['defendant']['defense_text'] == "כתב הגנה", \
+        "Writes invalidate the cached state"
+
+    # Evidence rows changed by another process bump lookup_version too
+    process = multiprocessing.Process(target=drop_evidence, args=(db_path, "RA-0002"))
+    process.start()
+    process.join()
+    time.sleep(database.LOOKUP_VERSION_INTERVAL)
+    assert database.load_case_state("RA-0002")['claimant']['evidence_files'] == [], \
+        "Another process's evidence change is seen before the TTL expires"
+
+    assert database.load_case_state("RA-9999") is None
+    print("   ✓ Portal reruns hit the cache, each caller gets a fresh dict")
+    print("   ✓ Invalidated by lifecycle writes and by other processes")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("   ResolveAI - Lookup Cache Test")
+    print("=" * 70)
+
+    tests = [
+        ("TTL and LRU", test_ttl_and_lru),
+        ("Read-Through and Invalidation", test_read_through_and_invalidation),
+        ("Cached Portal Case State", test_portal_case_state),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            results.append((test_name, False))
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASSED" if result else "❌ FAILED"
+        print(f"{status:12} - {test_name}")
+        if not result:
+            all_passed = False
+
+    print("=" * 70)
+
+    if all_passed:
+        print("\n🎉 ALL LOOKUP CACHE TESTS PASSED!")
+    else:
+        print("\n⚠️  Some tests failed.")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    result = main()
+    print()
+    sys.exit(0 if result else 1)